@@ -0,0 +1,60 @@
+"""product full-text search vector
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+Tables are created by ``Base.metadata.create_all`` on startup, so revisions
+only carry the changes made to existing tables and are written to be safe to
+run against a database that create_all has already brought up to date.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector")
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(NEW.category::text, '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(NEW.location_state, '') || ' ' || coalesce(NEW.location_city, '')), 'C') ||
+                setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'D');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS products_search_vector_trigger ON products")
+    op.execute("""
+        CREATE TRIGGER products_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF name, category, description, location_state, location_city
+            ON products
+            FOR EACH ROW EXECUTE FUNCTION products_search_vector_update()
+    """)
+
+    # Backfill existing rows; the trigger fires because name is in the column list
+    op.execute("UPDATE products SET name = name WHERE search_vector IS NULL")
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_products_search_vector "
+        "ON products USING gin (search_vector)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_products_search_vector")
+    op.execute("DROP TRIGGER IF EXISTS products_search_vector_trigger ON products")
+    op.execute("DROP FUNCTION IF EXISTS products_search_vector_update()")
+    op.execute("ALTER TABLE products DROP COLUMN IF EXISTS search_vector")
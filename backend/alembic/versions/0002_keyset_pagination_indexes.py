@@ -0,0 +1,43 @@
+"""keyset pagination indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:00:00
+
+Composite (created_at, id) indexes so cursor-paginated list endpoints read
+each page with a single index range scan.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_products_status_created_at", "products", "status, created_at, id"),
+    ("ix_orders_created_at", "orders", "created_at, id"),
+    ("ix_orders_buyer_created_at", "orders", "buyer_id, created_at, id"),
+    ("ix_orders_farmer_created_at", "orders", "farmer_id, created_at, id"),
+    ("ix_payment_transactions_created_at", "payment_transactions", "created_at, id"),
+    ("ix_payment_transactions_user_created_at", "payment_transactions", "user_id, created_at, id"),
+    ("ix_withdrawals_created_at", "withdrawals", "created_at, id"),
+    ("ix_withdrawals_farmer_created_at", "withdrawals", "farmer_id, created_at, id"),
+    ("ix_disputes_created_at", "disputes", "created_at, id"),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade() -> None:
+    for name, _, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
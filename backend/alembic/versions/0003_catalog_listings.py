@@ -0,0 +1,76 @@
+"""catalog listings read model
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00
+
+Denormalized catalog rows (product list fields plus farmer display name and
+decoded image URLs) for every ACTIVE product.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("catalog_listings"):
+        op.create_table(
+            "catalog_listings",
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("farmer_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("farmer_name", sa.String(201), nullable=True),
+            sa.Column("farm_name", sa.String(200), nullable=True),
+            sa.Column("name", sa.String(200), nullable=False),
+            sa.Column("category", postgresql.ENUM(name="productcategory", create_type=False), nullable=False),
+            sa.Column("price_per_unit", sa.Float(), nullable=False),
+            sa.Column("unit", sa.String(50), nullable=False),
+            sa.Column("available_quantity", sa.Float(), nullable=False),
+            sa.Column("location_state", sa.String(100), nullable=True),
+            sa.Column("location_city", sa.String(100), nullable=True),
+            sa.Column("image_urls", sa.JSON(), nullable=True),
+            sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        )
+        op.create_index("ix_catalog_listings_farmer_id", "catalog_listings", ["farmer_id"])
+        op.create_index("ix_catalog_listings_created_at", "catalog_listings", ["created_at", "product_id"])
+        op.create_index(
+            "ix_catalog_listings_category_created_at",
+            "catalog_listings",
+            ["category", "created_at", "product_id"]
+        )
+        op.create_index(
+            "ix_catalog_listings_search_vector",
+            "catalog_listings",
+            ["search_vector"],
+            postgresql_using="gin"
+        )
+
+    op.execute("""
+        INSERT INTO catalog_listings (
+            product_id, farmer_id, farmer_name, farm_name, name, category,
+            price_per_unit, unit, available_quantity, location_state, location_city,
+            image_urls, search_vector, created_at
+        )
+        SELECT
+            p.id, p.farmer_id, u.first_name || ' ' || u.last_name, u.farm_name, p.name, p.category,
+            p.price_per_unit, p.unit, p.available_quantity, p.location_state, p.location_city,
+            p.image_urls::json, p.search_vector, p.created_at
+        FROM products p
+        JOIN users u ON u.id = p.farmer_id
+        WHERE p.status = 'ACTIVE'
+        ON CONFLICT (product_id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("catalog_listings")
@@ -0,0 +1,65 @@
+"""numeric farm coordinates and geo grid cells
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:00:00
+
+Parses users.farm_location_coordinates ("lat,lng") into numeric columns plus a
+grid cell id, and copies them onto catalog_listings for nearby search.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.helpers.geo import farm_location_fields
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS farm_latitude double precision")
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS farm_longitude double precision")
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS farm_geo_cell integer")
+    op.execute("ALTER TABLE catalog_listings ADD COLUMN IF NOT EXISTS latitude double precision")
+    op.execute("ALTER TABLE catalog_listings ADD COLUMN IF NOT EXISTS longitude double precision")
+    op.execute("ALTER TABLE catalog_listings ADD COLUMN IF NOT EXISTS geo_cell integer")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_catalog_listings_geo_cell ON catalog_listings (geo_cell)")
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, farm_location_coordinates FROM users "
+        "WHERE farm_location_coordinates IS NOT NULL AND farm_latitude IS NULL"
+    )).all()
+
+    update_user = sa.text(
+        "UPDATE users SET farm_latitude = :farm_latitude, farm_longitude = :farm_longitude, "
+        "farm_geo_cell = :farm_geo_cell WHERE id = :id"
+    )
+    for user_id, coordinates in rows:
+        try:
+            fields = farm_location_fields(coordinates)
+        except ValueError:
+            # Malformed legacy values stay unparsed; the farmer can re-save them
+            continue
+        bind.execute(update_user, {"id": user_id, **fields})
+
+    op.execute("""
+        UPDATE catalog_listings c
+        SET latitude = u.farm_latitude, longitude = u.farm_longitude, geo_cell = u.farm_geo_cell
+        FROM users u
+        WHERE u.id = c.farmer_id
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_catalog_listings_geo_cell")
+    for column in ("latitude", "longitude", "geo_cell"):
+        op.execute(f"ALTER TABLE catalog_listings DROP COLUMN IF EXISTS {column}")
+    for column in ("farm_latitude", "farm_longitude", "farm_geo_cell"):
+        op.execute(f"ALTER TABLE users DROP COLUMN IF EXISTS {column}")
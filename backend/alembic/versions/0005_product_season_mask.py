@@ -0,0 +1,62 @@
+"""product season month masks
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 12:00:00
+
+Parses products.season_months ("jan,feb,mar") into a 12-bit month mask so
+seasonal filters are bitwise tests, and copies it onto catalog_listings.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.helpers.seasons import ALL_MONTHS_MASK, season_mask
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        f"ALTER TABLE products ADD COLUMN IF NOT EXISTS season_mask integer "
+        f"NOT NULL DEFAULT {ALL_MONTHS_MASK}"
+    )
+    op.execute(
+        f"ALTER TABLE catalog_listings ADD COLUMN IF NOT EXISTS season_mask integer "
+        f"NOT NULL DEFAULT {ALL_MONTHS_MASK}"
+    )
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, season_months FROM products WHERE is_seasonal AND season_months IS NOT NULL"
+    )).all()
+
+    update_product = sa.text("UPDATE products SET season_mask = :season_mask WHERE id = :id")
+    for product_id, season_months in rows:
+        mask = season_mask(True, season_months)
+        if mask != ALL_MONTHS_MASK:
+            bind.execute(update_product, {"id": product_id, "season_mask": mask})
+
+    op.execute("""
+        UPDATE catalog_listings c
+        SET season_mask = p.season_mask
+        FROM products p
+        WHERE p.id = c.product_id AND c.season_mask <> p.season_mask
+    """)
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_catalog_listings_state_season_mask "
+        "ON catalog_listings (lower(location_state), season_mask)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_catalog_listings_state_season_mask")
+    op.execute("ALTER TABLE catalog_listings DROP COLUMN IF EXISTS season_mask")
+    op.execute("ALTER TABLE products DROP COLUMN IF EXISTS season_mask")
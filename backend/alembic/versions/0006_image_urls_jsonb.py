@@ -0,0 +1,45 @@
+"""native jsonb image_urls
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 12:00:00
+
+products.image_urls was text holding a JSON string and catalog_listings kept
+a json copy. Both become jsonb, with empty lists stored as NULL so "has
+images" filtering is an IS NOT NULL test that a partial index can serve.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Casting through text keeps the conversion valid if it is re-run on jsonb
+_TO_JSONB = """
+    ALTER TABLE {table} ALTER COLUMN image_urls TYPE jsonb USING
+        CASE
+            WHEN btrim(image_urls::text) IN ('', '[]', 'null') THEN NULL
+            ELSE image_urls::text::jsonb
+        END
+"""
+
+
+def upgrade() -> None:
+    op.execute(_TO_JSONB.format(table="products"))
+    op.execute(_TO_JSONB.format(table="catalog_listings"))
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_catalog_listings_with_images_created_at
+        ON catalog_listings (created_at, product_id)
+        WHERE image_urls IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_catalog_listings_with_images_created_at")
+    op.execute("ALTER TABLE catalog_listings ALTER COLUMN image_urls TYPE json USING image_urls::json")
+    op.execute("ALTER TABLE products ALTER COLUMN image_urls TYPE text USING image_urls::text")
@@ -0,0 +1,30 @@
+"""products changed-at index for incremental catalog exports
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 12:00:00
+
+Serves "changed since" exports, which filter and order on
+coalesce(updated_at, created_at).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_products_changed_at "
+        "ON products (coalesce(updated_at, created_at), id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_products_changed_at")
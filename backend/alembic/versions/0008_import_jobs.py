@@ -0,0 +1,53 @@
+"""bulk product import jobs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 12:00:00
+
+Tracks farmers' CSV/XLSX product imports so large files can run in the
+background while the client polls for progress and row errors.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("import_jobs"):
+        return
+
+    status = postgresql.ENUM("PENDING", "RUNNING", "COMPLETED", "FAILED", name="importjobstatus")
+    status.create(bind, checkfirst=True)
+
+    op.create_table(
+        "import_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("farmer_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("status", postgresql.ENUM(name="importjobstatus", create_type=False), nullable=False),
+        sa.Column("total_rows", sa.Integer(), nullable=True),
+        sa.Column("processed_rows", sa.Integer(), nullable=False),
+        sa.Column("imported_count", sa.Integer(), nullable=False),
+        sa.Column("error_count", sa.Integer(), nullable=False),
+        sa.Column("errors", sa.JSON(), nullable=True),
+        sa.Column("failure_reason", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_import_jobs_id", "import_jobs", ["id"])
+    op.create_index("ix_import_jobs_farmer_id_created_at", "import_jobs", ["farmer_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("import_jobs")
+    op.execute("DROP TYPE IF EXISTS importjobstatus")
@@ -0,0 +1,86 @@
+"""product price history and OHLC rollups
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 12:00:00
+
+Append-only price points plus daily/weekly candles maintained by
+app.jobs.compact_price_history. Every existing product is seeded with one
+point at its current price.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    category = postgresql.ENUM(name="productcategory", create_type=False)
+
+    if not inspector.has_table("price_points"):
+        op.create_table(
+            "price_points",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("category", category, nullable=False),
+            sa.Column("location_state", sa.String(100), nullable=True),
+            sa.Column("price_per_unit", sa.Float(), nullable=False),
+            sa.Column("recorded_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index("ix_price_points_product_id_recorded_at", "price_points", ["product_id", "recorded_at"])
+        op.create_index(
+            "ix_price_points_category_state_recorded_at",
+            "price_points",
+            ["category", "location_state", "recorded_at"]
+        )
+        op.create_index("ix_price_points_recorded_at", "price_points", ["recorded_at"])
+
+        op.execute("""
+            INSERT INTO price_points (product_id, category, location_state, price_per_unit, recorded_at)
+            SELECT id, category, location_state, price_per_unit, coalesce(updated_at, created_at, now())
+            FROM products
+        """)
+
+    if not inspector.has_table("price_rollups"):
+        resolution = postgresql.ENUM("DAY", "WEEK", name="priceresolution")
+        resolution.create(bind, checkfirst=True)
+
+        op.create_table(
+            "price_rollups",
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("resolution", postgresql.ENUM(name="priceresolution", create_type=False), primary_key=True),
+            sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+            sa.Column("category", category, nullable=False),
+            sa.Column("location_state", sa.String(100), nullable=True),
+            sa.Column("open", sa.Float(), nullable=False),
+            sa.Column("high", sa.Float(), nullable=False),
+            sa.Column("low", sa.Float(), nullable=False),
+            sa.Column("close", sa.Float(), nullable=False),
+            sa.Column("samples", sa.Integer(), nullable=False),
+        )
+        op.create_index(
+            "ix_price_rollups_resolution_bucket_start",
+            "price_rollups",
+            ["resolution", "bucket_start"]
+        )
+        op.create_index(
+            "ix_price_rollups_category_state",
+            "price_rollups",
+            ["resolution", "category", "location_state", "bucket_start"]
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("price_rollups")
+    op.drop_table("price_points")
+    op.execute("DROP TYPE IF EXISTS priceresolution")
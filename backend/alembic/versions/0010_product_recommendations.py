@@ -0,0 +1,37 @@
+"""product recommendations lookup table
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 12:00:00
+
+Top-K co-purchase neighbours per product, filled by
+app.jobs.build_recommendations.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("product_recommendations"):
+        return
+
+    op.create_table(
+        "product_recommendations",
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("neighbour_ids", sa.JSON(), nullable=False),
+        sa.Column("scores", sa.JSON(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("product_recommendations")
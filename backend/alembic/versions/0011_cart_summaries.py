@@ -0,0 +1,56 @@
+"""cart summaries and cart item indexes
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 12:00:00
+
+Per-buyer cached cart item count and subtotal, backfilled from the current
+carts, plus the indexes the joined cart read and the summary rebuilds use.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_cart_items_buyer_id_product_id "
+        "ON cart_items (buyer_id, product_id)"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_cart_items_product_id ON cart_items (product_id)")
+
+    if sa.inspect(op.get_bind()).has_table("cart_summaries"):
+        return
+
+    op.create_table(
+        "cart_summaries",
+        sa.Column("buyer_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.Column("subtotal", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute(
+        """
+        INSERT INTO cart_summaries (buyer_id, item_count, subtotal)
+        SELECT cart_items.buyer_id,
+               count(cart_items.id),
+               sum(cart_items.quantity * catalog_listings.price_per_unit)
+        FROM cart_items
+        JOIN catalog_listings ON catalog_listings.product_id = cart_items.product_id
+        GROUP BY cart_items.buyer_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cart_summaries")
+    op.execute("DROP INDEX IF EXISTS ix_cart_items_product_id")
+    op.execute("DROP INDEX IF EXISTS ix_cart_items_buyer_id_product_id")
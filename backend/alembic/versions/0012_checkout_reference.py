@@ -0,0 +1,37 @@
+"""checkout reference on orders and payments
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 12:00:00
+
+Groups the per-farmer orders created by one multi-farmer checkout so a
+single payment transaction can cover all of them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ["orders", "payment_transactions"]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS checkout_reference VARCHAR(50)")
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_checkout_reference "
+            f"ON {table} (checkout_reference)"
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_checkout_reference")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS checkout_reference")
@@ -0,0 +1,54 @@
+"""inventory reservations
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-17 12:00:00
+
+Stock taken at checkout is recorded per order item so it can be committed
+when the farmer accepts, or returned on rejection, cancellation or expiry.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("inventory_reservations"):
+        return
+
+    status = postgresql.ENUM("HELD", "COMMITTED", "RELEASED", name="reservationstatus")
+    status.create(bind, checkfirst=True)
+
+    op.create_table(
+        "inventory_reservations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("quantity", sa.Float(), nullable=False),
+        sa.Column("status", postgresql.ENUM(name="reservationstatus", create_type=False), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("resolved_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_inventory_reservations_order_id", "inventory_reservations", ["order_id"])
+    op.create_index(
+        "ix_inventory_reservations_held_expires_at",
+        "inventory_reservations",
+        ["expires_at"],
+        postgresql_where=sa.text("status = 'HELD'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_reservations")
+    op.execute("DROP TYPE IF EXISTS reservationstatus")
@@ -0,0 +1,40 @@
+"""delivery zone rate table
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-17 12:00:00
+
+Last known delivery price per (pickup zone, delivery zone, weight band),
+so checkout can price deliveries without a live logistics quote.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("delivery_zone_rates"):
+        return
+
+    op.create_table(
+        "delivery_zone_rates",
+        sa.Column("pickup_zone", sa.String(100), primary_key=True),
+        sa.Column("delivery_zone", sa.String(100), primary_key=True),
+        sa.Column("weight_band", sa.Integer(), primary_key=True),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("estimated_time", sa.String(100), nullable=True),
+        sa.Column("provider", sa.String(50), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("delivery_zone_rates")
@@ -0,0 +1,75 @@
+"""order events
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-17 12:00:00
+
+Append-only log of order status transitions. Existing orders are backfilled
+from their created/accepted/shipped/delivered timestamps, plus their current
+status when it is not one of those (stamped at the order's last update).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0015"
+down_revision: Union[str, None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("order_events"):
+        return
+
+    op.create_table(
+        "order_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("from_status", postgresql.ENUM(name="orderstatus", create_type=False), nullable=True),
+        sa.Column("to_status", postgresql.ENUM(name="orderstatus", create_type=False), nullable=False),
+        sa.Column("actor_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("actor_role", sa.String(20), nullable=False, server_default="system"),
+        sa.Column("metadata", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_order_events_order_id_created_at", "order_events", ["order_id", "created_at", "id"])
+    op.create_index("ix_order_events_to_status_created_at", "order_events", ["to_status", "created_at"])
+
+    op.execute(
+        """
+        WITH steps AS (
+            SELECT id AS order_id, 'PENDING' AS status, COALESCE(created_at, now()) AS at, 0 AS step
+            FROM orders
+            UNION ALL
+            SELECT id, 'ACCEPTED', accepted_at, 1 FROM orders WHERE accepted_at IS NOT NULL
+            UNION ALL
+            SELECT id, 'SHIPPED', shipped_at, 2 FROM orders WHERE shipped_at IS NOT NULL
+            UNION ALL
+            SELECT id, 'DELIVERED', delivered_at, 3 FROM orders WHERE delivered_at IS NOT NULL
+            UNION ALL
+            SELECT id, status::text, COALESCE(updated_at, created_at, now()), 4
+            FROM orders
+            WHERE status::text NOT IN ('PENDING', 'ACCEPTED', 'SHIPPED', 'DELIVERED')
+        )
+        INSERT INTO order_events (order_id, from_status, to_status, actor_role, metadata, created_at)
+        SELECT
+            order_id,
+            (LAG(status) OVER (PARTITION BY order_id ORDER BY step))::orderstatus,
+            status::orderstatus,
+            'system',
+            '{"backfill": true}'::json,
+            at
+        FROM steps
+        ORDER BY order_id, step
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("order_events")
@@ -0,0 +1,49 @@
+"""order events notify
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-17 12:00:00
+
+Every order_events insert notifies the order_events channel with the event
+and the order's farmer, which feeds the farmers' live order streams in all
+workers. NOTIFY is delivered at commit, so rolled-back events never go out.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0016"
+down_revision: Union[str, None] = "0015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION order_events_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('order_events', json_build_object(
+                'id', NEW.id,
+                'order_id', NEW.order_id,
+                'farmer_id', (SELECT farmer_id FROM orders WHERE id = NEW.order_id),
+                'from_status', lower(NEW.from_status::text),
+                'to_status', lower(NEW.to_status::text),
+                'created_at', NEW.created_at
+            )::text);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS order_events_notify_trigger ON order_events")
+    op.execute("""
+        CREATE TRIGGER order_events_notify_trigger
+            AFTER INSERT ON order_events
+            FOR EACH ROW EXECUTE FUNCTION order_events_notify()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS order_events_notify_trigger ON order_events")
+    op.execute("DROP FUNCTION IF EXISTS order_events_notify()")
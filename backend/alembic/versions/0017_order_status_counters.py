@@ -0,0 +1,49 @@
+"""order status counters
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-17 12:00:00
+
+Per-user, per-status order counts for dashboard badges, backfilled from the
+orders table (each order counts for its buyer and its farmer).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0017"
+down_revision: Union[str, None] = "0016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("order_status_counters"):
+        return
+
+    op.create_table(
+        "order_status_counters",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("status", postgresql.ENUM(name="orderstatus", create_type=False), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.execute("""
+        INSERT INTO order_status_counters (user_id, status, count)
+        SELECT user_id, status, count(*)
+        FROM (
+            SELECT buyer_id AS user_id, status FROM orders
+            UNION ALL
+            SELECT farmer_id, status FROM orders
+        ) AS parties
+        GROUP BY user_id, status
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("order_status_counters")
@@ -0,0 +1,160 @@
+"""monthly partitions
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-17 12:00:00
+
+Converts payment_transactions and order_events into tables range-partitioned
+by month on created_at, with one partition per month from the oldest row to
+three months ahead plus a default partition. Rows are copied into the new
+table, the id sequences are kept, and indexes, foreign keys and the
+order_events notify trigger are recreated on the partitioned parent.
+Partitions for later months are created, and old ones archived, by
+app.jobs.maintain_partitions.
+
+The primary key becomes (id, created_at): Postgres requires the partition
+key in every unique constraint, so payment gateway references are indexed
+rather than unique (they are random, generated per payment).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0018"
+down_revision: Union[str, None] = "0017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMADE_MONTHS = 3
+
+TABLES = {
+    "payment_transactions": {
+        "foreign_keys": [
+            "FOREIGN KEY (order_id) REFERENCES orders (id)",
+            "FOREIGN KEY (user_id) REFERENCES users (id)",
+        ],
+        "indexes": [
+            "CREATE INDEX ix_payment_transactions_id ON payment_transactions (id)",
+            "CREATE INDEX ix_payment_transactions_created_at ON payment_transactions (created_at, id)",
+            "CREATE INDEX ix_payment_transactions_user_created_at "
+            "ON payment_transactions (user_id, created_at, id)",
+            "CREATE INDEX ix_payment_transactions_checkout_reference "
+            "ON payment_transactions (checkout_reference)",
+            "CREATE INDEX ix_payment_transactions_gateway_reference "
+            "ON payment_transactions (gateway_reference)",
+        ],
+    },
+    "order_events": {
+        "foreign_keys": [
+            "FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE",
+            "FOREIGN KEY (actor_id) REFERENCES users (id)",
+        ],
+        "indexes": [
+            "CREATE INDEX ix_order_events_order_id_created_at ON order_events (order_id, created_at, id)",
+            "CREATE INDEX ix_order_events_to_status_created_at ON order_events (to_status, created_at)",
+        ],
+    },
+}
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    return bind.execute(sa.text(
+        "SELECT c.relkind = 'p' FROM pg_class c "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = :table AND n.nspname = current_schema()"
+    ), {"table": table}).scalar()
+
+
+def _partition(table: str, spec: dict) -> None:
+    old = f"{table}_unpartitioned"
+    sequence = f"{table}_id_seq"
+
+    op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    # Keep the sequence (and so the ids) when the old table is dropped
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+
+    op.execute(f"""
+        CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        PARTITION BY RANGE (created_at)
+    """)
+    for foreign_key in spec["foreign_keys"]:
+        op.execute(f"ALTER TABLE {table} ADD {foreign_key}")
+
+    op.execute(f"""
+        DO $$
+        DECLARE
+            bucket timestamp;
+        BEGIN
+            FOR bucket IN SELECT generate_series(
+                date_trunc('month', COALESCE((SELECT min(created_at) FROM {old}), now()) AT TIME ZONE 'UTC'),
+                date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{PREMADE_MONTHS} months',
+                interval '1 month'
+            ) LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_' || to_char(bucket, 'YYYY_MM'),
+                    bucket AT TIME ZONE 'UTC',
+                    (bucket + interval '1 month') AT TIME ZONE 'UTC'
+                );
+            END LOOP;
+        END
+        $$
+    """)
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    op.execute(f"DROP TABLE {old}")
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+
+    # Created once the old table (and its index names) are gone
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)")
+    for index in spec["indexes"]:
+        op.execute(index)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table, spec in TABLES.items():
+        if not _is_partitioned(bind, table):
+            _partition(table, spec)
+
+    # Row triggers are dropped with the old table; on the parent they apply
+    # to every partition
+    op.execute("DROP TRIGGER IF EXISTS order_events_notify_trigger ON order_events")
+    op.execute("""
+        CREATE TRIGGER order_events_notify_trigger
+            AFTER INSERT ON order_events
+            FOR EACH ROW EXECUTE FUNCTION order_events_notify()
+    """)
+
+
+def downgrade() -> None:
+    # Partitions already archived by app.jobs.maintain_partitions are not restored
+    for table in TABLES:
+        old = f"{table}_partitioned"
+        sequence = f"{table}_id_seq"
+        op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        for foreign_key in TABLES[table]["foreign_keys"]:
+            op.execute(f"ALTER TABLE {table} ADD {foreign_key}")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        op.execute(f"DROP TABLE {old}")
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        for index in TABLES[table]["indexes"]:
+            op.execute(index)
+
+    op.execute(
+        "ALTER TABLE payment_transactions ADD CONSTRAINT payment_transactions_gateway_reference_key "
+        "UNIQUE (gateway_reference)"
+    )
+    op.execute("""
+        CREATE TRIGGER order_events_notify_trigger
+            AFTER INSERT ON order_events
+            FOR EACH ROW EXECUTE FUNCTION order_events_notify()
+    """)
@@ -0,0 +1,38 @@
+"""product deletions
+
+Revision ID: 0019
+Revises: 0018
+Create Date: 2026-10-17 12:00:00
+
+Tombstones of deleted products for the incremental catalog export. Products
+deleted before this migration are not recorded.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0019"
+down_revision: Union[str, None] = "0018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("product_deletions"):
+        return
+
+    op.create_table(
+        "product_deletions",
+        sa.Column("product_id", sa.Integer(), primary_key=True),
+        sa.Column("farmer_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+    op.create_index("ix_product_deletions_deleted_at", "product_deletions", ["deleted_at", "product_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("product_deletions")
@@ -0,0 +1,28 @@
+"""drop products season mask index
+
+Revision ID: 0020
+Revises: 0019
+Create Date: 2026-10-17 12:00:00
+
+Seasonal filters run on catalog_listings, so the plain btree index on
+products.season_mask was never used for a bitwise test. Databases that ran
+0005 before the index was taken out of it still have it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0020"
+down_revision: Union[str, None] = "0019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_products_season_mask")
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,34 @@
+"""catalog listings created_at not null
+
+Revision ID: 0021
+Revises: 0020
+Create Date: 2026-10-17 12:00:00
+
+created_at is the default keyset sort key of catalog pages, and a NULL in a
+cursor row ends pagination early. Databases that ran 0003 before the column
+was declared NOT NULL there get it here.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0021"
+down_revision: Union[str, None] = "0020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        UPDATE catalog_listings c
+        SET created_at = coalesce(p.created_at, now())
+        FROM products p
+        WHERE p.id = c.product_id AND c.created_at IS NULL
+    """)
+    op.execute("ALTER TABLE catalog_listings ALTER COLUMN created_at SET NOT NULL")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE catalog_listings ALTER COLUMN created_at DROP NOT NULL")
@@ -8,6 +8,7 @@ from app.api.v1.payments import router as payments_router
 from app.api.v1.disputes import router as disputes_router
 from app.api.v1.uploads import router as uploads_router
 from app.api.v1.tracking import router as tracking_router
+from app.api.v1.catalog import router as catalog_router
 
 router = APIRouter()
 
@@ -20,3 +21,4 @@ router.include_router(payments_router)
 router.include_router(disputes_router)
 router.include_router(uploads_router)
 router.include_router(tracking_router)
+router.include_router(catalog_router)
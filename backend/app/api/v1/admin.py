@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 from typing import List, Optional
@@ -11,6 +11,10 @@ from app.models.payment import PaymentTransaction, Withdrawal, TransactionStatus
 from app.models.dispute import Dispute, DisputeStatus, DisputeType
 from app.models.review import Review
 from app.schemas.dispute import DisputeCreate, DisputeUpdate, DisputeResponse
+from app.utils.helpers.pagination import keyset_paginate
+from app.services.catalog.projection import refresh_listings
+from app.services.catalog.cache import catalog_cache
+from app.services.orders.lifecycle import credit_delivery_earnings, status_durations, transition_order
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -217,6 +221,7 @@ async def update_product_status(
     
     product.status = new_status
     
+    refresh_listings(db, [product.id])
     db.commit()
     db.refresh(product)
     
@@ -232,8 +237,10 @@ async def update_product_status(
 
 @router.get("/orders")
 async def get_all_orders(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     status_filter: Optional[OrderStatus] = None,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
     db: Session = Depends(get_db)
@@ -244,7 +251,9 @@ async def get_all_orders(
     if status_filter:
         query = query.filter(Order.status == status_filter)
     
-    orders = query.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    orders = keyset_paginate(
+        query, [Order.created_at, Order.id], response, cursor=cursor, skip=skip, limit=limit
+    )
     
     result = []
     for order in orders:
@@ -265,10 +274,38 @@ async def get_all_orders(
     return result
 
 
+@router.get("/orders/sla")
+async def get_order_sla(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    farmer_id: Optional[int] = None,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: Session = Depends(get_db)
+):
+    """Time orders spend in each status, for orders placed in a period (default: last 30 days)"""
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=30)
+    
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    
+    return {
+        "start": start,
+        "end": end,
+        "farmer_id": farmer_id,
+        "statuses": status_durations(db, start, end, farmer_id)
+    }
+
+
 @router.get("/disputes")
 async def get_disputes(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     status_filter: Optional[DisputeStatus] = None,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
     db: Session = Depends(get_db)
@@ -279,7 +316,9 @@ async def get_disputes(
     if status_filter:
         query = query.filter(Dispute.status == status_filter)
     
-    disputes = query.order_by(Dispute.created_at.desc()).offset(skip).limit(limit).all()
+    disputes = keyset_paginate(
+        query, [Dispute.created_at, Dispute.id], response, cursor=cursor, skip=skip, limit=limit
+    )
     
     result = []
     for dispute in disputes:
@@ -308,10 +347,11 @@ async def get_disputes(
 async def resolve_dispute(
     dispute_id: int,
     resolution: str,
+    order_status: Optional[OrderStatus] = None,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
     db: Session = Depends(get_db)
 ):
-    """Resolve a dispute"""
+    """Resolve a dispute, optionally settling the order as delivered or cancelled"""
     dispute = db.query(Dispute).filter(Dispute.id == dispute_id).first()
     
     if not dispute:
@@ -320,6 +360,13 @@ async def resolve_dispute(
             detail="Dispute not found"
         )
     
+    if order_status is not None:
+        order = db.query(Order).filter(Order.id == dispute.order_id).with_for_update().first()
+        if order_status == OrderStatus.DELIVERED and order.status == OrderStatus.DISPUTED:
+            # Paid only if the order was not delivered before the dispute
+            credit_delivery_earnings(db, [order])
+        transition_order(db, order, order_status, current_user, {"dispute_id": dispute.id})
+    
     dispute.status = DisputeStatus.RESOLVED
     dispute.resolution = resolution
     dispute.resolved_at = datetime.utcnow()
@@ -342,8 +389,10 @@ async def resolve_dispute(
 
 @router.get("/withdrawals")
 async def get_withdrawals(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     status_filter: Optional[TransactionStatus] = None,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
     db: Session = Depends(get_db)
@@ -354,7 +403,9 @@ async def get_withdrawals(
     if status_filter:
         query = query.filter(Withdrawal.status == status_filter)
     
-    withdrawals = query.order_by(Withdrawal.created_at.desc()).offset(skip).limit(limit).all()
+    withdrawals = keyset_paginate(
+        query, [Withdrawal.created_at, Withdrawal.id], response, cursor=cursor, skip=skip, limit=limit
+    )
     
     result = []
     for withdrawal in withdrawals:
@@ -466,17 +517,32 @@ async def process_withdrawal(
     }
 
 
+@router.get("/cache/stats")
+async def get_cache_stats(
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Get catalog cache statistics for this worker process"""
+    return {"catalog": catalog_cache.stats()}
+
+
 @router.get("/transactions")
 async def get_all_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
     db: Session = Depends(get_db)
 ):
     """Get all payment transactions"""
-    transactions = db.query(PaymentTransaction).order_by(
-        PaymentTransaction.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    transactions = keyset_paginate(
+        db.query(PaymentTransaction),
+        [PaymentTransaction.created_at, PaymentTransaction.id],
+        response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit
+    )
     
     result = []
     for transaction in transactions:
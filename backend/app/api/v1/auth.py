@@ -6,6 +6,8 @@ from app.core.auth.password import verify_password, get_password_hash
 from app.schemas.user import UserCreate, Token, UserResponse, FarmerOnboarding
 from app.models.user import User, UserRole, VerificationStatus
 from app.schemas.payment import EarningsResponse
+from app.services.catalog.projection import refresh_farmer_listings
+from app.utils.helpers.geo import farm_location_fields
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -75,12 +77,15 @@ async def farmer_onboarding(
     user.farm_location_state = farmer_data.farm_location_state
     user.farm_location_city = farmer_data.farm_location_city
     user.farm_location_coordinates = farmer_data.farm_location_coordinates
+    for field, value in farm_location_fields(farmer_data.farm_location_coordinates).items():
+        setattr(user, field, value)
     user.bank_account_number = farmer_data.bank_account_number
     user.bank_name = farmer_data.bank_name
     user.account_name = farmer_data.account_name
     user.verification_document_url = farmer_data.verification_document_url
     user.verification_status = VerificationStatus.PENDING
     
+    refresh_farmer_listings(db, user)
     db.commit()
     db.refresh(user)
     
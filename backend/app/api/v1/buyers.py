@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy import and_, func
 from typing import List, Optional
 from app.core.config.db import get_db
 from app.core.auth.jwt import get_current_active_user, require_role
@@ -9,77 +9,214 @@ from app.models.product import Product, ProductStatus, ProductCategory
 from app.models.order import Order, OrderStatus, OrderItem, DeliveryType, PaymentStatus
 from app.models.cart import CartItem
 from app.models.review import Review
-from app.schemas.product import ProductResponse, ProductListItem
-from app.schemas.order import OrderCreate, OrderResponse, OrderListResponse
-from app.schemas.cart import CartItemCreate, CartItemUpdate, CartItemResponse, CartResponse
+from app.models.catalog import CatalogListing
+from app.schemas.product import (
+    ProductResponse,
+    ProductListItem,
+    NearbyProductItem,
+    CatalogFacets,
+    Suggestion,
+    PriceHistory,
+)
+from app.schemas.order import (
+    OrderCreate,
+    CheckoutCreate,
+    OrderResponse,
+    CheckoutResponse,
+    OrderListResponse,
+)
+from app.schemas.cart import (
+    CartItemCreate,
+    CartItemUpdate,
+    CartOperation,
+    CartItemResponse,
+    CartResponse,
+    CartSummaryResponse,
+)
 from app.schemas.review import ReviewCreate, ReviewResponse, FarmerRatingResponse
-from datetime import datetime
+from app.services.catalog.filters import apply_listing_filters
+from app.services.catalog.facets import compute_facets
+from app.services.catalog.nearby import nearby_listings, MAX_NEARBY_RADIUS_KM
+from app.services.catalog.price_history import price_history
+from app.services.catalog.recommendations import recommended_items, TOP_K
+from app.services.catalog.similarity import similar_items, TOP_K as SIMILAR_TOP_K
+from app.services.catalog.projection import get_list_item, listing_to_item
+from app.services.catalog.suggest import suggest_index
+from app.services.orders.cart import cart_rows, get_cart_summary, refresh_cart_summaries
+from app.services.orders.checkout import checkout as checkout_orders
+from app.services.orders.inventory import reserve_inventory
+from app.services.orders.lifecycle import record_orders_created
+from app.services.catalog.cache import (
+    catalog_cache,
+    page_key,
+    facets_key,
+    product_key,
+    product_tag,
+    farmer_tag,
+    ALL_PAGES_TAG,
+)
+from app.utils.helpers.pagination import keyset_paginate, NEXT_CURSOR_HEADER
+from datetime import datetime, timedelta, timezone
 import uuid
-import json
 
 router = APIRouter(prefix="/buyers", tags=["Buyers"])
 
+DEFAULT_PRICE_HISTORY_RANGE = timedelta(days=30)
+MAX_CART_OPERATIONS = 200
+
 
 @router.get("/products", response_model=List[ProductListItem])
 async def browse_products(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     category: Optional[ProductCategory] = None,
     search: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     state: Optional[str] = None,
     city: Optional[str] = None,
+    in_season: Optional[bool] = None,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    has_images: Optional[bool] = None,
     db: Session = Depends(get_db)
 ):
     """Browse product catalog with filters"""
-    query = db.query(Product).filter(Product.status == ProductStatus.ACTIVE)
-    
-    if category:
-        query = query.filter(Product.category == category)
-    
-    if search:
-        query = query.filter(
-            or_(
-                Product.name.ilike(f"%{search}%"),
-                Product.description.ilike(f"%{search}%")
-            )
-        )
-    
-    if min_price:
-        query = query.filter(Product.price_per_unit >= min_price)
-    
-    if max_price:
-        query = query.filter(Product.price_per_unit <= max_price)
-    
-    if state:
-        query = query.filter(Product.location_state.ilike(f"%{state}%"))
+    cache_key = page_key(
+        category=category,
+        search=search,
+        min_price=min_price,
+        max_price=max_price,
+        state=state,
+        city=city,
+        in_season=in_season,
+        month=month,
+        has_images=has_images,
+        cursor=cursor,
+        skip=skip,
+        limit=limit
+    )
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        items, next_cursor = cached
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return items
+    
+    query, rank = apply_listing_filters(
+        db.query(CatalogListing),
+        category=category,
+        search=search,
+        min_price=min_price,
+        max_price=max_price,
+        state=state,
+        city=city,
+        in_season=in_season,
+        month=month,
+        has_images=has_images
+    )
     
-    if city:
-        query = query.filter(Product.location_city.ilike(f"%{city}%"))
+    # Most relevant first when searching, otherwise newest first
+    if rank is not None:
+        sort_keys = [rank, CatalogListing.product_id]
+    else:
+        sort_keys = [CatalogListing.created_at, CatalogListing.product_id]
+    listings = keyset_paginate(query, sort_keys, response, cursor=cursor, skip=skip, limit=limit)
+    items = [listing_to_item(listing) for listing in listings]
+    
+    tags = {ALL_PAGES_TAG}
+    for listing in listings:
+        tags.add(product_tag(listing.product_id))
+        tags.add(farmer_tag(listing.farmer_id))
+    catalog_cache.set(cache_key, (items, response.headers.get(NEXT_CURSOR_HEADER)), tags=tags)
+    
+    return items
+
+
+@router.get("/products/suggest", response_model=List[Suggestion])
+async def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=25)
+):
+    """Get typeahead suggestions (product names, categories, farms) for a prefix"""
+    return suggest_index.suggest(q, limit)
+
+
+@router.get("/products/facets", response_model=CatalogFacets)
+async def get_product_facets(
+    category: Optional[ProductCategory] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    in_season: Optional[bool] = None,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    has_images: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
+    """Get category, location and price bucket counts for a catalog filter set"""
+    filters = dict(
+        category=category,
+        search=search,
+        min_price=min_price,
+        max_price=max_price,
+        state=state,
+        city=city,
+        in_season=in_season,
+        month=month,
+        has_images=has_images
+    )
     
-    products = query.offset(skip).limit(limit).all()
+    cache_key = facets_key(**filters)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
-    # Convert to ProductListItem with farmer name
-    result = []
-    for product in products:
-        farmer = db.query(User).filter(User.id == product.farmer_id).first()
-        item = ProductListItem(
-            id=product.id,
-            name=product.name,
-            category=product.category,
-            price_per_unit=product.price_per_unit,
-            unit=product.unit,
-            available_quantity=product.available_quantity,
-            location_state=product.location_state,
-            location_city=product.location_city,
-            image_urls=json.loads(product.image_urls) if product.image_urls else None,
-            farmer_id=product.farmer_id,
-            farmer_name=f"{farmer.first_name} {farmer.last_name}" if farmer else None
-        )
-        result.append(item)
+    facets = compute_facets(db, **filters)
+    # Counts only move when listings enter, leave or change a filtered field
+    catalog_cache.set(cache_key, facets, tags=[ALL_PAGES_TAG])
     
-    return result
+    return facets
+
+
+@router.get("/products/nearby", response_model=List[NearbyProductItem])
+async def browse_nearby_products(
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(25.0, gt=0, le=MAX_NEARBY_RADIUS_KM),
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    category: Optional[ProductCategory] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_season: Optional[bool] = None,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    has_images: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
+    """Browse products from farms within radius_km of a point, nearest first"""
+    return nearby_listings(
+        db,
+        latitude=lat,
+        longitude=lng,
+        radius_km=radius_km,
+        response=response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        category=category,
+        search=search,
+        min_price=min_price,
+        max_price=max_price,
+        in_season=in_season,
+        month=month,
+        has_images=has_images
+    )
 
 
 @router.get("/products/{product_id}", response_model=ProductResponse)
@@ -88,6 +225,10 @@ async def get_product_details(
     db: Session = Depends(get_db)
 ):
     """Get detailed product information"""
+    cached = catalog_cache.get(product_key(product_id))
+    if cached is not None:
+        return cached
+    
     product = db.query(Product).filter(
         Product.id == product_id,
         Product.status == ProductStatus.ACTIVE
@@ -99,7 +240,72 @@ async def get_product_details(
             detail="Product not found"
         )
     
-    return product
+    details = ProductResponse.model_validate(product)
+    catalog_cache.set(product_key(product_id), details, tags=[product_tag(product_id)])
+    
+    return details
+
+
+@router.get("/products/{product_id}/recommendations", response_model=List[ProductListItem])
+async def get_product_recommendations(
+    product_id: int,
+    limit: int = Query(10, ge=1, le=TOP_K),
+    db: Session = Depends(get_db)
+):
+    """Get products frequently bought together with this one"""
+    return recommended_items(db, [product_id], limit)
+
+
+@router.get("/products/{product_id}/similar", response_model=List[ProductListItem])
+async def get_similar_products(
+    product_id: int,
+    limit: int = Query(10, ge=1, le=SIMILAR_TOP_K),
+    db: Session = Depends(get_db)
+):
+    """Get products with similar names, descriptions, category and location"""
+    return similar_items(db, product_id, limit)
+
+
+def _price_range(start: Optional[datetime], end: Optional[datetime]):
+    end = end or datetime.now(timezone.utc)
+    start = start or end - DEFAULT_PRICE_HISTORY_RANGE
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    return start, end
+
+
+@router.get("/products/{product_id}/price-history", response_model=PriceHistory)
+async def get_product_price_history(
+    product_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Get a product's price candles over a time range (default: last 30 days)"""
+    if not db.query(Product.id).filter(Product.id == product_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    
+    start, end = _price_range(start, end)
+    return price_history(db, start, end, product_id=product_id)
+
+
+@router.get("/price-trends", response_model=PriceHistory)
+async def get_price_trends(
+    category: Optional[ProductCategory] = None,
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Get average price candles for a category and/or state over a time range"""
+    start, end = _price_range(start, end)
+    return price_history(db, start, end, category=category, state=state)
 
 
 @router.get("/cart", response_model=CartResponse)
@@ -108,43 +314,23 @@ async def get_cart(
     db: Session = Depends(get_db)
 ):
     """Get current user's cart"""
-    cart_items = db.query(CartItem).filter(
-        CartItem.buyer_id == current_user.id
-    ).all()
-    
+    return _cart_response(db, current_user.id)
+
+
+def _cart_response(db: Session, buyer_id: int) -> CartResponse:
+    # Inactive products have no catalog row and are left out of the cart view
     items = []
     subtotal = 0.0
     
-    for cart_item in cart_items:
-        product = db.query(Product).filter(Product.id == cart_item.product_id).first()
-        if product and product.status == ProductStatus.ACTIVE:
-            item_subtotal = cart_item.quantity * product.price_per_unit
-            subtotal += item_subtotal
-            
-            # Create ProductListItem for cart item
-            farmer = db.query(User).filter(User.id == product.farmer_id).first()
-            product_item = ProductListItem(
-                id=product.id,
-                name=product.name,
-                category=product.category,
-                price_per_unit=product.price_per_unit,
-                unit=product.unit,
-                available_quantity=product.available_quantity,
-                location_state=product.location_state,
-                location_city=product.location_city,
-                image_urls=json.loads(product.image_urls) if product.image_urls else None,
-                farmer_id=product.farmer_id,
-                farmer_name=f"{farmer.first_name} {farmer.last_name}" if farmer else None
-            )
-            
-            cart_item_response = CartItemResponse(
-                id=cart_item.id,
-                product_id=cart_item.product_id,
-                quantity=cart_item.quantity,
-                product=product_item,
-                created_at=cart_item.created_at
-            )
-            items.append(cart_item_response)
+    for cart_item, listing in cart_rows(db, buyer_id):
+        subtotal += cart_item.quantity * listing.price_per_unit
+        items.append(CartItemResponse(
+            id=cart_item.id,
+            product_id=cart_item.product_id,
+            quantity=cart_item.quantity,
+            product=listing_to_item(listing),
+            created_at=cart_item.created_at
+        ))
     
     return CartResponse(
         items=items,
@@ -153,6 +339,31 @@ async def get_cart(
     )
 
 
+@router.get("/cart/summary", response_model=CartSummaryResponse)
+async def get_cart_summary_view(
+    current_user: User = Depends(require_role([UserRole.BUYER])),
+    db: Session = Depends(get_db)
+):
+    """Get the item count and subtotal of the current user's cart"""
+    total_items, subtotal = get_cart_summary(db, current_user.id)
+    return CartSummaryResponse(total_items=total_items, subtotal=subtotal)
+
+
+@router.get("/cart/recommendations", response_model=List[ProductListItem])
+async def get_cart_recommendations(
+    limit: int = Query(10, ge=1, le=TOP_K),
+    current_user: User = Depends(require_role([UserRole.BUYER])),
+    db: Session = Depends(get_db)
+):
+    """Get products frequently bought together with what is in the cart"""
+    product_ids = [
+        product_id for product_id, in db.query(CartItem.product_id).filter(
+            CartItem.buyer_id == current_user.id
+        )
+    ]
+    return recommended_items(db, product_ids, limit)
+
+
 @router.post("/cart", response_model=CartItemResponse, status_code=status.HTTP_201_CREATED)
 async def add_to_cart(
     cart_item_data: CartItemCreate,
@@ -185,23 +396,11 @@ async def add_to_cart(
     
     if existing_item:
         existing_item.quantity += cart_item_data.quantity
+        refresh_cart_summaries(db, buyer_ids=[current_user.id])
         db.commit()
         db.refresh(existing_item)
         
-        farmer = db.query(User).filter(User.id == product.farmer_id).first()
-        product_item = ProductListItem(
-            id=product.id,
-            name=product.name,
-            category=product.category,
-            price_per_unit=product.price_per_unit,
-            unit=product.unit,
-            available_quantity=product.available_quantity,
-            location_state=product.location_state,
-            location_city=product.location_city,
-            image_urls=json.loads(product.image_urls) if product.image_urls else None,
-            farmer_id=product.farmer_id,
-            farmer_name=f"{farmer.first_name} {farmer.last_name}" if farmer else None
-        )
+        product_item = get_list_item(db, product)
         
         return CartItemResponse(
             id=existing_item.id,
@@ -218,23 +417,11 @@ async def add_to_cart(
     )
     
     db.add(cart_item)
+    refresh_cart_summaries(db, buyer_ids=[current_user.id])
     db.commit()
     db.refresh(cart_item)
     
-    farmer = db.query(User).filter(User.id == product.farmer_id).first()
-    product_item = ProductListItem(
-        id=product.id,
-        name=product.name,
-        category=product.category,
-        price_per_unit=product.price_per_unit,
-        unit=product.unit,
-        available_quantity=product.available_quantity,
-        location_state=product.location_state,
-        location_city=product.location_city,
-        image_urls=json.loads(product.image_urls) if product.image_urls else None,
-        farmer_id=product.farmer_id,
-        farmer_name=f"{farmer.first_name} {farmer.last_name}" if farmer else None
-    )
+    product_item = get_list_item(db, product)
     
     return CartItemResponse(
         id=cart_item.id,
@@ -245,6 +432,77 @@ async def add_to_cart(
     )
 
 
+@router.patch("/cart", response_model=CartResponse)
+async def batch_update_cart(
+    operations: List[CartOperation],
+    current_user: User = Depends(require_role([UserRole.BUYER])),
+    db: Session = Depends(get_db)
+):
+    """Apply add/set/remove operations to the cart in one transaction"""
+    if not operations or len(operations) > MAX_CART_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Send between 1 and {MAX_CART_OPERATIONS} operations"
+        )
+    
+    product_ids = {operation.product_id for operation in operations}
+    cart_items = {}
+    for cart_item in db.query(CartItem).filter(
+        CartItem.buyer_id == current_user.id,
+        CartItem.product_id.in_(product_ids)
+    ):
+        cart_items.setdefault(cart_item.product_id, cart_item)
+    
+    # Replay the operations on the current quantities; 0 means not in the cart
+    quantities = {product_id: 0.0 for product_id in product_ids}
+    quantities.update({product_id: cart_item.quantity for product_id, cart_item in cart_items.items()})
+    for operation in operations:
+        if operation.op == "add":
+            quantities[operation.product_id] += operation.quantity
+        elif operation.op == "set":
+            quantities[operation.product_id] = operation.quantity
+        else:
+            quantities[operation.product_id] = 0.0
+    
+    # One availability check for every product left in the cart
+    wanted = {product_id: quantity for product_id, quantity in quantities.items() if quantity > 0}
+    available = dict(
+        db.query(Product.id, Product.available_quantity).filter(
+            Product.id.in_(wanted),
+            Product.status == ProductStatus.ACTIVE
+        )
+    ) if wanted else {}
+    
+    missing = sorted(product_id for product_id in wanted if product_id not in available)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Products not found or not available: {', '.join(map(str, missing))}"
+        )
+    
+    short = sorted(product_id for product_id, quantity in wanted.items() if quantity > available[product_id])
+    if short:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient quantity available for products: {', '.join(map(str, short))}"
+        )
+    
+    for product_id, quantity in quantities.items():
+        cart_item = cart_items.get(product_id)
+        if quantity <= 0:
+            if cart_item:
+                db.delete(cart_item)
+        elif cart_item:
+            cart_item.quantity = quantity
+        else:
+            db.add(CartItem(buyer_id=current_user.id, product_id=product_id, quantity=quantity))
+    
+    refresh_cart_summaries(db, buyer_ids=[current_user.id])
+    db.commit()
+    
+    return _cart_response(db, current_user.id)
+
+
 @router.put("/cart/{cart_item_id}", response_model=CartItemResponse)
 async def update_cart_item(
     cart_item_id: int,
@@ -272,23 +530,11 @@ async def update_cart_item(
         )
     
     cart_item.quantity = cart_item_data.quantity
+    refresh_cart_summaries(db, buyer_ids=[current_user.id])
     db.commit()
     db.refresh(cart_item)
     
-    farmer = db.query(User).filter(User.id == product.farmer_id).first()
-    product_item = ProductListItem(
-        id=product.id,
-        name=product.name,
-        category=product.category,
-        price_per_unit=product.price_per_unit,
-        unit=product.unit,
-        available_quantity=product.available_quantity,
-        location_state=product.location_state,
-        location_city=product.location_city,
-        image_urls=json.loads(product.image_urls) if product.image_urls else None,
-        farmer_id=product.farmer_id,
-        farmer_name=f"{farmer.first_name} {farmer.last_name}" if farmer else None
-    )
+    product_item = get_list_item(db, product)
     
     return CartItemResponse(
         id=cart_item.id,
@@ -318,9 +564,28 @@ async def remove_from_cart(
         )
     
     db.delete(cart_item)
+    refresh_cart_summaries(db, buyer_ids=[current_user.id])
     db.commit()
 
 
+@router.post("/checkout", response_model=CheckoutResponse, status_code=status.HTTP_201_CREATED)
+async def checkout(
+    checkout_data: CheckoutCreate,
+    current_user: User = Depends(require_role([UserRole.BUYER])),
+    db: Session = Depends(get_db)
+):
+    """Check out the cart (or the given items) as one order per farmer, paid together"""
+    orders = await checkout_orders(db, current_user, checkout_data)
+    
+    return CheckoutResponse(
+        checkout_reference=orders[0].checkout_reference,
+        orders=orders,
+        subtotal=sum(order.subtotal for order in orders),
+        delivery_fee=sum(order.delivery_fee for order in orders),
+        total_amount=sum(order.total_amount for order in orders)
+    )
+
+
 @router.post("/orders", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
@@ -329,7 +594,7 @@ async def create_order(
 ):
     """Create a new order from cart items or direct order"""
     from app.core.config.settings import settings
-    from app.services.logistics.kwik import get_delivery_quote
+    from app.services.logistics.quotes import delivery_fee as quote_delivery_fee, parcel_weight
     
     # Validate all items and get products
     order_items = []
@@ -384,16 +649,14 @@ async def create_order(
     # Get delivery fee if delivery
     delivery_fee = 0.0
     if order_data.delivery_type == DeliveryType.DELIVERY:
-        # Get logistics quote
-        try:
-            quote = await get_delivery_quote(
-                pickup_location=order_data.delivery_state or "",
-                delivery_location=order_data.delivery_city or ""
-            )
-            delivery_fee = quote.get("price", 0.0)
-        except:
-            # If logistics API fails, use default fee
-            delivery_fee = 500.0  # Default delivery fee
+        # Zone rate for the farm's state to the buyer's state
+        farmer = db.query(User).filter(User.id == farmer_id).first()
+        delivery_fee = await quote_delivery_fee(
+            db,
+            farmer.farm_location_state if farmer else None,
+            order_data.delivery_state,
+            parcel_weight((item["product"].unit, item["quantity"]) for item in order_items)
+        )
     
     total_amount = subtotal + delivery_fee
     
@@ -424,6 +687,7 @@ async def create_order(
     
     db.add(order)
     db.flush()
+    record_orders_created(db, [order.id], current_user)
     
     # Create order items
     for item_data in order_items:
@@ -437,6 +701,12 @@ async def create_order(
         )
         db.add(order_item)
     
+    # Hold the stock until the farmer accepts or rejects the order
+    reserve_inventory(db, [
+        (order.id, item_data["product"].id, item_data["quantity"])
+        for item_data in order_items
+    ])
+    
     # Clear cart items for this farmer
     cart_items = db.query(CartItem).filter(
         CartItem.buyer_id == current_user.id,
@@ -446,6 +716,7 @@ async def create_order(
     for cart_item in cart_items:
         db.delete(cart_item)
     
+    refresh_cart_summaries(db, buyer_ids=[current_user.id])
     db.commit()
     db.refresh(order)
     
@@ -454,8 +725,10 @@ async def create_order(
 
 @router.get("/orders", response_model=List[OrderListResponse])
 async def get_my_orders(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     status_filter: Optional[OrderStatus] = None,
     current_user: User = Depends(require_role([UserRole.BUYER])),
     db: Session = Depends(get_db)
@@ -466,7 +739,9 @@ async def get_my_orders(
     if status_filter:
         query = query.filter(Order.status == status_filter)
     
-    orders = query.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    orders = keyset_paginate(
+        query, [Order.created_at, Order.id], response, cursor=cursor, skip=skip, limit=limit
+    )
     
     result = []
     for order in orders:
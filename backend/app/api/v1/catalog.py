@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.core.auth.api_key import require_partner_key
+from app.services.catalog.export import stream_csv, stream_ndjson
+from datetime import datetime, timezone
+
+router = APIRouter(prefix="/catalog", tags=["Catalog"])
+
+EXPORT_STARTED_HEADER = "X-Export-Started-At"
+
+
+@router.get("/export")
+async def export_catalog(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    changed_since: Optional[datetime] = None,
+    api_key: str = Depends(require_partner_key)
+):
+    """Stream the active catalog, or every product changed since a timestamp"""
+    # Clients pass this back as changed_since on their next incremental run
+    started_at = datetime.now(timezone.utc).isoformat()
+    
+    if format == "csv":
+        return StreamingResponse(
+            stream_csv(changed_since),
+            media_type="text/csv",
+            headers={
+                "Content-Disposition": "attachment; filename=catalog.csv",
+                EXPORT_STARTED_HEADER: started_at
+            }
+        )
+    
+    return StreamingResponse(
+        stream_ndjson(changed_since),
+        media_type="application/x-ndjson",
+        headers={EXPORT_STARTED_HEADER: started_at}
+    )
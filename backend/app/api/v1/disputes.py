@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.config.db import get_db
 from app.core.auth.jwt import get_current_active_user, require_role
 from app.models.user import User, UserRole
-from app.models.order import Order, OrderStatus
+from app.models.order import Order
 from app.models.dispute import Dispute, DisputeStatus
 from app.schemas.dispute import DisputeCreate, DisputeUpdate, DisputeResponse
+from app.services.orders.lifecycle import dispute_order
+from app.utils.helpers.pagination import keyset_paginate
 
 router = APIRouter(prefix="/disputes", tags=["Disputes"])
 
@@ -58,8 +60,7 @@ async def create_dispute(
         description=dispute_data.description
     )
     
-    # Update order status
-    order.status = OrderStatus.DISPUTED
+    dispute_order(db, order, current_user, {"dispute_type": dispute_data.dispute_type.value})
     
     db.add(dispute)
     db.commit()
@@ -70,16 +71,21 @@ async def create_dispute(
 
 @router.get("/", response_model=List[DisputeResponse])
 async def get_my_disputes(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get disputes where user is involved"""
-    disputes = db.query(Dispute).filter(
+    query = db.query(Dispute).filter(
         (Dispute.raised_by_id == current_user.id) |
         (Dispute.disputed_user_id == current_user.id)
-    ).order_by(Dispute.created_at.desc()).offset(skip).limit(limit).all()
+    )
+    disputes = keyset_paginate(
+        query, [Dispute.created_at, Dispute.id], response, cursor=cursor, skip=skip, limit=limit
+    )
     
     return disputes
 
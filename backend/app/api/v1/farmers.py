@@ -1,22 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File, BackgroundTasks, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy import func, insert, update
 from typing import List, Optional
 from app.core.config.db import get_db
+from app.core.config.settings import settings
 from app.core.auth.jwt import get_current_active_user, require_role
 from app.models.user import User, UserRole
-from app.models.product import Product, ProductStatus, ProductCategory
-from app.models.order import Order, OrderStatus, OrderItem, DeliveryType, PaymentStatus
-from app.models.payment import Withdrawal, TransactionStatus
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
-from app.schemas.order import OrderResponse, OrderListResponse, OrderStatusUpdate
+from app.models.product import Product, ProductCategory
+from app.models.order import Order, OrderStatus, OrderItem, PaymentStatus
+from app.models.payment import PaymentTransaction, TransactionType, Withdrawal, TransactionStatus
+from app.models.import_job import ImportJob
+from app.models.product_deletion import ProductDeletion
+from app.schemas.product import (
+    ProductCreate,
+    ProductUpdate,
+    ProductResponse,
+    ProductBatchUpdateItem,
+    InSeasonSummary,
+)
+from app.schemas.order import (
+    OrderResponse,
+    OrderListResponse,
+    OrderStatusUpdate,
+    OrderStatusBatchItem,
+    OrderStatusBatchResult,
+)
 from app.schemas.payment import WithdrawalRequest, WithdrawalResponse
-from app.schemas.user import FarmerProfileUpdate
-from datetime import datetime
+from app.schemas.user import FarmerProfileUpdate, UserResponse
+from app.schemas.import_job import ImportJobResponse
+from app.services.catalog.projection import refresh_listings, refresh_farmer_listings
+from app.services.catalog.cache import schedule_invalidation
+from app.services.catalog.product_import import (
+    IMPORT_EXTENSIONS,
+    run_import_job,
+    save_import_upload,
+)
+from app.services.catalog.price_history import record_prices
+from app.services.catalog.products import inventory_changes, new_product_fields
+from app.services.catalog.seasons import in_season_summary
+from app.services.logistics.bookings import book_deliveries, book_delivery, needs_booking
+from app.services.orders.inbox import events_since, inbox_broker, sse_message
+from app.services.orders.inventory import (
+    commit_order_reservations,
+    commit_reservations,
+    release_order_reservations,
+)
+from app.services.orders.lifecycle import (
+    credit_delivery_earnings,
+    transition_error,
+    transition_order,
+    transition_orders,
+)
+from app.utils.helpers.geo import farm_location_fields
+from app.utils.helpers.pagination import keyset_paginate
+from app.utils.helpers.seasons import current_month, season_mask
+from pathlib import Path
+import asyncio
 import uuid
 
 router = APIRouter(prefix="/farmers", tags=["Farmers"])
 
+MAX_BATCH_UPDATE_ITEMS = 500
+
 
 @router.get("/products", response_model=List[ProductResponse])
 async def get_my_products(
@@ -40,36 +87,152 @@ async def create_product(
     db: Session = Depends(get_db)
 ):
     """Create a new product listing"""
-    # Import json for image_urls
-    import json
-    
-    product = Product(
-        farmer_id=current_user.id,
-        name=product_data.name,
-        description=product_data.description,
-        category=product_data.category,
-        price_per_unit=product_data.price_per_unit,
-        unit=product_data.unit,
-        available_quantity=product_data.available_quantity,
-        total_quantity=product_data.available_quantity,
-        freshness_level=product_data.freshness_level,
-        harvest_date=product_data.harvest_date,
-        expiry_date=product_data.expiry_date,
-        location_state=product_data.location_state or current_user.farm_location_state,
-        location_city=product_data.location_city or current_user.farm_location_city,
-        is_seasonal=product_data.is_seasonal,
-        season_months=product_data.season_months,
-        image_urls=json.dumps(product_data.image_urls) if product_data.image_urls else None,
-        status=ProductStatus.ACTIVE
-    )
+    product = Product(**new_product_fields(product_data, current_user))
     
     db.add(product)
+    db.flush()
+    record_prices(db, [product.id])
+    refresh_listings(db, [product.id])
     db.commit()
     db.refresh(product)
     
     return product
 
 
+@router.post("/products/import", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_products(
+    background_tasks: BackgroundTasks,
+    response: Response,
+    file: UploadFile = File(...),
+    current_user: User = Depends(require_role([UserRole.FARMER])),
+    db: Session = Depends(get_db)
+):
+    """Bulk-create product listings from a CSV or XLSX file"""
+    extension = Path(file.filename or "").suffix.lower()
+    if extension not in IMPORT_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type not allowed. Allowed types: {', '.join(sorted(IMPORT_EXTENSIONS))}"
+        )
+    
+    try:
+        path, size = await save_import_upload(file)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    
+    job = ImportJob(farmer_id=current_user.id, filename=file.filename)
+    db.add(job)
+    db.commit()
+    
+    # Small files finish within the request; larger ones are polled
+    if size <= settings.PRODUCT_IMPORT_INLINE_MAX_BYTES:
+        await run_in_threadpool(run_import_job, job.id, path)
+        response.status_code = status.HTTP_201_CREATED
+    else:
+        background_tasks.add_task(run_import_job, job.id, path)
+    
+    db.refresh(job)
+    return job
+
+
+@router.get("/products/import/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(
+    job_id: int,
+    current_user: User = Depends(require_role([UserRole.FARMER])),
+    db: Session = Depends(get_db)
+):
+    """Get the progress and row errors of a bulk import"""
+    job = db.query(ImportJob).filter(
+        ImportJob.id == job_id,
+        ImportJob.farmer_id == current_user.id
+    ).first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    
+    return job
+
+
+@router.put("/products/batch", response_model=List[ProductResponse])
+async def batch_update_products(
+    items: List[ProductBatchUpdateItem],
+    current_user: User = Depends(require_role([UserRole.FARMER])),
+    db: Session = Depends(get_db)
+):
+    """Update price, stock and status of many products in one transaction"""
+    if not items or len(items) > MAX_BATCH_UPDATE_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Send between 1 and {MAX_BATCH_UPDATE_ITEMS} items"
+        )
+    
+    product_ids = [item.product_id for item in items]
+    if len(set(product_ids)) != len(product_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each product can only appear once per batch"
+        )
+    
+    # One ownership check, locking the rows so stock changes from order
+    # acceptance cannot interleave with the update
+    current = {
+        row.id: row
+        for row in db.query(
+            Product.id,
+            Product.price_per_unit,
+            Product.available_quantity,
+            Product.total_quantity,
+            Product.status
+        ).filter(
+            Product.id.in_(product_ids),
+            Product.farmer_id == current_user.id
+        ).with_for_update()
+    }
+    
+    missing = [product_id for product_id in product_ids if product_id not in current]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Products not found: {', '.join(map(str, missing))}"
+        )
+    
+    # Every row sets the same columns so the UPDATE runs as one executemany
+    rows = []
+    for item in items:
+        product = current[item.product_id]
+        changes = item.dict(exclude_unset=True, exclude={"product_id"})
+        row = {
+            "id": product.id,
+            "price_per_unit": product.price_per_unit,
+            "available_quantity": product.available_quantity,
+            "total_quantity": product.total_quantity,
+            "status": product.status,
+        }
+        row.update({field: value for field, value in changes.items() if value is not None})
+        row.update(inventory_changes(product.total_quantity, changes))
+        rows.append(row)
+    
+    db.execute(update(Product), rows)
+    record_prices(db, [
+        row["id"] for row in rows
+        if row["price_per_unit"] != current[row["id"]].price_per_unit
+    ])
+    refresh_listings(db, product_ids)
+    db.commit()
+    
+    products = {
+        product.id: product
+        for product in db.query(Product).filter(Product.id.in_(product_ids))
+    }
+    return [products[product_id] for product_id in product_ids]
+
+
 @router.get("/products/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: int,
@@ -110,21 +273,24 @@ async def update_product(
             detail="Product not found"
         )
     
-    import json
-    
     # Update fields
     update_data = product_data.dict(exclude_unset=True)
-    if "image_urls" in update_data and update_data["image_urls"]:
-        update_data["image_urls"] = json.dumps(update_data["image_urls"])
+    if "image_urls" in update_data:
+        update_data["image_urls"] = update_data["image_urls"] or None
     
+    old_price = product.price_per_unit
     for field, value in update_data.items():
         setattr(product, field, value)
     
-    if "available_quantity" in update_data:
-        product.total_quantity = max(product.total_quantity, update_data["available_quantity"])
-        if update_data["available_quantity"] <= 0:
-            product.status = ProductStatus.SOLD_OUT
+    if "is_seasonal" in update_data or "season_months" in update_data:
+        product.season_mask = season_mask(product.is_seasonal, product.season_months)
     
+    for field, value in inventory_changes(product.total_quantity, update_data).items():
+        setattr(product, field, value)
+    
+    if product.price_per_unit != old_price:
+        record_prices(db, [product.id])
+    refresh_listings(db, [product.id])
     db.commit()
     db.refresh(product)
     
@@ -150,13 +316,42 @@ async def delete_product(
         )
     
     db.delete(product)
+    # Tells incremental catalog exports to drop the product
+    db.add(ProductDeletion(product_id=product_id, farmer_id=current_user.id))
+    refresh_listings(db, [product_id])
+    # The listing row went with the product, so refresh_listings saw no change
+    schedule_invalidation(db, product_ids=[product_id], all_pages=True)
     db.commit()
 
 
+@router.get("/in-season", response_model=InSeasonSummary)
+async def get_in_season_products(
+    month: Optional[int] = Query(None, ge=1, le=12),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(require_role([UserRole.FARMER])),
+    db: Session = Depends(get_db)
+):
+    """Get the seasonal products listed in the farmer's state for a month (default: this month)"""
+    if not current_user.farm_location_state:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Set your farm location state to see what is in season"
+        )
+    
+    return in_season_summary(
+        db,
+        state=current_user.farm_location_state,
+        month=month or current_month(),
+        limit=limit
+    )
+
+
 @router.get("/orders", response_model=List[OrderListResponse])
 async def get_my_orders(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     status_filter: Optional[OrderStatus] = None,
     current_user: User = Depends(require_role([UserRole.FARMER])),
     db: Session = Depends(get_db)
@@ -167,11 +362,58 @@ async def get_my_orders(
     if status_filter:
         query = query.filter(Order.status == status_filter)
     
-    orders = query.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    orders = keyset_paginate(
+        query, [Order.created_at, Order.id], response, cursor=cursor, skip=skip, limit=limit
+    )
     
     return orders
 
 
+@router.get("/orders/stream")
+async def stream_orders(
+    last_event_id: Optional[int] = Header(None),
+    current_user: User = Depends(require_role([UserRole.FARMER])),
+    db: Session = Depends(get_db)
+):
+    """Push new orders and order status changes as Server-Sent Events"""
+    farmer_id = current_user.id
+    queue = inbox_broker.subscribe(farmer_id)
+    missed = events_since(db, farmer_id, last_event_id) if last_event_id is not None else []
+    
+    # Hand the request's database connections back before streaming, so an
+    # open stream holds none
+    db.close()
+    auth_session = object_session(current_user)
+    if auth_session:
+        auth_session.close()
+    
+    async def events():
+        # Events can commit (and be notified) out of id order, so live events
+        # are checked only against those already replayed, not the highest id
+        replayed = {event["id"] for event in missed}
+        try:
+            for event in missed:
+                yield sse_message(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), settings.ORDER_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                if event["id"] not in replayed:
+                    yield sse_message(event)
+        finally:
+            inbox_broker.unsubscribe(farmer_id, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
@@ -193,6 +435,115 @@ async def get_order(
     return order
 
 
+@router.put("/orders/batch/status", response_model=List[OrderStatusBatchResult])
+async def batch_update_order_status(
+    items: List[OrderStatusBatchItem],
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(require_role([UserRole.FARMER])),
+    db: Session = Depends(get_db)
+):
+    """Update the status of many orders in one transaction, with a result per order"""
+    if not items or len(items) > MAX_BATCH_UPDATE_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Send between 1 and {MAX_BATCH_UPDATE_ITEMS} items"
+        )
+    
+    order_ids = [item.order_id for item in items]
+    if len(set(order_ids)) != len(order_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each order can only appear once per batch"
+        )
+    
+    # Locked in id order so overlapping batches cannot deadlock
+    orders = {
+        order.id: order
+        for order in db.query(Order).filter(
+            Order.id.in_(order_ids),
+            Order.farmer_id == current_user.id
+        ).order_by(Order.id).with_for_update()
+    }
+    
+    errors = {}
+    for item in items:
+        order = orders.get(item.order_id)
+        errors[item.order_id] = transition_error(order, item.status, current_user) if order else "Order not found"
+    
+    # The stock was reserved at checkout; orders whose stock has gone since fail
+    short = commit_reservations(db, [
+        item.order_id for item in items
+        if not errors[item.order_id] and item.status == OrderStatus.ACCEPTED
+    ])
+    for order_id, product_ids in short.items():
+        errors[order_id] = f"Insufficient quantity available for products: {', '.join(map(str, product_ids))}"
+    
+    applied = [item for item in items if not errors[item.order_id]]
+    
+    # Farmer earnings of paid orders delivered for the first time, checked
+    # before the transitions stamp delivered_at
+    credit_delivery_earnings(db, [
+        orders[item.order_id] for item in applied if item.status == OrderStatus.DELIVERED
+    ])
+    
+    transition_orders(db, [
+        (orders[item.order_id], item.status, {"notes": item.farmer_notes} if item.farmer_notes else None)
+        for item in applied
+    ], current_user)
+    for item in applied:
+        orders[item.order_id].farmer_notes = item.farmer_notes
+    
+    changed = {item.order_id: orders[item.order_id] for item in applied}
+    
+    # Put the reserved stock of rejected and cancelled orders back on sale
+    release_order_reservations(db, [
+        order_id for order_id, order in changed.items()
+        if order.status in (OrderStatus.REJECTED, OrderStatus.CANCELLED)
+    ])
+    
+    # Refund paid orders that were rejected
+    refunded = [
+        order for order in changed.values()
+        if order.status == OrderStatus.REJECTED and order.payment_status == PaymentStatus.PAID
+    ]
+    if refunded:
+        db.execute(insert(PaymentTransaction), [
+            {
+                "order_id": order.id,
+                "user_id": order.buyer_id,
+                "transaction_type": TransactionType.REFUND,
+                "amount": order.total_amount,
+                "status": TransactionStatus.PENDING,
+                "gateway": order.payment_gateway or "paystack",
+                "description": f"Refund for order {order.order_number}",
+            }
+            for order in refunded
+        ])
+        for order in refunded:
+            order.payment_status = PaymentStatus.REFUNDED
+    
+    # Logistics bookings are made after the response instead of one by one
+    to_book = [
+        order_id for order_id, order in changed.items()
+        if order.status == OrderStatus.SHIPPED and needs_booking(order)
+    ]
+    
+    db.commit()
+    
+    if to_book:
+        background_tasks.add_task(book_deliveries, to_book)
+    
+    return [
+        OrderStatusBatchResult(
+            order_id=item.order_id,
+            success=not errors[item.order_id],
+            status=orders[item.order_id].status if item.order_id in orders else None,
+            error=errors[item.order_id]
+        )
+        for item in items
+    ]
+
+
 @router.put("/orders/{order_id}/status", response_model=OrderResponse)
 async def update_order_status(
     order_id: int,
@@ -201,10 +552,11 @@ async def update_order_status(
     db: Session = Depends(get_db)
 ):
     """Update order status (accept/reject/prepare/ship)"""
+    # Locked so a background delivery booking of the same order waits or skips it
     order = db.query(Order).filter(
         Order.id == order_id,
         Order.farmer_id == current_user.id
-    ).first()
+    ).with_for_update().first()
     
     if not order:
         raise HTTPException(
@@ -212,83 +564,31 @@ async def update_order_status(
             detail="Order not found"
         )
     
-    # Validate status transitions
-    if order.status == OrderStatus.DELIVERED:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot update a delivered order"
-        )
+    if status_update.status == OrderStatus.DELIVERED:
+        # Credit the farmer's wallet if payment is confirmed; checked before
+        # the transition stamps delivered_at, so earnings are paid only once
+        credit_delivery_earnings(db, [order])
     
-    if status_update.status == OrderStatus.ACCEPTED and order.status != OrderStatus.PENDING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Can only accept pending orders"
-        )
-    
-    # Update order
-    order.status = status_update.status
+    transition_order(
+        db, order, status_update.status, current_user,
+        {"notes": status_update.farmer_notes} if status_update.farmer_notes else None
+    )
     order.farmer_notes = status_update.farmer_notes
     
     if status_update.status == OrderStatus.ACCEPTED:
-        order.accepted_at = datetime.utcnow()
-        # Update inventory
-        for item in order.order_items:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if product:
-                product.available_quantity -= item.quantity
-                if product.available_quantity <= 0:
-                    product.status = ProductStatus.SOLD_OUT
+        # The stock was reserved at checkout; keep it as sold
+        commit_order_reservations(db, order)
     
     elif status_update.status == OrderStatus.SHIPPED:
-        order.shipped_at = datetime.utcnow()
-        
         # If delivery type is DELIVERY, create logistics order
-        if order.delivery_type == DeliveryType.DELIVERY and not order.logistics_tracking_number:
-            from app.services.logistics.kwik import create_delivery_order
-            from app.models.user import User as UserModel
-            
-            # Get farmer and buyer info
-            farmer_user = db.query(UserModel).filter(UserModel.id == order.farmer_id).first()
-            buyer_user = db.query(UserModel).filter(UserModel.id == order.buyer_id).first()
-            
-            if farmer_user and buyer_user:
-                try:
-                    # Create delivery order with logistics partner
-                    logistics_result = await create_delivery_order(
-                        pickup_address=order.pickup_address or farmer_user.farm_address or "",
-                        delivery_address=order.delivery_address or "",
-                        pickup_phone=order.pickup_phone or farmer_user.phone,
-                        delivery_phone=order.delivery_phone or buyer_user.phone,
-                        pickup_name=f"{farmer_user.first_name} {farmer_user.last_name}",
-                        delivery_name=f"{buyer_user.first_name} {buyer_user.last_name}",
-                        order_reference=order.order_number,
-                        item_description="Agricultural products"
-                    )
-                    
-                    # Update order with logistics info
-                    if logistics_result.get("tracking_number"):
-                        order.logistics_tracking_number = logistics_result.get("tracking_number")
-                        order.logistics_order_id = logistics_result.get("order_id")
-                        order.logistics_partner = logistics_result.get("provider", "kwik")
-                        order.status = OrderStatus.IN_TRANSIT
-                except Exception as e:
-                    # Log error but don't fail the order update
-                    order.farmer_notes = (order.farmer_notes or "") + f"\nLogistics error: {str(e)}"
-    
-    elif status_update.status == OrderStatus.DELIVERED:
-        order.delivered_at = datetime.utcnow()
-        
-        # Update farmer wallet balance if payment is confirmed
-        if order.payment_status == PaymentStatus.PAID:
-            # Calculate farmer earnings (subtotal - commission)
-            farmer_earnings = order.subtotal - order.commission
-            
-            # Update farmer wallet
-            farmer = db.query(User).filter(User.id == order.farmer_id).first()
-            if farmer:
-                farmer.wallet_balance += farmer_earnings
+        if needs_booking(order):
+            await book_delivery(db, order)
     
-    elif status_update.status == OrderStatus.REJECTED:
+    elif status_update.status in (OrderStatus.REJECTED, OrderStatus.CANCELLED):
+        # Put the reserved stock back on sale
+        release_order_reservations(db, [order.id])
+    
+    if status_update.status == OrderStatus.REJECTED:
         # Refund if payment was made
         if order.payment_status == PaymentStatus.PAID:
             # Trigger refund process
@@ -323,9 +623,13 @@ async def update_farmer_profile(
     """Update farmer profile information"""
     update_data = profile_data.dict(exclude_unset=True)
     
+    if "farm_location_coordinates" in update_data:
+        update_data.update(farm_location_fields(update_data["farm_location_coordinates"]))
+    
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
+    refresh_farmer_listings(db, current_user)
     db.commit()
     db.refresh(current_user)
     
@@ -372,15 +676,18 @@ async def request_withdrawal(
 
 @router.get("/withdrawals", response_model=List[WithdrawalResponse])
 async def get_withdrawals(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     current_user: User = Depends(require_role([UserRole.FARMER])),
     db: Session = Depends(get_db)
 ):
     """Get withdrawal history"""
-    withdrawals = db.query(Withdrawal).filter(
-        Withdrawal.farmer_id == current_user.id
-    ).order_by(Withdrawal.created_at.desc()).offset(skip).limit(limit).all()
+    query = db.query(Withdrawal).filter(Withdrawal.farmer_id == current_user.id)
+    withdrawals = keyset_paginate(
+        query, [Withdrawal.created_at, Withdrawal.id], response, cursor=cursor, skip=skip, limit=limit
+    )
     
     return withdrawals
 
@@ -1,18 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.core.config.db import get_db
+from app.core.config.settings import settings
 from app.core.auth.jwt import get_current_active_user, require_role
 from app.models.user import User, UserRole
 from app.models.order import Order, OrderStatus, PaymentStatus
 from app.models.payment import PaymentTransaction, TransactionType, TransactionStatus
 from app.schemas.payment import PaymentInitiate, PaymentVerification, PaymentResponse
 from app.services.payment import paystack, flutterwave
+from app.utils.helpers.pagination import keyset_paginate
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
+# Orders that can still be paid for: not paid or refunded, and not closed
+PAYABLE_PAYMENT_STATUSES = (PaymentStatus.PENDING, PaymentStatus.PROCESSING, PaymentStatus.FAILED)
+CLOSED_ORDER_STATUSES = (OrderStatus.REJECTED, OrderStatus.CANCELLED)
+
+
+def _payable():
+    return (
+        Order.payment_status.in_(PAYABLE_PAYMENT_STATUSES),
+        Order.status.notin_(CLOSED_ORDER_STATUSES),
+    )
+
 
 @router.post("/initiate", response_model=dict)
 async def initiate_payment(
@@ -20,69 +33,78 @@ async def initiate_payment(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Initiate payment for an order"""
-    # Get order
-    order = db.query(Order).filter(
-        Order.id == payment_data.order_id,
-        Order.buyer_id == current_user.id
-    ).first()
+    """Initiate payment for an order, or for every order of a checkout"""
+    # Get order(s)
+    query = db.query(Order).filter(Order.buyer_id == current_user.id)
+    if payment_data.checkout_reference:
+        orders = query.filter(Order.checkout_reference == payment_data.checkout_reference).all()
+    else:
+        orders = query.filter(Order.id == payment_data.order_id).all()
     
-    if not order:
+    if not orders:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found"
         )
     
-    if order.payment_status == PaymentStatus.PAID:
+    # Orders of the checkout already paid, rejected or cancelled are not charged
+    orders = [
+        order for order in orders
+        if order.payment_status in PAYABLE_PAYMENT_STATUSES and order.status not in CLOSED_ORDER_STATUSES
+    ]
+    if not orders:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Order already paid"
+            detail="Order already paid or no longer payable"
         )
     
+    amount = sum(order.total_amount for order in orders)
+    order_numbers = ", ".join(order.order_number for order in orders)
+    
     # Generate payment reference
     payment_reference = f"AGD-{uuid.uuid4().hex[:12].upper()}"
     
     # Create payment transaction
     payment_transaction = PaymentTransaction(
-        order_id=order.id,
+        order_id=payment_data.order_id,
+        checkout_reference=payment_data.checkout_reference,
         user_id=current_user.id,
         transaction_type=TransactionType.PAYMENT,
-        amount=order.total_amount,
+        amount=amount,
         status=TransactionStatus.PENDING,
         gateway=payment_data.gateway,
         gateway_reference=payment_reference,
         payment_method=payment_data.payment_method,
-        description=f"Payment for order {order.order_number}"
+        description=f"Payment for order {order_numbers}"
     )
     
     db.add(payment_transaction)
     db.flush()
     
+    metadata = {
+        "order_id": payment_data.order_id,
+        "order_number": order_numbers,
+        "checkout_reference": payment_data.checkout_reference,
+        "user_id": current_user.id
+    }
+    
     # Initialize payment with gateway
     try:
         if payment_data.gateway == "paystack":
             payment_result = await paystack.initialize_payment(
                 email=current_user.email,
-                amount=order.total_amount,
+                amount=amount,
                 reference=payment_reference,
-                metadata={
-                    "order_id": order.id,
-                    "order_number": order.order_number,
-                    "user_id": current_user.id
-                }
+                metadata=metadata
             )
             authorization_url = payment_result.get("data", {}).get("authorization_url")
             access_code = payment_result.get("data", {}).get("access_code")
         elif payment_data.gateway == "flutterwave":
             payment_result = await flutterwave.initialize_payment(
                 email=current_user.email,
-                amount=order.total_amount,
+                amount=amount,
                 reference=payment_reference,
-                metadata={
-                    "order_id": order.id,
-                    "order_number": order.order_number,
-                    "user_id": current_user.id
-                }
+                metadata=metadata
             )
             authorization_url = payment_result.get("data", {}).get("link")
             access_code = payment_result.get("data", {}).get("flw_ref")
@@ -92,11 +114,12 @@ async def initiate_payment(
                 detail="Invalid payment gateway"
             )
         
-        # Update order with payment reference
-        order.payment_reference = payment_reference
-        order.payment_gateway = payment_data.gateway
-        order.payment_method = payment_data.payment_method
-        order.payment_status = PaymentStatus.PROCESSING
+        # Update orders with payment reference
+        for order in orders:
+            order.payment_reference = payment_reference
+            order.payment_gateway = payment_data.gateway
+            order.payment_method = payment_data.payment_method
+            order.payment_status = PaymentStatus.PROCESSING
         
         payment_transaction.gateway_response = str(payment_result)
         
@@ -107,7 +130,7 @@ async def initiate_payment(
             "access_code": access_code,
             "reference": payment_reference,
             "gateway": payment_data.gateway,
-            "amount": order.total_amount
+            "amount": amount
         }
     except Exception as e:
         payment_transaction.status = TransactionStatus.FAILED
@@ -118,6 +141,30 @@ async def initiate_payment(
         )
 
 
+def _mark_orders_paid(db: Session, payment_transaction: PaymentTransaction) -> None:
+    """Mark the order, or every payable order of the checkout, the transaction paid for"""
+    if payment_transaction.checkout_reference:
+        condition = Order.checkout_reference == payment_transaction.checkout_reference
+    elif payment_transaction.order_id:
+        condition = Order.id == payment_transaction.order_id
+    else:
+        return
+    db.query(Order).filter(
+        condition,
+        Order.buyer_id == payment_transaction.user_id,
+        *_payable()
+    ).update({Order.payment_status: PaymentStatus.PAID}, synchronize_session=False)
+
+
+def _by_reference(db: Session, reference: str):
+    """Payment transactions with a gateway reference, bounded to recent partitions"""
+    since = datetime.utcnow() - timedelta(days=settings.PAYMENT_REFERENCE_LOOKUP_DAYS)
+    return db.query(PaymentTransaction).filter(
+        PaymentTransaction.gateway_reference == reference,
+        PaymentTransaction.created_at >= since
+    )
+
+
 @router.post("/verify", response_model=PaymentResponse)
 async def verify_payment(
     payment_data: PaymentVerification,
@@ -126,8 +173,7 @@ async def verify_payment(
 ):
     """Verify payment status"""
     # Find payment transaction
-    payment_transaction = db.query(PaymentTransaction).filter(
-        PaymentTransaction.gateway_reference == payment_data.reference,
+    payment_transaction = _by_reference(db, payment_data.reference).filter(
         PaymentTransaction.user_id == current_user.id
     ).first()
     
@@ -163,13 +209,8 @@ async def verify_payment(
             payment_transaction.completed_at = datetime.utcnow()
             
             # Update order payment status
-            if payment_transaction.order_id:
-                order = db.query(Order).filter(Order.id == payment_transaction.order_id).first()
-                if order:
-                    order.payment_status = PaymentStatus.PAID
-                    
-                    # Update farmer wallet when order is delivered
-                    # (This will be handled when order status changes to delivered)
+            # (Farmer wallets are updated when the orders are delivered)
+            _mark_orders_paid(db, payment_transaction)
         else:
             payment_transaction.status = TransactionStatus.FAILED
         
@@ -202,9 +243,7 @@ async def paystack_webhook(
         )
     
     # Find payment transaction
-    payment_transaction = db.query(PaymentTransaction).filter(
-        PaymentTransaction.gateway_reference == reference
-    ).first()
+    payment_transaction = _by_reference(db, reference).first()
     
     if not payment_transaction:
         return {"status": "transaction_not_found"}
@@ -215,10 +254,7 @@ async def paystack_webhook(
         payment_transaction.completed_at = datetime.utcnow()
         
         # Update order
-        if payment_transaction.order_id:
-            order = db.query(Order).filter(Order.id == payment_transaction.order_id).first()
-            if order:
-                order.payment_status = PaymentStatus.PAID
+        _mark_orders_paid(db, payment_transaction)
     
     elif event == "charge.failed":
         payment_transaction.status = TransactionStatus.FAILED
@@ -245,9 +281,7 @@ async def flutterwave_webhook(
         )
     
     # Find payment transaction
-    payment_transaction = db.query(PaymentTransaction).filter(
-        PaymentTransaction.gateway_reference == reference
-    ).first()
+    payment_transaction = _by_reference(db, reference).first()
     
     if not payment_transaction:
         return {"status": "transaction_not_found"}
@@ -258,10 +292,7 @@ async def flutterwave_webhook(
         payment_transaction.completed_at = datetime.utcnow()
         
         # Update order
-        if payment_transaction.order_id:
-            order = db.query(Order).filter(Order.id == payment_transaction.order_id).first()
-            if order:
-                order.payment_status = PaymentStatus.PAID
+        _mark_orders_paid(db, payment_transaction)
     
     elif event == "charge.completed" and data.get("status") != "successful":
         payment_transaction.status = TransactionStatus.FAILED
@@ -273,15 +304,23 @@ async def flutterwave_webhook(
 
 @router.get("/transactions", response_model=list[PaymentResponse])
 async def get_payment_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get payment transactions for current user"""
-    transactions = db.query(PaymentTransaction).filter(
-        PaymentTransaction.user_id == current_user.id
-    ).order_by(PaymentTransaction.created_at.desc()).offset(skip).limit(limit).all()
+    query = db.query(PaymentTransaction).filter(PaymentTransaction.user_id == current_user.id)
+    transactions = keyset_paginate(
+        query,
+        [PaymentTransaction.created_at, PaymentTransaction.id],
+        response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit
+    )
     
     return transactions
 
@@ -3,9 +3,10 @@ from sqlalchemy.orm import Session
 from app.core.config.db import get_db
 from app.core.auth.jwt import get_current_active_user
 from app.models.user import User
-from app.models.order import Order, OrderStatus
+from app.models.order import Order
 from app.models.user import UserRole
 from app.services.logistics import kwik
+from app.services.orders.lifecycle import order_timeline
 from typing import Optional
 
 router = APIRouter(prefix="/tracking", tags=["Tracking"])
@@ -61,13 +62,8 @@ async def track_order(
                 "provider": "kwik"
             }
     
-    # Add status timeline
-    tracking_info["timeline"] = {
-        "pending": order.created_at if order.status == OrderStatus.PENDING else None,
-        "accepted": order.accepted_at if order.status.value in ["accepted", "preparing", "shipped", "in_transit", "delivered"] else None,
-        "shipped": order.shipped_at if order.status.value in ["shipped", "in_transit", "delivered"] else None,
-        "delivered": order.delivered_at if order.status == OrderStatus.DELIVERED else None
-    }
+    # Status timeline from the order's event log
+    tracking_info["timeline"] = order_timeline(db, order)
     
     return tracking_info
 
@@ -2,8 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.config.db import get_db
 from app.core.auth.jwt import get_current_active_user
-from app.models.user import User
+from app.models.user import User, UserRole
+from app.schemas.order import OrderStatusCountsResponse
 from app.schemas.user import UserUpdate, UserResponse
+from app.services.catalog.projection import refresh_farmer_listings
+from app.services.orders.lifecycle import order_status_counts
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -29,7 +32,20 @@ async def update_my_profile(
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
+    if current_user.role == UserRole.FARMER:
+        refresh_farmer_listings(db, current_user)
+    
     db.commit()
     db.refresh(current_user)
     
     return current_user
+
+
+@router.get("/me/order-counts", response_model=OrderStatusCountsResponse)
+async def get_my_order_counts(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Number of my orders (as buyer or farmer) in each status, for dashboard badges"""
+    counts = order_status_counts(db, current_user.id)
+    return OrderStatusCountsResponse(counts=counts, total=sum(counts.values()))
@@ -0,0 +1,18 @@
+import hmac
+from fastapi import Depends, HTTPException, status
+from fastapi.security import APIKeyHeader
+from app.core.config.settings import settings
+
+partner_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+async def require_partner_key(api_key: str = Depends(partner_key_header)) -> str:
+    """Dependency for partner integrations authenticated by a static API key"""
+    if api_key:
+        for partner_key in settings.PARTNER_API_KEYS.split(","):
+            if partner_key.strip() and hmac.compare_digest(api_key, partner_key.strip()):
+                return api_key
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Invalid API key"
+    )
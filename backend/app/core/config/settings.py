@@ -26,6 +26,13 @@ class Settings(BaseSettings):
     KWIK_API_KEY: str = os.getenv("KWIK_API_KEY", "")
     KWIK_API_URL: str = os.getenv("KWIK_API_URL", "https://api.kwik.delivery/v1")
     
+    # Delivery quotes: cached per worker by (pickup zone, delivery zone,
+    # weight band), backed by the delivery_zone_rates table. Live quotes are
+    # only requested for unknown routes, and given this long to answer
+    DELIVERY_QUOTE_CACHE_SIZE: int = int(os.getenv("DELIVERY_QUOTE_CACHE_SIZE", "4096"))
+    DELIVERY_QUOTE_CACHE_TTL_SECONDS: float = float(os.getenv("DELIVERY_QUOTE_CACHE_TTL_SECONDS", "600"))
+    DELIVERY_QUOTE_TIMEOUT_SECONDS: float = float(os.getenv("DELIVERY_QUOTE_TIMEOUT_SECONDS", "2"))
+    
     # Callback URLs
     FLUTTERWAVE_CALLBACK_URL: str = os.getenv("FLUTTERWAVE_CALLBACK_URL", "http://localhost:8000/api/v1/payments")
     
@@ -33,10 +40,57 @@ class Settings(BaseSettings):
     COMMISSION_PERCENTAGE: float = float(os.getenv("COMMISSION_PERCENTAGE", "5.0"))
     MIN_WITHDRAWAL_AMOUNT: float = float(os.getenv("MIN_WITHDRAWAL_AMOUNT", "1000.0"))
     
+    # Stock reserved at checkout is released if the farmer has not accepted
+    # the order within this time (see app.jobs.release_expired_reservations)
+    INVENTORY_RESERVATION_TTL_MINUTES: int = int(os.getenv("INVENTORY_RESERVATION_TTL_MINUTES", "1440"))
+    
+    # Farmer order stream (SSE): keepalive comment interval, and how many
+    # undelivered events a stream may fall behind before it is closed
+    ORDER_STREAM_KEEPALIVE_SECONDS: float = float(os.getenv("ORDER_STREAM_KEEPALIVE_SECONDS", "15"))
+    ORDER_STREAM_QUEUE_SIZE: int = int(os.getenv("ORDER_STREAM_QUEUE_SIZE", "100"))
+    
+    # Monthly partitions of payment_transactions and order_events (see
+    # app.jobs.maintain_partitions): partitions made ahead of time, and
+    # months kept in the database before being archived to Parquet files
+    PARTITION_PREMADE_MONTHS: int = int(os.getenv("PARTITION_PREMADE_MONTHS", "3"))
+    PARTITION_RETENTION_MONTHS: int = int(os.getenv("PARTITION_RETENTION_MONTHS", "24"))
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "var/archive")
+    # Age of the payment transactions a gateway reference is looked up in,
+    # so verification and webhooks scan only the recent partitions
+    PAYMENT_REFERENCE_LOOKUP_DAYS: int = int(os.getenv("PAYMENT_REFERENCE_LOOKUP_DAYS", "30"))
+    
+    # Catalog cache
+    CATALOG_CACHE_SIZE: int = int(os.getenv("CATALOG_CACHE_SIZE", "2048"))
+    CATALOG_CACHE_TTL_SECONDS: float = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "60"))
+    
+    # Search suggestions (prefix index memory-mapped by all workers on a host)
+    SUGGEST_DIR: str = os.getenv("SUGGEST_DIR", "var/suggest")
+    SUGGEST_RELOAD_INTERVAL_SECONDS: float = float(os.getenv("SUGGEST_RELOAD_INTERVAL_SECONDS", "1"))
+    
+    # Content-based similar products (memory-mapped arrays shared by all workers)
+    SIMILARITY_DIR: str = os.getenv("SIMILARITY_DIR", "var/similarity")
+    
+    # Price history: raw points and daily candles are kept this long before
+    # only coarser rollups remain (see app.jobs.compact_price_history)
+    PRICE_RAW_RETENTION_DAYS: int = int(os.getenv("PRICE_RAW_RETENTION_DAYS", "30"))
+    PRICE_DAILY_RETENTION_DAYS: int = int(os.getenv("PRICE_DAILY_RETENTION_DAYS", "400"))
+    
+    # Partner integrations (comma-separated keys sent as X-API-Key)
+    PARTNER_API_KEYS: str = os.getenv("PARTNER_API_KEYS", "")
+    CATALOG_EXPORT_BATCH_SIZE: int = int(os.getenv("CATALOG_EXPORT_BATCH_SIZE", "1000"))
+    # Incremental exports reach this far before changed_since, for changes
+    # whose transaction committed after the previous export started
+    CATALOG_EXPORT_OVERLAP_SECONDS: int = int(os.getenv("CATALOG_EXPORT_OVERLAP_SECONDS", "300"))
+    
     # File Upload
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "media")
     MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024  # 5MB
     
+    # Bulk product import: files up to the inline limit are imported during
+    # the request, larger ones run as a background job
+    PRODUCT_IMPORT_MAX_BYTES: int = int(os.getenv("PRODUCT_IMPORT_MAX_BYTES", str(20 * 1024 * 1024)))
+    PRODUCT_IMPORT_INLINE_MAX_BYTES: int = int(os.getenv("PRODUCT_IMPORT_INLINE_MAX_BYTES", str(256 * 1024)))
+    
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,112 @@
+"""Rebuild "bought together" product recommendations from order history.
+
+Run periodically (e.g. nightly from cron):
+
+    python -m app.jobs.build_recommendations
+
+Order items are streamed into a sparse order x product incidence matrix B.
+B.T @ B is the item-item co-purchase count matrix; pairs bought together in
+fewer than MIN_CO_PURCHASES orders are dropped, and counts are normalized
+to cosine similarity (c_ij / sqrt(n_i * n_j)) so best-sellers do not
+dominate every list. The top TOP_K neighbours of each product replace the
+contents of product_recommendations in one transaction.
+"""
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from app.core.config.db import SessionLocal
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.recommendation import ProductRecommendation
+from app.services.catalog.recommendations import TOP_K
+
+MIN_CO_PURCHASES = 2
+
+# Orders that never went ahead say nothing about what sells together
+_EXCLUDED_STATUSES = (OrderStatus.REJECTED, OrderStatus.CANCELLED)
+
+
+def _incidence_matrix(db: Session):
+    """Binary order x product matrix and the product id of each column"""
+    rows = db.execute(
+        select(OrderItem.order_id, OrderItem.product_id)
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.status.notin_(_EXCLUDED_STATUSES))
+        .execution_options(yield_per=50000)
+    )
+
+    order_ids, product_ids = [], []
+    for partition in rows.partitions():
+        for order_id, product_id in partition:
+            order_ids.append(order_id)
+            product_ids.append(product_id)
+
+    order_ids = np.asarray(order_ids, dtype=np.int64)
+    product_ids = np.asarray(product_ids, dtype=np.int64)
+    _, order_index = np.unique(order_ids, return_inverse=True)
+    columns, product_index = np.unique(product_ids, return_inverse=True)
+
+    incidence = sparse.csr_matrix(
+        (np.ones(len(order_ids), dtype=np.float32), (order_index, product_index)),
+        shape=(order_index.max() + 1 if len(order_ids) else 0, len(columns))
+    )
+    # The same product twice in one order still counts once
+    incidence.data[:] = 1.0
+    return incidence, columns
+
+
+def compute_neighbours(incidence, top_k: int = TOP_K, min_co_purchases: int = MIN_CO_PURCHASES):
+    """Yield (column, neighbour columns, scores) for every product with neighbours"""
+    co_purchases = (incidence.T @ incidence).tocsr()
+    purchases = co_purchases.diagonal()
+
+    co_purchases.setdiag(0)
+    co_purchases.data[co_purchases.data < min_co_purchases] = 0
+    co_purchases.eliminate_zeros()
+
+    norm = sparse.diags(1.0 / np.sqrt(np.maximum(purchases, 1.0)))
+    similarity = (norm @ co_purchases @ norm).tocsr()
+
+    for column in range(similarity.shape[0]):
+        start, end = similarity.indptr[column], similarity.indptr[column + 1]
+        if start == end:
+            continue
+        scores = similarity.data[start:end]
+        neighbours = similarity.indices[start:end]
+        if len(scores) > top_k:
+            best = np.argpartition(-scores, top_k)[:top_k]
+            scores, neighbours = scores[best], neighbours[best]
+        order = np.argsort(-scores, kind="stable")
+        yield column, neighbours[order], scores[order]
+
+
+def build(db: Session) -> int:
+    incidence, columns = _incidence_matrix(db)
+
+    rows = [
+        {
+            "product_id": int(columns[column]),
+            "neighbour_ids": [int(product_id) for product_id in columns[neighbours]],
+            "scores": [round(float(score), 6) for score in scores],
+        }
+        for column, neighbours, scores in compute_neighbours(incidence)
+    ]
+
+    db.execute(delete(ProductRecommendation))
+    if rows:
+        db.execute(insert(ProductRecommendation), rows)
+    db.commit()
+    return len(rows)
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        count = build(db)
+    finally:
+        db.close()
+    print(f"products_with_recommendations={count}")
+
+
+if __name__ == "__main__":
+    main()
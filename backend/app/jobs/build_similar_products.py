@@ -0,0 +1,24 @@
+"""Rebuild the content-based similar-products index from scratch.
+
+Run periodically (e.g. nightly from cron) and once after deploying:
+
+    python -m app.jobs.build_similar_products
+
+patch_similar_products applies product changes in between; the full
+build refreshes idf weights.
+"""
+from app.core.config.db import SessionLocal
+from app.services.catalog.similarity import build_index
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        count = build_index(db)
+    finally:
+        db.close()
+    print(f"indexed_products={count}")
+
+
+if __name__ == "__main__":
+    main()
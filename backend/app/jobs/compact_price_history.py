@@ -0,0 +1,163 @@
+"""Compact product price history into daily and weekly OHLC candles.
+
+Run periodically (e.g. hourly from cron):
+
+    python -m app.jobs.compact_price_history
+
+Each run rolls complete UTC days of raw price points into daily candles and
+complete weeks of daily candles into weekly ones, starting from the last
+bucket already stored, so reruns are cheap and idempotent. Listed products
+with no price change on a day get a candle carrying their last close. Raw points older
+than PRICE_RAW_RETENTION_DAYS and daily candles older than
+PRICE_DAILY_RETENTION_DAYS are then deleted; weekly candles are kept.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.core.config.db import SessionLocal
+from app.models.price_history import PricePoint, PriceResolution, PriceRollup
+from app.services.catalog.price_history import DAILY_RETENTION, RAW_RETENTION, bucket_start
+
+_UPSERT = """
+    INSERT INTO price_rollups (
+        product_id, resolution, bucket_start, category, location_state,
+        open, high, low, close, samples
+    )
+    {select}
+    ON CONFLICT (product_id, resolution, bucket_start) DO UPDATE SET
+        category = EXCLUDED.category,
+        location_state = EXCLUDED.location_state,
+        open = EXCLUDED.open,
+        high = EXCLUDED.high,
+        low = EXCLUDED.low,
+        close = EXCLUDED.close,
+        samples = EXCLUDED.samples
+"""
+
+# Postgres has no first()/last() aggregates; ordered array_agg stands in
+_DAYS_FROM_POINTS = """
+    SELECT
+        product_id,
+        'DAY',
+        date_trunc('day', recorded_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket,
+        (array_agg(category ORDER BY recorded_at DESC, id DESC))[1],
+        (array_agg(location_state ORDER BY recorded_at DESC, id DESC))[1],
+        (array_agg(price_per_unit ORDER BY recorded_at, id))[1],
+        max(price_per_unit),
+        min(price_per_unit),
+        (array_agg(price_per_unit ORDER BY recorded_at DESC, id DESC))[1],
+        count(*)
+    FROM price_points
+    WHERE recorded_at >= :since AND recorded_at < :until
+    GROUP BY product_id, bucket
+"""
+
+# Products with no price point on a day keep their last close: a flat candle
+# with no samples, so every listed product is in every daily bucket and
+# category/state averages are not skewed towards the products repriced that
+# day. The previous candle is always real or carried, so its close is the
+# product's price on the day.
+_CARRY_DAYS = """
+    INSERT INTO price_rollups (
+        product_id, resolution, bucket_start, category, location_state,
+        open, high, low, close, samples
+    )
+    SELECT p.id, 'DAY', day.bucket, last.category, last.location_state,
+        last.close, last.close, last.close, last.close, 0
+    FROM generate_series(CAST(:since AS timestamptz), CAST(:until AS timestamptz) - interval '1 day',
+                         interval '1 day') AS day(bucket)
+    CROSS JOIN products p
+    CROSS JOIN LATERAL (
+        SELECT r.category, r.location_state, r.close
+        FROM price_rollups r
+        WHERE r.product_id = p.id AND r.resolution = 'DAY' AND r.bucket_start < day.bucket
+        ORDER BY r.bucket_start DESC
+        LIMIT 1
+    ) last
+    WHERE p.status = 'ACTIVE'
+    ON CONFLICT (product_id, resolution, bucket_start) DO NOTHING
+"""
+
+_WEEKS_FROM_DAYS = """
+    SELECT
+        product_id,
+        'WEEK',
+        date_trunc('week', bucket_start AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket,
+        (array_agg(category ORDER BY bucket_start DESC))[1],
+        (array_agg(location_state ORDER BY bucket_start DESC))[1],
+        (array_agg(open ORDER BY bucket_start))[1],
+        max(high),
+        min(low),
+        (array_agg(close ORDER BY bucket_start DESC))[1],
+        sum(samples)
+    FROM price_rollups
+    WHERE resolution = 'DAY' AND bucket_start >= :since AND bucket_start < :until
+    GROUP BY product_id, bucket
+"""
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _watermark(db: Session, resolution: PriceResolution) -> Optional[datetime]:
+    return db.query(func.max(PriceRollup.bucket_start)).filter(
+        PriceRollup.resolution == resolution
+    ).scalar()
+
+
+def compact(db: Session, now: Optional[datetime] = None) -> dict:
+    now = now or datetime.now(timezone.utc)
+    today = bucket_start(now, PriceResolution.DAY)
+    this_week = bucket_start(now, PriceResolution.WEEK)
+
+    # The last stored bucket is recomputed in case points arrived after it
+    # was written; everything before it is final
+    days_since = _watermark(db, PriceResolution.DAY)
+    days = db.execute(text(_UPSERT.format(select=_DAYS_FROM_POINTS)), {
+        "since": days_since or _EPOCH,
+        "until": today,
+    }).rowcount
+
+    first_day = days_since or db.query(func.min(PriceRollup.bucket_start)).filter(
+        PriceRollup.resolution == PriceResolution.DAY
+    ).scalar()
+    carried = 0
+    if first_day:
+        carried = db.execute(text(_CARRY_DAYS), {"since": first_day, "until": today}).rowcount
+
+    weeks = db.execute(text(_UPSERT.format(select=_WEEKS_FROM_DAYS)), {
+        "since": _watermark(db, PriceResolution.WEEK) or _EPOCH,
+        "until": this_week,
+    }).rowcount
+
+    # Only rolled-up data is deleted, and only whole buckets, so recomputing
+    # a watermark bucket never sees a partial set of inputs
+    deleted_points = db.query(PricePoint).filter(
+        PricePoint.recorded_at < min(bucket_start(now - RAW_RETENTION, PriceResolution.DAY), today)
+    ).delete(synchronize_session=False)
+    deleted_days = db.query(PriceRollup).filter(
+        PriceRollup.resolution == PriceResolution.DAY,
+        PriceRollup.bucket_start < min(bucket_start(now - DAILY_RETENTION, PriceResolution.WEEK), this_week)
+    ).delete(synchronize_session=False)
+
+    db.commit()
+    return {
+        "daily_candles": days,
+        "carried_daily_candles": carried,
+        "weekly_candles": weeks,
+        "deleted_points": deleted_points,
+        "deleted_daily_candles": deleted_days,
+    }
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        result = compact(db)
+    finally:
+        db.close()
+    print(", ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Create upcoming monthly partitions and archive expired ones.
+
+Run daily (e.g. from cron):
+
+    python -m app.jobs.maintain_partitions
+
+For each partitioned table (payment_transactions, order_events) this makes
+sure partitions exist for the current month and the next
+PARTITION_PREMADE_MONTHS, so inserts never land in the default partition.
+Partitions older than PARTITION_RETENTION_MONTHS are exported to
+ARCHIVE_DIR/<table>/<partition>.parquet, then detached and dropped. Each
+step commits on its own, so an interrupted run resumes where it stopped.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config.db import SessionLocal
+from app.services.orders.partitions import (
+    PARTITIONED_TABLES,
+    archive_partition,
+    create_partitions,
+    expired_partitions,
+)
+
+
+def maintain(db: Session, now: Optional[datetime] = None) -> dict:
+    result = {"created": [], "archived": [], "archived_rows": 0}
+    for table in PARTITIONED_TABLES:
+        result["created"] += create_partitions(db, table, now)
+        db.commit()
+
+        for _, name in expired_partitions(db, table, now):
+            result["archived_rows"] += archive_partition(db, table, name)
+            result["archived"].append(name)
+    return result
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        result = maintain(db)
+    finally:
+        db.close()
+    print(
+        f"created={','.join(result['created']) or '-'} "
+        f"archived={','.join(result['archived']) or '-'} "
+        f"archived_rows={result['archived_rows']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Apply product changes to the similar-products index between full builds.
+
+Run every few minutes (e.g. from cron), on every host serving the API:
+
+    python -m app.jobs.patch_similar_products
+
+Products created, edited, deactivated or deleted since the last build or
+patch are applied in one new index version. Does nothing until
+build_similar_products has run once.
+"""
+from app.core.config.db import SessionLocal
+from app.services.catalog.similarity import patch_index
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        count = patch_index(db)
+    finally:
+        db.close()
+    print(f"patched_products={count}")
+
+
+if __name__ == "__main__":
+    main()
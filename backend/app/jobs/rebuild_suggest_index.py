@@ -0,0 +1,29 @@
+"""Rebuild the search suggestion index from catalog_listings.
+
+Run hourly on every host serving the API (e.g. from cron):
+
+    python -m app.jobs.rebuild_suggest_index
+
+Between builds, workers journal catalog changes against the current version
+and apply them on top of it; a rebuild folds them in (keeping that overlay
+small) and corrects anything those updates missed. Workers switch to the
+new version within SUGGEST_RELOAD_INTERVAL_SECONDS.
+"""
+from app.core.config.db import SessionLocal
+from app.services.catalog.suggest import build_index
+
+
+def rebuild() -> int:
+    db = SessionLocal()
+    try:
+        return build_index(db)
+    finally:
+        db.close()
+
+
+def main() -> None:
+    print(f"indexed_products={rebuild()}")
+
+
+if __name__ == "__main__":
+    main()
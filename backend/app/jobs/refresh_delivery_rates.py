@@ -0,0 +1,75 @@
+"""Refresh the delivery_zone_rates table from the logistics provider.
+
+Run periodically (e.g. every few hours from cron):
+
+    python -m app.jobs.refresh_delivery_rates
+
+Re-quotes every known route plus the state-to-state routes of recent
+delivery orders, a few requests at a time. Routes the provider fails to
+quote keep their previous rate.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Set
+from sqlalchemy.orm import Session
+from app.core.config.db import SessionLocal
+from app.models.logistics import DeliveryZoneRate
+from app.models.order import Order, DeliveryType
+from app.models.user import User
+from app.services.logistics.kwik import close_client
+from app.services.logistics.quotes import RouteKey, fetch_rate, route_key, save_rates
+
+# Recent orders whose routes are quoted even if no rate is stored yet
+ORDER_LOOKBACK = timedelta(days=30)
+CONCURRENT_REQUESTS = 8
+
+
+def _routes(db: Session) -> Set[RouteKey]:
+    routes = set(db.query(
+        DeliveryZoneRate.pickup_zone,
+        DeliveryZoneRate.delivery_zone,
+        DeliveryZoneRate.weight_band
+    ).all())
+
+    recent = db.query(User.farm_location_state, Order.delivery_state).join(
+        User, User.id == Order.farmer_id
+    ).filter(
+        Order.delivery_type == DeliveryType.DELIVERY,
+        Order.created_at >= datetime.now(timezone.utc) - ORDER_LOOKBACK
+    ).distinct()
+    for pickup_state, delivery_state in recent:
+        key = route_key(pickup_state, delivery_state)
+        if key[0] and key[1]:
+            routes.add(key)
+    return {tuple(route) for route in routes}
+
+
+async def refresh(db: Session) -> dict:
+    routes = _routes(db)
+    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)
+
+    async def fetch(key: RouteKey):
+        async with semaphore:
+            return await fetch_rate(key)
+
+    try:
+        rows = [row for row in await asyncio.gather(*(fetch(key) for key in routes)) if row]
+    finally:
+        await close_client()
+
+    save_rates(db, rows)
+    db.commit()
+    return {"routes": len(routes), "refreshed": len(rows)}
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        result = asyncio.run(refresh(db))
+    finally:
+        db.close()
+    print(", ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
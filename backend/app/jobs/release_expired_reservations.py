@@ -0,0 +1,36 @@
+"""Return the stock of reservations whose order was not accepted in time.
+
+Run every minute or so (e.g. from cron):
+
+    python -m app.jobs.release_expired_reservations
+
+Works in batches, committing after each one. Rows another run has locked
+are skipped, so overlapping runs are safe. An order whose reservation
+expired can still be accepted if the stock is still there.
+"""
+from app.core.config.db import SessionLocal
+from app.services.orders.inventory import release_expired_reservations
+
+BATCH_SIZE = 500
+
+
+def release() -> int:
+    db = SessionLocal()
+    released = 0
+    try:
+        while True:
+            count = release_expired_reservations(db, BATCH_SIZE)
+            db.commit()
+            released += count
+            if count < BATCH_SIZE:
+                return released
+    finally:
+        db.close()
+
+
+def main() -> None:
+    print(f"released_reservations={release()}")
+
+
+if __name__ == "__main__":
+    main()
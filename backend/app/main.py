@@ -2,7 +2,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import router as api_v1_router
 from app.core.config.db import Base, engine
+from app.services.logistics.kwik import close_client
+from app.services.catalog.suggest import suggest_index
+from app.services.orders.inbox import inbox_broker
 from app.models.test_model import TestModel
+from app.utils.helpers.pagination import NEXT_CURSOR_HEADER
 
 Base.metadata.create_all(bind=engine)
 
@@ -21,7 +25,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+
+@app.on_event("startup")
+async def start_order_inbox():
+    await inbox_broker.start()
+
+
+@app.on_event("startup")
+async def start_suggest_index():
+    suggest_index.start()
+
+
+@app.on_event("shutdown")
+async def close_logistics_client():
+    await close_client()
+
+
+@app.on_event("shutdown")
+async def stop_order_inbox():
+    await inbox_broker.stop()
+
+
 # Include API routers
 app.include_router(api_v1_router, prefix="/api/v1")
@@ -1,10 +1,19 @@
 from app.models.user import User, UserRole, VerificationStatus
 from app.models.product import Product, ProductCategory, ProductStatus
+from app.models.product_deletion import ProductDeletion
 from app.models.order import Order, OrderItem, OrderStatus, DeliveryType, PaymentStatus
+from app.models.order_event import OrderEvent
+from app.models.order_counter import OrderStatusCounter
 from app.models.payment import PaymentTransaction, Withdrawal, TransactionType, TransactionStatus
 from app.models.review import Review
-from app.models.cart import CartItem
+from app.models.cart import CartItem, CartSummary
 from app.models.dispute import Dispute, DisputeStatus, DisputeType
+from app.models.catalog import CatalogListing
+from app.models.import_job import ImportJob, ImportJobStatus
+from app.models.price_history import PricePoint, PriceRollup, PriceResolution
+from app.models.recommendation import ProductRecommendation
+from app.models.reservation import InventoryReservation, ReservationStatus
+from app.models.logistics import DeliveryZoneRate
 
 __all__ = [
     "User",
@@ -13,19 +22,33 @@ __all__ = [
     "Product",
     "ProductCategory",
     "ProductStatus",
+    "ProductDeletion",
     "Order",
     "OrderItem",
     "OrderStatus",
     "DeliveryType",
     "PaymentStatus",
+    "OrderEvent",
+    "OrderStatusCounter",
     "PaymentTransaction",
     "Withdrawal",
     "TransactionType",
     "TransactionStatus",
     "Review",
     "CartItem",
+    "CartSummary",
     "Dispute",
     "DisputeStatus",
     "DisputeType",
+    "CatalogListing",
+    "ImportJob",
+    "ImportJobStatus",
+    "PricePoint",
+    "PriceRollup",
+    "PriceResolution",
+    "ProductRecommendation",
+    "InventoryReservation",
+    "ReservationStatus",
+    "DeliveryZoneRate",
 ]
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.config.db import Base
@@ -20,4 +20,24 @@ class CartItem(Base):
     # Relationships
     buyer = relationship("User", back_populates="cart_items")
     product = relationship("Product", back_populates="cart_items")
+    
+    __table_args__ = (
+        Index("ix_cart_items_buyer_id_product_id", "buyer_id", "product_id"),
+        Index("ix_cart_items_product_id", "product_id"),
+    )
+
+
+class CartSummary(Base):
+    """Item count and subtotal of a buyer's cart.
+
+    Counts only items whose product is listed in the catalog, priced at the
+    listing price, exactly like the full cart view. Rows are rebuilt by
+    app.services.orders.cart whenever the cart or a carted product's price
+    changes; a buyer without a row has an empty cart.
+    """
+    __tablename__ = "cart_summaries"
 
+    buyer_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    item_count = Column(Integer, nullable=False, default=0)
+    subtotal = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
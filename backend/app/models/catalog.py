@@ -0,0 +1,63 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+from app.core.config.db import Base
+from app.models.product import ImageUrls, ProductCategory
+from app.utils.helpers.seasons import ALL_MONTHS_MASK
+
+
+class CatalogListing(Base):
+    """Read model behind catalog browsing.
+
+    One row per ACTIVE product with everything a ProductListItem needs already
+    denormalized (farmer display name, image URLs), so listing pages
+    are a single indexed query. Rows are rebuilt by
+    app.services.catalog.projection whenever a product or its farmer changes.
+    """
+    __tablename__ = "catalog_listings"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    farmer_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # Farmer display fields
+    farmer_name = Column(String(201), nullable=True)
+    farm_name = Column(String(200), nullable=True)
+    
+    # Product list fields
+    name = Column(String(200), nullable=False)
+    category = Column(Enum(ProductCategory), nullable=False)
+    price_per_unit = Column(Float, nullable=False)
+    unit = Column(String(50), nullable=False)
+    available_quantity = Column(Float, nullable=False)
+    location_state = Column(String(100), nullable=True)
+    location_city = Column(String(100), nullable=True)
+    
+    # Farm position, for nearby search
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geo_cell = Column(Integer, nullable=True)
+    
+    # Copied from products.season_mask
+    season_mask = Column(Integer, nullable=False, default=ALL_MONTHS_MASK)
+    
+    image_urls = Column(ImageUrls, nullable=True)
+    
+    # Copied from products.search_vector
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+    
+    # Product creation time, used for newest-first ordering
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_catalog_listings_created_at", "created_at", "product_id"),
+        Index("ix_catalog_listings_category_created_at", "category", "created_at", "product_id"),
+        Index("ix_catalog_listings_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_catalog_listings_geo_cell", "geo_cell"),
+        Index("ix_catalog_listings_state_season_mask", text("lower(location_state)"), "season_mask"),
+        Index(
+            "ix_catalog_listings_with_images_created_at",
+            "created_at",
+            "product_id",
+            postgresql_where=text("image_urls IS NOT NULL")
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -47,4 +47,9 @@ class Dispute(Base):
     order = relationship("Order", back_populates="dispute")
     raised_by = relationship("User", foreign_keys=[raised_by_id])
     disputed_user = relationship("User", foreign_keys=[disputed_user_id])
+    
+    # Keyset pagination index for (created_at, id) ordered listings
+    __table_args__ = (
+        Index("ix_disputes_created_at", "created_at", "id"),
+    )
 
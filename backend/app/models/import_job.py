@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, JSON, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+from app.core.config.db import Base
+
+
+class ImportJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJob(Base):
+    """A farmer's bulk product upload and its progress"""
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    farmer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    filename = Column(String(255), nullable=False)
+    status = Column(Enum(ImportJobStatus), nullable=False, default=ImportJobStatus.PENDING)
+    
+    # Progress
+    total_rows = Column(Integer, nullable=True)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    imported_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    
+    # [{"row": 12, "errors": ["price_per_unit: Must be greater than 0"]}, ...]
+    errors = Column(JSON, nullable=True)
+    failure_reason = Column(String(500), nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    farmer = relationship("User")
+    
+    __table_args__ = (
+        Index("ix_import_jobs_farmer_id_created_at", "farmer_id", "created_at"),
+    )
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.core.config.db import Base
+
+
+class DeliveryZoneRate(Base):
+    """Last known delivery price between two zones for one weight band.
+
+    Zones are normalized state names (see app.services.logistics.quotes).
+    Rows are learned from live quotes and refreshed by
+    app.jobs.refresh_delivery_rates, so checkout can price a delivery
+    without waiting on the logistics provider.
+    """
+    __tablename__ = "delivery_zone_rates"
+
+    pickup_zone = Column(String(100), primary_key=True)
+    delivery_zone = Column(String(100), primary_key=True)
+    weight_band = Column(Integer, primary_key=True)
+    
+    price = Column(Float, nullable=False)
+    estimated_time = Column(String(100), nullable=True)
+    provider = Column(String(50), nullable=False, default="kwik")
+    
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
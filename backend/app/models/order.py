@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -36,6 +36,9 @@ class Order(Base):
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(50), unique=True, index=True, nullable=False)
     
+    # Shared by the per-farmer orders created by one checkout, paid together
+    checkout_reference = Column(String(50), nullable=True, index=True)
+    
     # User relationships
     buyer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     farmer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -91,6 +94,13 @@ class Order(Base):
     order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
     payment_transactions = relationship("PaymentTransaction", back_populates="order")
     dispute = relationship("Dispute", back_populates="order", uselist=False)
+    
+    # Keyset pagination indexes for (created_at, id) ordered listings
+    __table_args__ = (
+        Index("ix_orders_created_at", "created_at", "id"),
+        Index("ix_orders_buyer_created_at", "buyer_id", "created_at", "id"),
+        Index("ix_orders_farmer_created_at", "farmer_id", "created_at", "id"),
+    )
 
 
 class OrderItem(Base):
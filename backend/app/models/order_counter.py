@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, ForeignKey, Enum
+from app.core.config.db import Base
+from app.models.order import OrderStatus
+
+
+class OrderStatusCounter(Base):
+    """Number of a user's orders currently in each status.
+
+    Kept for buyers and farmers alike (each order counts for both) by
+    app.services.orders.lifecycle, in the same transaction as the order is
+    created or changes status. Dashboard badges read a user's rows with one
+    primary-key range scan; a missing row means zero.
+    """
+    __tablename__ = "order_status_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(Enum(OrderStatus), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, JSON, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.config.db import Base
+from app.models.order import OrderStatus
+
+
+class OrderEvent(Base):
+    """Append-only log of order status transitions.
+
+    One row per transition, written by app.services.orders.lifecycle in the
+    same transaction as the status change; creation is recorded as a
+    transition from no status to PENDING. Rows are never updated, so an
+    order's timeline and the time spent in each status are a single range
+    scan of (order_id, created_at).
+
+    In PostgreSQL the table is partitioned by month on created_at (migration
+    0018); queries that bound created_at only touch the matching months.
+    """
+    __tablename__ = "order_events"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    
+    from_status = Column(Enum(OrderStatus), nullable=True)
+    to_status = Column(Enum(OrderStatus), nullable=False)
+    
+    # Who made the change; no actor means the system (jobs, logistics updates)
+    actor_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    actor_role = Column(String(20), nullable=False, default="system")
+    
+    # Free-form details, e.g. notes or tracking numbers ("metadata" is reserved
+    # on declarative classes, hence the attribute name)
+    event_metadata = Column("metadata", JSON, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    # Relationships
+    order = relationship("Order")
+    actor = relationship("User")
+    
+    __table_args__ = (
+        Index("ix_order_events_order_id_created_at", "order_id", "created_at", "id"),
+        Index("ix_order_events_to_status_created_at", "to_status", "created_at"),
+    )
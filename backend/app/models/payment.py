@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -20,10 +20,18 @@ class TransactionStatus(str, enum.Enum):
 
 
 class PaymentTransaction(Base):
+    """Payments, refunds and other money movements.
+
+    In PostgreSQL the table is partitioned by month on created_at (migration
+    0018), so its primary key there is (id, created_at) and months past
+    PARTITION_RETENTION_MONTHS are archived by app.jobs.maintain_partitions.
+    """
     __tablename__ = "payment_transactions"
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
+    # Set instead of order_id when the payment covers every order of a checkout
+    checkout_reference = Column(String(50), nullable=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     transaction_type = Column(Enum(TransactionType), nullable=False)
@@ -32,7 +40,9 @@ class PaymentTransaction(Base):
     
     # Gateway details
     gateway = Column(String(50), nullable=False)  # paystack, flutterwave
-    gateway_reference = Column(String(100), unique=True, nullable=True)
+    # Indexed, not unique: partitioned tables can only enforce uniqueness
+    # together with created_at. References are random per payment.
+    gateway_reference = Column(String(100), nullable=True, index=True)
     gateway_response = Column(Text, nullable=True)  # JSON response
     
     # Payment method
@@ -50,6 +60,12 @@ class PaymentTransaction(Base):
     # Relationships
     order = relationship("Order", back_populates="payment_transactions")
     user = relationship("User")
+    
+    # Keyset pagination indexes for (created_at, id) ordered listings
+    __table_args__ = (
+        Index("ix_payment_transactions_created_at", "created_at", "id"),
+        Index("ix_payment_transactions_user_created_at", "user_id", "created_at", "id"),
+    )
 
 
 class Withdrawal(Base):
@@ -81,5 +97,11 @@ class Withdrawal(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    farmer = relationship("User", back_populates="withdrawals")
+    farmer = relationship("User", foreign_keys=[farmer_id], back_populates="withdrawals")
+    
+    # Keyset pagination indexes for (created_at, id) ordered listings
+    __table_args__ = (
+        Index("ix_withdrawals_created_at", "created_at", "id"),
+        Index("ix_withdrawals_farmer_created_at", "farmer_id", "created_at", "id"),
+    )
 
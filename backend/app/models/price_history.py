@@ -0,0 +1,62 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.sql import func
+import enum
+from app.core.config.db import Base
+from app.models.product import ProductCategory
+
+
+class PriceResolution(str, enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+
+
+class PricePoint(Base):
+    """Append-only record of a product's price, written whenever it changes.
+
+    Category and state are copied from the product so category/state trends
+    need no join. Old points are compacted into price_rollups and deleted by
+    app.jobs.compact_price_history.
+    """
+    __tablename__ = "price_points"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    category = Column(Enum(ProductCategory), nullable=False)
+    location_state = Column(String(100), nullable=True)
+    price_per_unit = Column(Float, nullable=False)
+    recorded_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_price_points_product_id_recorded_at", "product_id", "recorded_at"),
+        Index("ix_price_points_category_state_recorded_at", "category", "location_state", "recorded_at"),
+        Index("ix_price_points_recorded_at", "recorded_at"),
+    )
+
+
+class PriceRollup(Base):
+    """Daily or weekly OHLC candle of one product's price"""
+    __tablename__ = "price_rollups"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    resolution = Column(Enum(PriceResolution), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    
+    category = Column(Enum(ProductCategory), nullable=False)
+    location_state = Column(String(100), nullable=True)
+    
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    samples = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_price_rollups_resolution_bucket_start", "resolution", "bucket_start"),
+        Index(
+            "ix_price_rollups_category_state",
+            "resolution",
+            "category",
+            "location_state",
+            "bucket_start"
+        ),
+    )
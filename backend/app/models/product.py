@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, Text, Boolean, DateTime, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Text, Boolean, DateTime, ForeignKey, Enum, Index, DDL, JSON, event
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 import enum
 from app.core.config.db import Base
+from app.utils.helpers.seasons import ALL_MONTHS_MASK
 
 
 class ProductCategory(str, enum.Enum):
@@ -22,6 +24,11 @@ class ProductStatus(str, enum.Enum):
     SUSPENDED = "suspended"
 
 
+# JSON list of image URLs: native jsonb on Postgres, and SQL NULL (not a JSON
+# null) when there are no images so "has images" is an IS NOT NULL test
+ImageUrls = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+
 class Product(Base):
     __tablename__ = "products"
 
@@ -46,7 +53,7 @@ class Product(Base):
     expiry_date = Column(DateTime(timezone=True), nullable=True)
     
     # Images
-    image_urls = Column(Text, nullable=True)  # JSON array of image URLs
+    image_urls = Column(ImageUrls, nullable=True)  # list of image URLs, NULL when empty
     
     # Status
     status = Column(Enum(ProductStatus), default=ProductStatus.ACTIVE)
@@ -59,6 +66,12 @@ class Product(Base):
     # Seasonality
     is_seasonal = Column(Boolean, default=False)
     season_months = Column(String(100), nullable=True)  # "jan,feb,mar"
+    # Parsed season_months: bit 0 = January ... bit 11 = December, all bits
+    # set for products that are not seasonal (see app.utils.helpers.seasons)
+    season_mask = Column(Integer, nullable=False, default=ALL_MONTHS_MASK, server_default=str(ALL_MONTHS_MASK))
+    
+    # Full-text search document, maintained by the products_search_vector trigger
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -68,4 +81,36 @@ class Product(Base):
     farmer = relationship("User", back_populates="products")
     order_items = relationship("OrderItem", back_populates="product")
     cart_items = relationship("CartItem", back_populates="product")
+    
+    __table_args__ = (
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_products_status_created_at", "status", "created_at", "id"),
+        Index("ix_products_changed_at", func.coalesce(updated_at, created_at), id),
+    )
+
+
+# Name and category weigh more than location, which weighs more than description
+PRODUCT_SEARCH_TRIGGER = DDL("""
+CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.category::text, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.location_state, '') || ' ' || coalesce(NEW.location_city, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER products_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, category, description, location_state, location_city
+    ON products
+    FOR EACH ROW EXECUTE FUNCTION products_search_vector_update();
+""")
+
+event.listen(
+    Product.__table__,
+    "after_create",
+    PRODUCT_SEARCH_TRIGGER.execute_if(dialect="postgresql")
+)
 
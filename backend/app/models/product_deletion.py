@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, DateTime, Index
+from sqlalchemy.sql import func
+from app.core.config.db import Base
+
+
+class ProductDeletion(Base):
+    """Tombstone of a deleted product, so incremental catalog exports can
+    tell partners to drop it. Written by the product delete endpoint.
+    """
+    __tablename__ = "product_deletions"
+
+    product_id = Column(Integer, primary_key=True)
+    farmer_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_product_deletions_deleted_at", "deleted_at", "product_id"),
+    )
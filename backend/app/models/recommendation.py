@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.core.config.db import Base
+
+
+class ProductRecommendation(Base):
+    """Precomputed "bought together" neighbours of one product.
+
+    Rebuilt wholesale by app.jobs.build_recommendations; serving is a primary
+    key read, never an aggregation over order_items.
+    """
+    __tablename__ = "product_recommendations"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Parallel lists, best first
+    neighbour_ids = Column(JSON, nullable=False)
+    scores = Column(JSON, nullable=False)
+    
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
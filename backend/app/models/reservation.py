@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Enum, Index, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+from app.core.config.db import Base
+
+
+class ReservationStatus(str, enum.Enum):
+    HELD = "held"  # Stock taken at checkout, awaiting farmer acceptance
+    COMMITTED = "committed"  # Order accepted, stock sold
+    RELEASED = "released"  # Stock returned (rejected, cancelled or expired)
+
+
+class InventoryReservation(Base):
+    """Stock set aside for one order item.
+
+    The quantity is subtracted from products.available_quantity when the
+    reservation is taken and added back when it is released, so
+    available_quantity is always what can still be bought. Held reservations
+    expire after INVENTORY_RESERVATION_TTL_MINUTES and are released by
+    app.jobs.release_expired_reservations.
+    """
+    __tablename__ = "inventory_reservations"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    
+    quantity = Column(Float, nullable=False)
+    status = Column(Enum(ReservationStatus), nullable=False, default=ReservationStatus.HELD)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    order = relationship("Order")
+    
+    __table_args__ = (
+        Index(
+            "ix_inventory_reservations_held_expires_at",
+            "expires_at",
+            postgresql_where=text("status = 'HELD'")
+        ),
+    )
@@ -39,6 +39,9 @@ class User(Base):
     farm_location_state = Column(String(100), nullable=True)
     farm_location_city = Column(String(100), nullable=True)
     farm_location_coordinates = Column(String(100), nullable=True)  # lat,lng
+    farm_latitude = Column(Float, nullable=True)  # Parsed from farm_location_coordinates
+    farm_longitude = Column(Float, nullable=True)
+    farm_geo_cell = Column(Integer, nullable=True)  # See app.utils.helpers.geo
     bank_account_number = Column(String(20), nullable=True)
     bank_name = Column(String(100), nullable=True)
     account_name = Column(String(200), nullable=True)
@@ -62,5 +65,5 @@ class User(Base):
     reviews_given = relationship("Review", foreign_keys="Review.buyer_id", back_populates="buyer")
     reviews_received = relationship("Review", foreign_keys="Review.farmer_id", back_populates="farmer")
     cart_items = relationship("CartItem", back_populates="buyer", cascade="all, delete-orphan")
-    withdrawals = relationship("Withdrawal", back_populates="farmer", cascade="all, delete-orphan")
+    withdrawals = relationship("Withdrawal", foreign_keys="Withdrawal.farmer_id", back_populates="farmer", cascade="all, delete-orphan")
 
@@ -12,21 +12,38 @@ from app.schemas.product import (
     ProductBase,
     ProductCreate,
     ProductUpdate,
+    ProductBatchUpdateItem,
     ProductResponse,
     ProductListItem,
+    NearbyProductItem,
+    Suggestion,
+    SeasonalProduct,
+    InSeasonSummary,
+    PriceCandle,
+    PriceHistory,
+    FacetCount,
+    PriceBucketCount,
+    CatalogFacets,
 )
 from app.schemas.order import (
     OrderCreate,
     OrderItemCreate,
+    CheckoutCreate,
     OrderResponse,
+    CheckoutResponse,
     OrderStatusUpdate,
+    OrderStatusBatchItem,
+    OrderStatusBatchResult,
     OrderListResponse,
+    OrderStatusCountsResponse,
 )
 from app.schemas.cart import (
     CartItemCreate,
     CartItemUpdate,
+    CartOperation,
     CartItemResponse,
     CartResponse,
+    CartSummaryResponse,
 )
 from app.schemas.payment import (
     PaymentInitiate,
@@ -46,6 +63,10 @@ from app.schemas.dispute import (
     DisputeUpdate,
     DisputeResponse,
 )
+from app.schemas.import_job import (
+    ImportRowError,
+    ImportJobResponse,
+)
 
 __all__ = [
     "UserBase",
@@ -59,17 +80,34 @@ __all__ = [
     "ProductBase",
     "ProductCreate",
     "ProductUpdate",
+    "ProductBatchUpdateItem",
     "ProductResponse",
     "ProductListItem",
+    "NearbyProductItem",
+    "Suggestion",
+    "SeasonalProduct",
+    "InSeasonSummary",
+    "PriceCandle",
+    "PriceHistory",
+    "FacetCount",
+    "PriceBucketCount",
+    "CatalogFacets",
     "OrderCreate",
     "OrderItemCreate",
+    "CheckoutCreate",
     "OrderResponse",
+    "CheckoutResponse",
     "OrderStatusUpdate",
+    "OrderStatusBatchItem",
+    "OrderStatusBatchResult",
     "OrderListResponse",
+    "OrderStatusCountsResponse",
     "CartItemCreate",
     "CartItemUpdate",
+    "CartOperation",
     "CartItemResponse",
     "CartResponse",
+    "CartSummaryResponse",
     "PaymentInitiate",
     "PaymentVerification",
     "PaymentResponse",
@@ -82,5 +120,7 @@ __all__ = [
     "DisputeCreate",
     "DisputeUpdate",
     "DisputeResponse",
+    "ImportRowError",
+    "ImportJobResponse",
 ]
 
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, validator
+from typing import Literal, Optional
 from datetime import datetime
 from app.schemas.product import ProductListItem
 
@@ -13,6 +13,19 @@ class CartItemUpdate(BaseModel):
     quantity: float
 
 
+class CartOperation(BaseModel):
+    """One step of a batch cart update; operations apply in order"""
+    op: Literal["add", "set", "remove"]
+    product_id: int
+    quantity: Optional[float] = None
+    
+    @validator("quantity", always=True)
+    def validate_quantity(cls, v, values):
+        if values.get("op") in ("add", "set") and (v is None or v <= 0):
+            raise ValueError("Quantity must be greater than 0")
+        return v
+
+
 class CartItemResponse(BaseModel):
     id: int
     product_id: int
@@ -29,3 +42,8 @@ class CartResponse(BaseModel):
     total_items: int
     subtotal: float
 
+
+
+class CartSummaryResponse(BaseModel):
+    total_items: int
+    subtotal: float
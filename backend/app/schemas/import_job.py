@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+from app.models.import_job import ImportJobStatus
+
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class ImportJobResponse(BaseModel):
+    id: int
+    filename: str
+    status: ImportJobStatus
+    total_rows: Optional[int] = None
+    processed_rows: int
+    imported_count: int
+    error_count: int
+    errors: Optional[List[ImportRowError]] = None
+    failure_reason: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
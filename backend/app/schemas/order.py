@@ -1,5 +1,5 @@
 from pydantic import BaseModel, validator
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from app.models.order import OrderStatus, DeliveryType, PaymentStatus
 
@@ -37,6 +37,11 @@ class OrderCreate(BaseModel):
         return v
 
 
+class CheckoutCreate(OrderCreate):
+    """Checkout that may span farmers; without items the whole cart is checked out"""
+    items: Optional[List[OrderItemCreate]] = None
+
+
 class OrderItemResponse(BaseModel):
     id: int
     product_id: int
@@ -62,6 +67,7 @@ class OrderResponse(BaseModel):
     total_amount: float
     payment_status: PaymentStatus
     payment_method: Optional[str] = None
+    checkout_reference: Optional[str] = None
     delivery_address: Optional[str] = None
     delivery_state: Optional[str] = None
     delivery_city: Optional[str] = None
@@ -77,11 +83,30 @@ class OrderResponse(BaseModel):
         from_attributes = True
 
 
+class CheckoutResponse(BaseModel):
+    checkout_reference: str
+    orders: List[OrderResponse]
+    subtotal: float
+    delivery_fee: float
+    total_amount: float
+
+
 class OrderStatusUpdate(BaseModel):
     status: OrderStatus
     farmer_notes: Optional[str] = None
 
 
+class OrderStatusBatchItem(OrderStatusUpdate):
+    order_id: int
+
+
+class OrderStatusBatchResult(BaseModel):
+    order_id: int
+    success: bool
+    status: Optional[OrderStatus] = None  # The order's status after the batch
+    error: Optional[str] = None
+
+
 class OrderListResponse(BaseModel):
     id: int
     order_number: str
@@ -95,3 +120,7 @@ class OrderListResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class OrderStatusCountsResponse(BaseModel):
+    counts: Dict[str, int]
+    total: int
@@ -1,13 +1,20 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from typing import Optional
 from datetime import datetime
 from app.models.payment import TransactionType, TransactionStatus
 
 
 class PaymentInitiate(BaseModel):
-    order_id: int
+    order_id: Optional[int] = None
+    checkout_reference: Optional[str] = None  # pays every order of a checkout
     payment_method: str  # card, bank_transfer, ussd, wallet
     gateway: str = "paystack"  # paystack or flutterwave
+    
+    @validator("checkout_reference", always=True)
+    def validate_target(cls, v, values):
+        if (values.get("order_id") is None) == (v is None):
+            raise ValueError("Provide either order_id or checkout_reference")
+        return v
 
 
 class PaymentVerification(BaseModel):
@@ -18,6 +25,7 @@ class PaymentVerification(BaseModel):
 class PaymentResponse(BaseModel):
     id: int
     order_id: Optional[int] = None
+    checkout_reference: Optional[str] = None
     transaction_type: TransactionType
     amount: float
     status: TransactionStatus
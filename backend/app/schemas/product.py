@@ -2,6 +2,7 @@ from pydantic import BaseModel, validator
 from typing import Optional, List
 from datetime import datetime
 from app.models.product import ProductCategory, ProductStatus
+from app.utils.helpers.seasons import parse_season_months
 
 
 class ProductBase(BaseModel):
@@ -28,6 +29,11 @@ class ProductCreate(ProductBase):
         if v <= 0:
             raise ValueError("Must be greater than 0")
         return v
+    
+    @validator("season_months")
+    def validate_season_months(cls, v):
+        parse_season_months(v)
+        return v
 
 
 class ProductUpdate(BaseModel):
@@ -46,6 +52,30 @@ class ProductUpdate(BaseModel):
     season_months: Optional[str] = None
     image_urls: Optional[List[str]] = None
     status: Optional[ProductStatus] = None
+    
+    @validator("season_months")
+    def validate_season_months(cls, v):
+        parse_season_months(v)
+        return v
+
+
+class ProductBatchUpdateItem(BaseModel):
+    product_id: int
+    price_per_unit: Optional[float] = None
+    available_quantity: Optional[float] = None
+    status: Optional[ProductStatus] = None
+    
+    @validator("price_per_unit")
+    def validate_price(cls, v):
+        if v is not None and v <= 0:
+            raise ValueError("Must be greater than 0")
+        return v
+    
+    @validator("available_quantity")
+    def validate_quantity(cls, v):
+        if v is not None and v < 0:
+            raise ValueError("Must not be negative")
+        return v
 
 
 class ProductResponse(ProductBase):
@@ -80,3 +110,62 @@ class ProductListItem(BaseModel):
     class Config:
         from_attributes = True
 
+
+class NearbyProductItem(ProductListItem):
+    distance_km: float
+
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str  # product, category or farm
+    count: int
+
+
+class SeasonalProduct(BaseModel):
+    name: str
+    category: ProductCategory
+    listings: int
+    farms: int
+    min_price: float
+    avg_price: float
+
+
+class InSeasonSummary(BaseModel):
+    state: str
+    month: int
+    products: List[SeasonalProduct] = []
+
+
+class PriceCandle(BaseModel):
+    bucket_start: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    samples: int
+
+
+class PriceHistory(BaseModel):
+    resolution: str  # raw, day or week
+    start: datetime
+    end: datetime
+    points: List[PriceCandle] = []
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    min_price: float
+    max_price: Optional[float] = None
+    count: int
+
+
+class CatalogFacets(BaseModel):
+    total: int
+    categories: List[FacetCount] = []
+    states: List[FacetCount] = []
+    cities: List[FacetCount] = []
+    price_buckets: List[PriceBucketCount] = []
@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr, validator
 from typing import Optional
 from datetime import datetime
 from app.models.user import UserRole, VerificationStatus
+from app.utils.helpers.geo import parse_coordinates
 
 
 class UserBase(BaseModel):
@@ -32,6 +33,11 @@ class FarmerOnboarding(UserBase):
     bank_name: str
     account_name: str
     verification_document_url: Optional[str] = None
+    
+    @validator("farm_location_coordinates")
+    def validate_coordinates(cls, v):
+        parse_coordinates(v)
+        return v
 
 
 class UserUpdate(BaseModel):
@@ -51,6 +57,11 @@ class FarmerProfileUpdate(BaseModel):
     bank_account_number: Optional[str] = None
     bank_name: Optional[str] = None
     account_name: Optional[str] = None
+    
+    @validator("farm_location_coordinates")
+    def validate_coordinates(cls, v):
+        parse_coordinates(v)
+        return v
 
 
 class UserResponse(BaseModel):
@@ -0,0 +1,105 @@
+from typing import Iterable, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config.settings import settings
+from app.utils.helpers.cache import TTLCache
+from app.utils.helpers.seasons import season_filter
+
+# Shared by catalog pages and product details. The cache is per worker
+# process: other workers only see a change once their own entry expires,
+# which is what CATALOG_CACHE_TTL_SECONDS bounds.
+catalog_cache = TTLCache(
+    max_size=settings.CATALOG_CACHE_SIZE,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS
+)
+
+ALL_PAGES_TAG = "pages"
+
+_PENDING_KEY = "catalog_cache_invalidations"
+
+
+def product_tag(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def farmer_tag(farmer_id: int) -> str:
+    return f"farmer:{farmer_id}"
+
+
+def filter_key(
+    category=None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    in_season: Optional[bool] = None,
+    month: Optional[int] = None,
+    has_images: Optional[bool] = None
+) -> tuple:
+    """Normalized catalog filter set, so equivalent filters share cache entries"""
+    def norm(value: Optional[str]) -> Optional[str]:
+        value = " ".join(value.lower().split()) if value else ""
+        return value or None
+
+    return (
+        category.value if category else None,
+        norm(search),
+        float(min_price) if min_price else None,
+        float(max_price) if max_price else None,
+        norm(state),
+        norm(city),
+        season_filter(in_season, month),
+        has_images,
+    )
+
+
+def page_key(cursor: Optional[str] = None, skip: int = 0, limit: int = 20, **filters) -> tuple:
+    """Cache key for one catalog page"""
+    return ("page",) + filter_key(**filters) + (cursor, 0 if cursor else skip, limit)
+
+
+def facets_key(**filters) -> tuple:
+    """Cache key for the facet counts of a filter set"""
+    return ("facets",) + filter_key(**filters)
+
+
+def product_key(product_id: int) -> tuple:
+    return ("product", product_id)
+
+
+def schedule_invalidation(
+    db: Session,
+    product_ids: Iterable[int] = (),
+    farmer_ids: Iterable[int] = (),
+    all_pages: bool = False
+) -> None:
+    """Queue cache invalidations to run once the session's transaction commits.
+
+    Evicting after commit (rather than before) means a concurrent request
+    cannot re-cache the old rows in the gap between eviction and commit.
+    Pages containing a listed product or farmer are always dropped;
+    all_pages also drops every page, for changes that can move a product
+    into or out of pages it was not on.
+    """
+    pending = db.info.setdefault(_PENDING_KEY, {"tags": set(), "all_pages": False})
+    pending["tags"].update(product_tag(product_id) for product_id in product_ids)
+    pending["tags"].update(farmer_tag(farmer_id) for farmer_id in farmer_ids)
+    pending["all_pages"] = pending["all_pages"] or all_pages
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    for tag in pending["tags"]:
+        catalog_cache.invalidate_tag(tag)
+    if pending["all_pages"]:
+        catalog_cache.invalidate_tag(ALL_PAGES_TAG)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+from sqlalchemy import func, select
+from app.core.config.db import SessionLocal
+from app.core.config.settings import settings
+from app.models.product import Product, ProductStatus
+from app.models.product_deletion import ProductDeletion
+from app.models.user import User
+
+EXPORT_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "category",
+    "price_per_unit",
+    "unit",
+    "available_quantity",
+    "location_state",
+    "location_city",
+    "image_urls",
+    "is_seasonal",
+    "season_months",
+    "status",
+    "farmer_id",
+    "farm_name",
+    "changed_at",
+)
+
+# When a product last changed; new products have no updated_at yet
+changed_at = func.coalesce(Product.updated_at, Product.created_at)
+
+
+def _overlapped(changed_since: datetime) -> datetime:
+    """changed_since moved back by the overlap window.
+
+    updated_at is the time the writing transaction started, so a change can
+    commit after an export that started later than it and is missed by a
+    filter on the previous export's start time. Rows in the overlap are
+    sent again; consumers apply them by id.
+    """
+    return changed_since - timedelta(seconds=settings.CATALOG_EXPORT_OVERLAP_SECONDS)
+
+
+def _export_query(changed_since: Optional[datetime]):
+    query = select(
+        Product.id,
+        Product.name,
+        Product.description,
+        Product.category,
+        Product.price_per_unit,
+        Product.unit,
+        Product.available_quantity,
+        Product.location_state,
+        Product.location_city,
+        Product.image_urls,
+        Product.is_seasonal,
+        Product.season_months,
+        Product.status,
+        Product.farmer_id,
+        User.farm_name,
+        changed_at,
+    ).join(User, User.id == Product.farmer_id)
+
+    if changed_since is None:
+        return query.where(Product.status == ProductStatus.ACTIVE).order_by(Product.id)
+
+    # Every status is included so consumers can drop products that went inactive
+    return query.where(changed_at > _overlapped(changed_since)).order_by(changed_at, Product.id)
+
+
+def _tombstone(product_id: int, farmer_id: int, deleted_at: datetime) -> dict:
+    record = dict.fromkeys(EXPORT_FIELDS)
+    record.update(id=product_id, status="deleted", farmer_id=farmer_id, changed_at=deleted_at.isoformat())
+    return record
+
+
+def _export_batches(changed_since: Optional[datetime]) -> Iterator[List[dict]]:
+    """Fetch export rows in batches through a server-side cursor.
+
+    Uses its own session because the response body is produced after the
+    request's dependencies (and their session) have been torn down.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            _export_query(changed_since),
+            execution_options={
+                "stream_results": True,
+                "yield_per": settings.CATALOG_EXPORT_BATCH_SIZE,
+            }
+        )
+        for partition in result.partitions():
+            batch = []
+            for row in partition:
+                record = dict(zip(EXPORT_FIELDS, row))
+                record["category"] = record["category"].value
+                record["status"] = record["status"].value
+                record["changed_at"] = record["changed_at"].isoformat() if record["changed_at"] else None
+                batch.append(record)
+            yield batch
+
+        if changed_since is None:
+            return
+        # Deleted products, after every existing one, as tombstones
+        deletions = db.execute(
+            select(ProductDeletion.product_id, ProductDeletion.farmer_id, ProductDeletion.deleted_at)
+            .where(ProductDeletion.deleted_at > _overlapped(changed_since))
+            .order_by(ProductDeletion.deleted_at, ProductDeletion.product_id),
+            execution_options={
+                "stream_results": True,
+                "yield_per": settings.CATALOG_EXPORT_BATCH_SIZE,
+            }
+        )
+        for partition in deletions.partitions():
+            yield [_tombstone(*row) for row in partition]
+    finally:
+        db.close()
+
+
+def stream_ndjson(changed_since: Optional[datetime] = None) -> Iterator[str]:
+    """One JSON object per line, yielded a batch at a time"""
+    for batch in _export_batches(changed_since):
+        yield "".join(json.dumps(record) + "\n" for record in batch)
+
+
+def stream_csv(changed_since: Optional[datetime] = None) -> Iterator[str]:
+    """CSV with a header row; image URLs are space-separated"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+
+    for batch in _export_batches(changed_since):
+        buffer.seek(0)
+        buffer.truncate()
+        for record in batch:
+            record["image_urls"] = " ".join(record["image_urls"] or [])
+            writer.writerow([record[field] for field in EXPORT_FIELDS])
+        yield buffer.getvalue()
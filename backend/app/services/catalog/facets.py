@@ -0,0 +1,81 @@
+from typing import List
+from sqlalchemy import case, func, tuple_
+from sqlalchemy.orm import Session
+from app.models.catalog import CatalogListing
+from app.schemas.product import CatalogFacets, FacetCount, PriceBucketCount
+from app.services.catalog.filters import apply_listing_filters
+
+# Upper bounds (NGN) of the price buckets; the last bucket is open-ended
+PRICE_BUCKET_BOUNDS = (500.0, 1000.0, 5000.0, 10000.0, 50000.0)
+
+# Values of grouping(category, state, city, price_bucket) for each grouping
+# set: a bit is set for every column aggregated away in that set.
+_BY_CATEGORY = 0b0111
+_BY_STATE = 0b1011
+_BY_CITY = 0b1101
+_BY_PRICE = 0b1110
+_TOTAL = 0b1111
+
+
+def _price_bucket(index: int) -> PriceBucketCount:
+    return PriceBucketCount(
+        min_price=PRICE_BUCKET_BOUNDS[index - 1] if index > 0 else 0.0,
+        max_price=PRICE_BUCKET_BOUNDS[index] if index < len(PRICE_BUCKET_BOUNDS) else None,
+        count=0
+    )
+
+
+def compute_facets(db: Session, **filters) -> CatalogFacets:
+    """Count matching listings per category, state, city and price bucket.
+
+    All facets come from one aggregate over catalog_listings using
+    GROUPING SETS, with the same filters as the catalog page itself.
+    """
+    price_bucket = case(
+        *[
+            (CatalogListing.price_per_unit < bound, index)
+            for index, bound in enumerate(PRICE_BUCKET_BOUNDS)
+        ],
+        else_=len(PRICE_BUCKET_BOUNDS)
+    )
+    columns = (
+        CatalogListing.category,
+        CatalogListing.location_state,
+        CatalogListing.location_city,
+        price_bucket,
+    )
+
+    query = db.query(*columns, func.grouping(*columns), func.count())
+    query, _ = apply_listing_filters(query, **filters)
+    rows = query.group_by(
+        func.grouping_sets(*[tuple_(column) for column in columns], tuple_())
+    ).all()
+
+    categories: List[FacetCount] = []
+    states: List[FacetCount] = []
+    cities: List[FacetCount] = []
+    buckets = [_price_bucket(index) for index in range(len(PRICE_BUCKET_BOUNDS) + 1)]
+    total = 0
+
+    for category, state, city, bucket, grouping_id, count in rows:
+        if grouping_id == _BY_CATEGORY:
+            categories.append(FacetCount(value=category.value, count=count))
+        elif grouping_id == _BY_STATE and state:
+            states.append(FacetCount(value=state, count=count))
+        elif grouping_id == _BY_CITY and city:
+            cities.append(FacetCount(value=city, count=count))
+        elif grouping_id == _BY_PRICE:
+            buckets[bucket].count = count
+        elif grouping_id == _TOTAL:
+            total = count
+
+    def by_count(facets: List[FacetCount]) -> List[FacetCount]:
+        return sorted(facets, key=lambda facet: (-facet.count, facet.value))
+
+    return CatalogFacets(
+        total=total,
+        categories=by_count(categories),
+        states=by_count(states),
+        cities=by_count(cities),
+        price_buckets=buckets
+    )
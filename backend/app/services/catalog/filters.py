@@ -0,0 +1,57 @@
+from typing import Optional, Tuple
+from sqlalchemy.orm import Query
+from app.models.catalog import CatalogListing
+from app.models.product import ProductCategory
+from app.services.catalog.search import apply_search
+from app.utils.helpers.seasons import month_bit, season_filter
+
+
+def apply_listing_filters(
+    query: Query,
+    category: Optional[ProductCategory] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    in_season: Optional[bool] = None,
+    month: Optional[int] = None,
+    has_images: Optional[bool] = None
+) -> Tuple[Query, Optional[object]]:
+    """Apply the buyer catalog filters to a query over catalog_listings.
+
+    Shared by catalog pages and facet counts so both always agree on what
+    the current filter set matches. Returns the filtered query and the search
+    rank expression (None when there is no usable search text).
+    Seasonality is a bitwise test on the precomputed season_mask.
+    """
+    if category:
+        query = query.filter(CatalogListing.category == category)
+    
+    rank = None
+    if search:
+        query, rank = apply_search(query, CatalogListing.search_vector, search)
+    
+    if min_price:
+        query = query.filter(CatalogListing.price_per_unit >= min_price)
+    
+    if max_price:
+        query = query.filter(CatalogListing.price_per_unit <= max_price)
+    
+    if state:
+        query = query.filter(CatalogListing.location_state.ilike(f"%{state}%"))
+    
+    if city:
+        query = query.filter(CatalogListing.location_city.ilike(f"%{city}%"))
+    
+    season = season_filter(in_season, month)
+    if season:
+        season_month, wanted = season
+        in_month = CatalogListing.season_mask.op("&")(month_bit(season_month)) != 0
+        query = query.filter(in_month if wanted else ~in_month)
+    
+    if has_images is not None:
+        with_images = CatalogListing.image_urls.isnot(None)
+        query = query.filter(with_images if has_images else ~with_images)
+    
+    return query, rank
@@ -0,0 +1,65 @@
+import math
+from typing import List, Optional
+from fastapi import Response
+from sqlalchemy.orm import Session
+from app.models.catalog import CatalogListing
+from app.schemas.product import NearbyProductItem
+from app.services.catalog.filters import apply_listing_filters
+from app.services.catalog.projection import listing_to_item
+from app.utils.helpers.geo import KM_PER_DEGREE, cells_within
+from app.utils.helpers.pagination import keyset_paginate
+
+MAX_NEARBY_RADIUS_KM = 300.0
+
+
+def nearby_listings(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+    **filters
+) -> List[NearbyProductItem]:
+    """Catalog listings within radius_km of a point, nearest first.
+
+    Candidates come from the geo_cell index (the grid cells overlapping the
+    search circle); distance is then checked and sorted on in SQL with an
+    equirectangular approximation, which is accurate to well under 1% at
+    these radii.
+    """
+    lng_scale = math.cos(math.radians(latitude))
+    dx = (CatalogListing.longitude - longitude) * lng_scale
+    dy = CatalogListing.latitude - latitude
+    distance_squared = dx * dx + dy * dy
+
+    query = db.query(CatalogListing).filter(
+        CatalogListing.geo_cell.in_(cells_within(latitude, longitude, radius_km)),
+        distance_squared <= (radius_km / KM_PER_DEGREE) ** 2
+    )
+    query, _ = apply_listing_filters(query, **filters)
+
+    # keyset_paginate orders descending, so sort on negated distance for nearest first
+    listings = keyset_paginate(
+        query,
+        [-distance_squared, CatalogListing.product_id],
+        response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit
+    )
+
+    result = []
+    for listing in listings:
+        distance_km = KM_PER_DEGREE * math.hypot(
+            (listing.longitude - longitude) * lng_scale,
+            listing.latitude - latitude
+        )
+        result.append(NearbyProductItem(
+            **listing_to_item(listing).model_dump(),
+            distance_km=round(distance_km, 2)
+        ))
+
+    return result
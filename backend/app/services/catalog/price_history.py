@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from app.core.config.settings import settings
+from app.models.price_history import PricePoint, PriceResolution, PriceRollup
+from app.models.product import Product, ProductCategory
+from app.schemas.product import PriceCandle, PriceHistory
+
+RAW_RETENTION = timedelta(days=settings.PRICE_RAW_RETENTION_DAYS)
+DAILY_RETENTION = timedelta(days=settings.PRICE_DAILY_RETENTION_DAYS)
+
+# Longest range served from raw points / daily candles; anything longer
+# (or older than their retention) is served from weekly candles
+RAW_MAX_SPAN = timedelta(days=3)
+DAILY_MAX_SPAN = timedelta(days=120)
+
+_BUCKET_LENGTH = {
+    PriceResolution.DAY: timedelta(days=1),
+    PriceResolution.WEEK: timedelta(weeks=1),
+}
+
+
+def record_prices(db: Session, product_ids: Iterable[int]) -> None:
+    """Append the current price of each product to the price history"""
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return
+
+    db.flush()
+    db.execute(insert(PricePoint).from_select(
+        [PricePoint.product_id, PricePoint.category, PricePoint.location_state, PricePoint.price_per_unit],
+        select(Product.id, Product.category, Product.location_state, Product.price_per_unit)
+        .where(Product.id.in_(product_ids))
+    ))
+
+
+def _utc(moment: datetime) -> datetime:
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def bucket_start(moment: datetime, resolution: PriceResolution) -> datetime:
+    """Start of the UTC day, or of the ISO week (Monday), containing moment"""
+    day = _utc(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == PriceResolution.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def choose_resolution(start: datetime, end: datetime, now: datetime) -> Optional[PriceResolution]:
+    """Coarsest-needed resolution for a range; None means raw points"""
+    span = end - start
+    if span <= RAW_MAX_SPAN and start >= now - RAW_RETENTION:
+        return None
+    if span <= DAILY_MAX_SPAN and start >= now - DAILY_RETENTION:
+        return PriceResolution.DAY
+    return PriceResolution.WEEK
+
+
+def _combine(candles: List[Tuple[float, float, float, float, int]]) -> Tuple[float, float, float, float, int]:
+    """Merge per-product candles of one bucket: mean open/close, extreme high/low"""
+    count = len(candles)
+    return (
+        sum(candle[0] for candle in candles) / count,
+        max(candle[1] for candle in candles),
+        min(candle[2] for candle in candles),
+        sum(candle[3] for candle in candles) / count,
+        sum(candle[4] for candle in candles),
+    )
+
+
+def price_history(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    product_id: Optional[int] = None,
+    category: Optional[ProductCategory] = None,
+    state: Optional[str] = None
+) -> PriceHistory:
+    """Price candles for one product, or averaged over a category and/or state.
+
+    Reads the coarsest stored series that fits the range: raw points for a
+    few recent days of one product, daily candles up to DAILY_MAX_SPAN,
+    weekly candles beyond that. Buckets the compaction job has not reached
+    yet are built from raw points on the fly. A product with no price change
+    in a bucket counts at its last known price (flat, zero-sample candles),
+    so averages always cover the same products.
+    """
+    start, end = _utc(start), _utc(end)
+    now = datetime.now(timezone.utc)
+    resolution = choose_resolution(start, end, now)
+    if resolution is None and product_id is None:
+        # Raw points of many products are not a meaningful series
+        resolution = PriceResolution.DAY
+
+    def point_filters(table):
+        filters = []
+        if product_id is not None:
+            filters.append(table.product_id == product_id)
+        if category is not None:
+            filters.append(table.category == category)
+        if state:
+            filters.append(func.lower(table.location_state) == state.strip().lower())
+        return filters
+
+    if resolution is None:
+        points = db.query(PricePoint.recorded_at, PricePoint.price_per_unit).filter(
+            *point_filters(PricePoint),
+            PricePoint.recorded_at >= start,
+            PricePoint.recorded_at <= end
+        ).order_by(PricePoint.recorded_at, PricePoint.id).all()
+        return PriceHistory(
+            resolution="raw",
+            start=start,
+            end=end,
+            points=[
+                PriceCandle(bucket_start=_utc(recorded_at), open=price, high=price, low=price, close=price, samples=1)
+                for recorded_at, price in points
+            ]
+        )
+
+    buckets: Dict[datetime, Tuple[float, float, float, float, int]] = {}
+
+    rollups = db.query(
+        PriceRollup.bucket_start,
+        func.avg(PriceRollup.open),
+        func.max(PriceRollup.high),
+        func.min(PriceRollup.low),
+        func.avg(PriceRollup.close),
+        func.sum(PriceRollup.samples)
+    ).filter(
+        *point_filters(PriceRollup),
+        PriceRollup.resolution == resolution,
+        PriceRollup.bucket_start >= bucket_start(start, resolution),
+        PriceRollup.bucket_start <= end
+    ).group_by(PriceRollup.bucket_start).all()
+    for bucket, open_, high, low, close, samples in rollups:
+        buckets[_utc(bucket)] = (open_, high, low, close, int(samples))
+
+    # Buckets after the last compacted one only exist as raw points
+    watermark = db.query(func.max(PriceRollup.bucket_start)).filter(
+        PriceRollup.resolution == resolution
+    ).scalar()
+    tail_start = _utc(watermark) + _BUCKET_LENGTH[resolution] if watermark else None
+    tail_start = max(tail_start, bucket_start(start, resolution)) if tail_start else bucket_start(start, resolution)
+
+    if tail_start <= end:
+        # Each product's price going into the tail: its candle in the last
+        # compacted bucket (the compaction job gives every listed product
+        # one), updated by any raw points between that bucket and the tail
+        prior: Dict[int, float] = {}
+        after = None
+        if watermark:
+            prior.update(db.query(PriceRollup.product_id, PriceRollup.close).filter(
+                *point_filters(PriceRollup),
+                PriceRollup.resolution == resolution,
+                PriceRollup.bucket_start == watermark
+            ).all())
+            after = _utc(watermark) + _BUCKET_LENGTH[resolution]
+        if after is None or after < tail_start:
+            latest = db.query(func.max(PricePoint.id)).filter(
+                *point_filters(PricePoint),
+                PricePoint.recorded_at < tail_start,
+                *([PricePoint.recorded_at >= after] if after else [])
+            ).group_by(PricePoint.product_id)
+            prior.update(db.query(PricePoint.product_id, PricePoint.price_per_unit).filter(
+                PricePoint.id.in_(latest)
+            ).all())
+
+        points = db.query(PricePoint.product_id, PricePoint.recorded_at, PricePoint.price_per_unit).filter(
+            *point_filters(PricePoint),
+            PricePoint.recorded_at >= tail_start,
+            PricePoint.recorded_at <= end
+        ).order_by(PricePoint.recorded_at, PricePoint.id).all()
+
+        candles: Dict[int, Dict[datetime, list]] = {}
+        for point_product_id, recorded_at, price in points:
+            product_candles = candles.setdefault(point_product_id, {})
+            bucket = bucket_start(recorded_at, resolution)
+            candle = product_candles.get(bucket)
+            if candle is None:
+                product_candles[bucket] = [price, price, price, price, 1]
+            else:
+                candle[1] = max(candle[1], price)
+                candle[2] = min(candle[2], price)
+                candle[3] = price
+                candle[4] += 1
+
+        tail_buckets = []
+        bucket = tail_start
+        while bucket <= end:
+            tail_buckets.append(bucket)
+            bucket += _BUCKET_LENGTH[resolution]
+
+        # Buckets a product had no point in carry its last price forward, so
+        # every bucket averages the same products
+        by_bucket: Dict[datetime, list] = {}
+        for tail_product_id in prior.keys() | candles.keys():
+            price = prior.get(tail_product_id)
+            product_candles = candles.get(tail_product_id, {})
+            for bucket in tail_buckets:
+                candle = product_candles.get(bucket)
+                if candle is not None:
+                    price = candle[3]
+                elif price is not None:
+                    candle = [price, price, price, price, 0]
+                else:
+                    continue
+                by_bucket.setdefault(bucket, []).append(candle)
+        for bucket, bucket_candles in by_bucket.items():
+            buckets[bucket] = _combine(bucket_candles)
+
+    return PriceHistory(
+        resolution=resolution.value,
+        start=start,
+        end=end,
+        points=[
+            PriceCandle(bucket_start=bucket, open=open_, high=high, low=low, close=close, samples=samples)
+            for bucket, (open_, high, low, close, samples) in sorted(buckets.items())
+        ]
+    )
@@ -0,0 +1,164 @@
+import csv
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import openpyxl
+from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.config.db import SessionLocal
+from app.core.config.settings import settings
+from app.models.import_job import ImportJob, ImportJobStatus
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.product import ProductCreate
+from app.services.catalog.price_history import record_prices
+from app.services.catalog.products import new_product_fields
+from app.services.catalog.projection import refresh_listings
+
+IMPORT_EXTENSIONS = {".csv", ".xlsx"}
+IMPORT_DIR = Path(settings.UPLOAD_DIR) / "imports"
+
+# Rows per multi-row INSERT (and per commit, so progress is visible while polling)
+IMPORT_BATCH_SIZE = 500
+
+# Row errors kept on the job; error_count still counts all of them
+MAX_REPORTED_ERRORS = 1000
+
+_URL_SEPARATOR = re.compile(r"[\s|,]+")
+
+
+async def save_import_upload(file: UploadFile) -> Tuple[Path, int]:
+    """Stream an upload to disk; returns the path and size, or raises ValueError if it is too big"""
+    IMPORT_DIR.mkdir(parents=True, exist_ok=True)
+    path = IMPORT_DIR / f"{uuid.uuid4()}{Path(file.filename).suffix.lower()}"
+
+    size = 0
+    with open(path, "wb") as out:
+        while chunk := await file.read(1024 * 1024):
+            size += len(chunk)
+            if size > settings.PRODUCT_IMPORT_MAX_BYTES:
+                out.close()
+                path.unlink()
+                raise ValueError(f"File exceeds maximum size of {settings.PRODUCT_IMPORT_MAX_BYTES} bytes")
+            out.write(chunk)
+    return path, size
+
+
+def _read_rows(path: Path) -> Iterator[dict]:
+    if path.suffix == ".xlsx":
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, ())
+            for values in rows:
+                yield dict(zip(header, values))
+        finally:
+            workbook.close()
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as source:
+        yield from csv.DictReader(source)
+
+
+def _is_blank(raw: dict) -> bool:
+    return all(value is None or (isinstance(value, str) and not value.strip()) for value in raw.values())
+
+
+def _count_rows(path: Path) -> int:
+    """Rows the import will process (blank rows are skipped)"""
+    return sum(1 for raw in _read_rows(path) if not _is_blank(raw))
+
+
+def _clean_row(raw: dict) -> dict:
+    """Normalize header names, drop blank cells and split image URL lists"""
+    row = {}
+    for key, value in raw.items():
+        if key is None or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        row[str(key).strip().lower().replace(" ", "_")] = value
+
+    if isinstance(row.get("image_urls"), str):
+        row["image_urls"] = [url for url in _URL_SEPARATOR.split(row["image_urls"]) if url]
+    return row
+
+
+def validate_row(raw: dict) -> Tuple[Optional[ProductCreate], List[str]]:
+    try:
+        return ProductCreate(**_clean_row(raw)), []
+    except ValidationError as exc:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in exc.errors()
+        ]
+
+
+def _insert_batch(db: Session, job: ImportJob, batch: List[dict], errors: List[dict]) -> None:
+    if batch:
+        product_ids = db.execute(insert(Product).returning(Product.id), batch).scalars().all()
+        record_prices(db, product_ids)
+        refresh_listings(db, product_ids)
+        job.imported_count += len(product_ids)
+    job.errors = list(errors)
+    db.commit()
+
+
+def run_import(db: Session, job: ImportJob, path: Path) -> None:
+    """Validate every row with ProductCreate and insert the valid ones in batches.
+
+    Each batch commits on its own, so a failure part way through leaves the
+    earlier batches imported (imported_count says how many).
+    """
+    farmer = db.get(User, job.farmer_id)
+    job.status = ImportJobStatus.RUNNING
+    job.total_rows = _count_rows(path)
+    db.commit()
+
+    batch: List[dict] = []
+    errors: List[dict] = []
+    # Row 1 is the header, so data starts on row 2 as spreadsheets number it
+    for row_number, raw in enumerate(_read_rows(path), start=2):
+        if _is_blank(raw):
+            continue
+
+        product_data, row_errors = validate_row(raw)
+        job.processed_rows += 1
+        if row_errors:
+            job.error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "errors": row_errors})
+        else:
+            batch.append(new_product_fields(product_data, farmer))
+
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            _insert_batch(db, job, batch, errors)
+            batch = []
+
+    job.status = ImportJobStatus.COMPLETED
+    job.completed_at = datetime.now(timezone.utc)
+    _insert_batch(db, job, batch, errors)
+
+
+def run_import_job(job_id: int, path: Path) -> None:
+    """Run an import in its own session, recording failures on the job, then delete the file"""
+    db = SessionLocal()
+    try:
+        job = db.get(ImportJob, job_id)
+        try:
+            run_import(db, job, path)
+        except Exception as exc:
+            db.rollback()
+            job.status = ImportJobStatus.FAILED
+            job.failure_reason = str(exc)[:500]
+            job.completed_at = datetime.now(timezone.utc)
+            db.commit()
+    finally:
+        db.close()
+        path.unlink(missing_ok=True)
@@ -0,0 +1,44 @@
+from app.models.product import ProductStatus
+from app.models.user import User
+from app.schemas.product import ProductCreate
+from app.utils.helpers.seasons import season_mask
+
+
+def inventory_changes(total_quantity: float, changes: dict) -> dict:
+    """Columns implied by an available_quantity change.
+
+    total_quantity never drops below what is available, and a product whose
+    stock reaches zero becomes SOLD_OUT (overriding any status in changes).
+    """
+    if changes.get("available_quantity") is None:
+        return {}
+
+    available_quantity = changes["available_quantity"]
+    implied = {"total_quantity": max(total_quantity, available_quantity)}
+    if available_quantity <= 0:
+        implied["status"] = ProductStatus.SOLD_OUT
+    return implied
+
+
+def new_product_fields(product_data: ProductCreate, farmer: User) -> dict:
+    """Column values for a new listing, shared by single create and bulk import"""
+    return dict(
+        farmer_id=farmer.id,
+        name=product_data.name,
+        description=product_data.description,
+        category=product_data.category,
+        price_per_unit=product_data.price_per_unit,
+        unit=product_data.unit,
+        available_quantity=product_data.available_quantity,
+        total_quantity=product_data.available_quantity,
+        freshness_level=product_data.freshness_level,
+        harvest_date=product_data.harvest_date,
+        expiry_date=product_data.expiry_date,
+        location_state=product_data.location_state or farmer.farm_location_state,
+        location_city=product_data.location_city or farmer.farm_location_city,
+        is_seasonal=product_data.is_seasonal,
+        season_months=product_data.season_months,
+        season_mask=season_mask(product_data.is_seasonal, product_data.season_months),
+        image_urls=product_data.image_urls or None,
+        status=ProductStatus.ACTIVE
+    )
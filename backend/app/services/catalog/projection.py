@@ -0,0 +1,195 @@
+from typing import Dict, Iterable
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from app.models.catalog import CatalogListing
+from app.models.product import Product, ProductStatus
+from app.models.user import User
+from app.schemas.product import ProductListItem
+from app.services.catalog.cache import schedule_invalidation
+from app.services.catalog.suggest import listing_terms, schedule_suggest_updates
+from app.services.orders.cart import refresh_cart_summaries
+
+
+# Columns that decide which catalog pages a listing appears on and where
+_PLACEMENT_COLUMNS = (
+    CatalogListing.product_id,
+    CatalogListing.name,
+    CatalogListing.category,
+    CatalogListing.price_per_unit,
+    CatalogListing.location_state,
+    CatalogListing.location_city,
+    CatalogListing.season_mask,
+    CatalogListing.search_vector,
+    CatalogListing.created_at,
+)
+
+# Placement plus the fields the suggestion index is built from
+_RETURNED_COLUMNS = _PLACEMENT_COLUMNS + (CatalogListing.farm_name,)
+
+
+def refresh_listings(db: Session, product_ids: Iterable[int]) -> None:
+    """Rebuild the catalog rows for the given products.
+
+    Runs inside the caller's transaction: pending ORM changes are flushed
+    first, then the rows are replaced with one DELETE and one INSERT ... SELECT.
+    Products that are no longer ACTIVE (or no longer exist) simply drop out.
+
+    The old and new rows are compared to invalidate the catalog cache on
+    commit: only pages showing these products are dropped, unless a product
+    appeared, disappeared or changed a filtered/sorted field, in which case
+    every cached page is. The suggestion index is updated on commit as well,
+    and cart summaries holding a product that was listed, unlisted or repriced
+    are rebuilt.
+    """
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return
+
+    db.flush()
+    old_rows = db.execute(
+        delete(CatalogListing)
+        .where(CatalogListing.product_id.in_(product_ids))
+        .returning(*_RETURNED_COLUMNS)
+    ).all()
+
+    source = select(
+        Product.id,
+        Product.farmer_id,
+        User.first_name + " " + User.last_name,
+        User.farm_name,
+        Product.name,
+        Product.category,
+        Product.price_per_unit,
+        Product.unit,
+        Product.available_quantity,
+        Product.location_state,
+        Product.location_city,
+        User.farm_latitude,
+        User.farm_longitude,
+        User.farm_geo_cell,
+        Product.season_mask,
+        Product.image_urls,
+        Product.search_vector,
+        Product.created_at,
+    ).join(User, User.id == Product.farmer_id).where(
+        Product.id.in_(product_ids),
+        Product.status == ProductStatus.ACTIVE
+    )
+
+    new_rows = db.execute(insert(CatalogListing).from_select([
+        CatalogListing.product_id,
+        CatalogListing.farmer_id,
+        CatalogListing.farmer_name,
+        CatalogListing.farm_name,
+        CatalogListing.name,
+        CatalogListing.category,
+        CatalogListing.price_per_unit,
+        CatalogListing.unit,
+        CatalogListing.available_quantity,
+        CatalogListing.location_state,
+        CatalogListing.location_city,
+        CatalogListing.latitude,
+        CatalogListing.longitude,
+        CatalogListing.geo_cell,
+        CatalogListing.season_mask,
+        CatalogListing.image_urls,
+        CatalogListing.search_vector,
+        CatalogListing.created_at,
+    ], source).returning(*_RETURNED_COLUMNS)).all()
+
+    placement_size = len(_PLACEMENT_COLUMNS)
+    old_placement = {row[0]: tuple(row[:placement_size]) for row in old_rows}
+    new_placement = {row[0]: tuple(row[:placement_size]) for row in new_rows}
+    schedule_invalidation(
+        db,
+        product_ids=product_ids,
+        all_pages=old_placement != new_placement
+    )
+
+    old_prices = {row.product_id: row.price_per_unit for row in old_rows}
+    new_prices = {row.product_id: row.price_per_unit for row in new_rows}
+    refresh_cart_summaries(db, product_ids=[
+        product_id for product_id in product_ids
+        if old_prices.get(product_id) != new_prices.get(product_id)
+    ])
+
+    new_terms = {
+        row.product_id: listing_terms(row.name, row.category, row.farm_name)
+        for row in new_rows
+    }
+    schedule_suggest_updates(
+        db,
+        [(product_id, new_terms.get(product_id)) for product_id in product_ids]
+    )
+
+
+def refresh_farmer_listings(db: Session, farmer: User) -> None:
+    """Copy a farmer's display fields and farm position onto all of their catalog rows"""
+    schedule_invalidation(db, farmer_ids=[farmer.id])
+    rows = db.execute(
+        update(CatalogListing)
+        .where(CatalogListing.farmer_id == farmer.id)
+        .values(
+            farmer_name=f"{farmer.first_name} {farmer.last_name}",
+            farm_name=farmer.farm_name,
+            latitude=farmer.farm_latitude,
+            longitude=farmer.farm_longitude,
+            geo_cell=farmer.farm_geo_cell
+        )
+        .returning(CatalogListing.product_id, CatalogListing.name, CatalogListing.category)
+    ).all()
+    schedule_suggest_updates(db, [
+        (row.product_id, listing_terms(row.name, row.category, farmer.farm_name))
+        for row in rows
+    ])
+
+
+def listing_to_item(listing: CatalogListing) -> ProductListItem:
+    return ProductListItem(
+        id=listing.product_id,
+        name=listing.name,
+        category=listing.category,
+        price_per_unit=listing.price_per_unit,
+        unit=listing.unit,
+        available_quantity=listing.available_quantity,
+        location_state=listing.location_state,
+        location_city=listing.location_city,
+        image_urls=listing.image_urls,
+        farmer_id=listing.farmer_id,
+        farmer_name=listing.farmer_name
+    )
+
+
+def product_to_item(product: Product) -> ProductListItem:
+    """Build a list item straight from a product, for products not in the catalog"""
+    farmer = product.farmer
+    return ProductListItem(
+        id=product.id,
+        name=product.name,
+        category=product.category,
+        price_per_unit=product.price_per_unit,
+        unit=product.unit,
+        available_quantity=product.available_quantity,
+        location_state=product.location_state,
+        location_city=product.location_city,
+        image_urls=product.image_urls,
+        farmer_id=product.farmer_id,
+        farmer_name=f"{farmer.first_name} {farmer.last_name}" if farmer else None
+    )
+
+
+def get_list_items(db: Session, product_ids: Iterable[int]) -> Dict[int, ProductListItem]:
+    """Catalog items for the given products, keyed by product id (ACTIVE only)"""
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return {}
+
+    listings = db.query(CatalogListing).filter(
+        CatalogListing.product_id.in_(product_ids)
+    ).all()
+    return {listing.product_id: listing_to_item(listing) for listing in listings}
+
+
+def get_list_item(db: Session, product: Product) -> ProductListItem:
+    """Catalog item for one product, built from the product itself if it is not listed"""
+    return get_list_items(db, [product.id]).get(product.id) or product_to_item(product)
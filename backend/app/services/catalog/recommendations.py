@@ -0,0 +1,30 @@
+from typing import Dict, Iterable, List
+from sqlalchemy.orm import Session
+from app.models.recommendation import ProductRecommendation
+from app.schemas.product import ProductListItem
+from app.services.catalog.projection import get_list_items
+
+# Stored neighbours per product; more than is served so that inactive
+# products can be skipped without running short
+TOP_K = 30
+
+
+def recommended_items(db: Session, product_ids: Iterable[int], limit: int = 10) -> List[ProductListItem]:
+    """Products bought together with any of product_ids, best first.
+
+    Neighbour scores of several seed products (e.g. a cart) are summed. Seeds
+    themselves and products that are no longer listed are left out.
+    """
+    seeds = set(product_ids)
+    if not seeds:
+        return []
+
+    scores: Dict[int, float] = {}
+    for row in db.query(ProductRecommendation).filter(ProductRecommendation.product_id.in_(seeds)):
+        for neighbour_id, score in zip(row.neighbour_ids, row.scores):
+            if neighbour_id not in seeds:
+                scores[neighbour_id] = scores.get(neighbour_id, 0.0) + score
+
+    ranked = sorted(scores, key=scores.get, reverse=True)[:TOP_K]
+    listed = get_list_items(db, ranked)
+    return [listed[product_id] for product_id in ranked if product_id in listed][:limit]
@@ -0,0 +1,71 @@
+import re
+from typing import Optional, Tuple
+from sqlalchemy import Float, cast, func
+from sqlalchemy.orm import Query
+
+# Products are indexed with the 'simple' configuration (no stemming), so plurals
+# and partial words are matched by prefix instead: "tomato" finds "tomatoes".
+SEARCH_CONFIG = "simple"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_tsquery(search: str) -> Optional[str]:
+    """Parse free-text search input into a to_tsquery() expression.
+
+    Words are ANDed together and prefix-matched. ``or`` between two words
+    turns them into an alternative, and a leading ``-`` excludes a word:
+    ``"yam or cassava -ogun"`` becomes ``(yam:* | cassava:*) & !ogun:*``.
+    Returns None when the input has nothing searchable in it.
+    """
+    groups = []
+    join_next = False
+
+    for raw_token in search.split():
+        negate = raw_token.startswith("-")
+        words = _WORD_RE.findall(raw_token.lower())
+        if not words:
+            continue
+
+        if words == ["or"] and not negate:
+            join_next = bool(groups)
+            continue
+
+        # Punctuation inside a token ("sweet-potato") splits it into a phrase
+        term = " <-> ".join(f"{word}:*" for word in words)
+        if len(words) > 1:
+            term = f"({term})"
+        if negate:
+            term = f"!{term}"
+
+        if join_next and groups:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        join_next = False
+
+    if not groups:
+        return None
+
+    parts = [
+        terms[0] if len(terms) == 1 else "(" + " | ".join(terms) + ")"
+        for terms in groups
+    ]
+    return " & ".join(parts)
+
+
+def apply_search(query: Query, search_vector, search: str) -> Tuple[Query, Optional[object]]:
+    """Filter a query by full-text search against a tsvector column.
+
+    Returns the filtered query and the relevance rank expression to order by,
+    or the untouched query and None if the search text has no usable words.
+    """
+    tsquery_text = build_tsquery(search)
+    if tsquery_text is None:
+        return query, None
+
+    tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+    query = query.filter(search_vector.op("@@")(tsquery))
+    # ts_rank_cd is float4; as float8 the rank round-trips exactly through page cursors
+    rank = cast(func.ts_rank_cd(search_vector, tsquery), Float(53))
+    return query, rank
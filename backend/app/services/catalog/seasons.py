@@ -0,0 +1,51 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.catalog import CatalogListing
+from app.schemas.product import InSeasonSummary, SeasonalProduct
+from app.utils.helpers.seasons import ALL_MONTHS_MASK, month_bit
+
+
+def in_season_summary(db: Session, state: str, month: int, limit: int = 50) -> InSeasonSummary:
+    """Seasonal products listed in a state that are in season in the given month.
+
+    One aggregate over catalog_listings, narrowed by the (lower(state),
+    season_mask) index and a bitwise test on the month. Products available
+    all year are left out, since they say nothing about the season.
+    """
+    product_name = func.lower(CatalogListing.name)
+    listings = func.count(CatalogListing.product_id)
+
+    rows = db.query(
+        func.min(CatalogListing.name),
+        CatalogListing.category,
+        listings,
+        func.count(func.distinct(CatalogListing.farmer_id)),
+        func.min(CatalogListing.price_per_unit),
+        func.avg(CatalogListing.price_per_unit)
+    ).filter(
+        func.lower(CatalogListing.location_state) == state.strip().lower(),
+        CatalogListing.season_mask != ALL_MONTHS_MASK,
+        CatalogListing.season_mask.op("&")(month_bit(month)) != 0
+    ).group_by(
+        CatalogListing.category,
+        product_name
+    ).order_by(
+        listings.desc(),
+        product_name
+    ).limit(limit).all()
+
+    return InSeasonSummary(
+        state=state,
+        month=month,
+        products=[
+            SeasonalProduct(
+                name=name,
+                category=category,
+                listings=count,
+                farms=farms,
+                min_price=min_price,
+                avg_price=round(avg_price, 2)
+            )
+            for name, category, count, farms, min_price, avg_price in rows
+        ]
+    )
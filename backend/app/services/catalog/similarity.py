@@ -0,0 +1,392 @@
+"""Content-based "similar products" from hashed n-gram TF-IDF vectors.
+
+Each product's name, category, location and description become a sparse
+TF-IDF vector over hashed word and character-trigram features. Neighbours
+are precomputed (chunked sparse matrix products) and written as .npy arrays
+that every worker memory-maps, so a lookup is a binary search plus a slice:
+
+    <SIMILARITY_DIR>/<version>/ids.npy         sorted product ids (N,)
+    <SIMILARITY_DIR>/<version>/neighbours.npy  neighbour product ids (N, TOP_K), -1 = none
+    <SIMILARITY_DIR>/<version>/scores.npy      cosine similarities (N, TOP_K)
+    <SIMILARITY_DIR>/<version>/vectors.npz     the TF-IDF matrix, for incremental updates
+    <SIMILARITY_DIR>/<version>/idf.npy
+    <SIMILARITY_DIR>/CURRENT                   name of the live version
+    <SIMILARITY_DIR>/THROUGH                   product changes applied up to this time
+
+A full build (app.jobs.build_similar_products) recomputes everything; in
+between, app.jobs.patch_similar_products applies the products changed since
+(by updated_at) to their rows and their neighbours' rows, all in one new
+version per run. Versions are switched by atomically replacing CURRENT.
+"""
+import math
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config.settings import settings
+from app.models.product import Product, ProductStatus
+from app.schemas.product import ProductListItem
+from app.services.catalog.projection import get_list_items
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development servers only
+    fcntl = None
+
+VECTOR_DIM = 1 << 18
+TOP_K = 20
+
+# Dense similarity cells computed per chunk (~64 MB of float32)
+CHUNK_CELLS = 1 << 24
+
+# Relative weight of each text field in the vector
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "category": 2.0,
+    "location": 1.0,
+    "description": 1.0,
+}
+
+# How far before the last applied time a patch looks for changed products,
+# so changes whose transaction committed after that patch ran are not missed
+PATCH_OVERLAP = timedelta(minutes=10)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_CURRENT = "CURRENT"
+_THROUGH = "THROUGH"
+
+
+def _feature(token: str) -> int:
+    return zlib.crc32(token.encode()) & (VECTOR_DIM - 1)
+
+
+def _product_features(name: str, category, description: Optional[str], state: Optional[str], city: Optional[str]) -> Counter:
+    """Weighted hashed feature counts: words of every field plus character trigrams of the name"""
+    fields = {
+        "name": name or "",
+        "category": category.value if category else "",
+        "location": f"{state or ''} {city or ''}",
+        "description": description or "",
+    }
+
+    features: Counter = Counter()
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for word in _WORD_RE.findall(text.lower()):
+            features[_feature(f"w:{word}")] += weight
+            if field == "name":
+                padded = f" {word} "
+                for position in range(len(padded) - 2):
+                    features[_feature(f"c:{padded[position:position + 3]}")] += weight / 2
+    return features
+
+
+def _term_matrix(documents: List[Counter]) -> sparse.csr_matrix:
+    """Sublinear term frequencies, one row per document"""
+    indptr, indices, data = [0], [], []
+    for features in documents:
+        indices.extend(features.keys())
+        data.extend(math.log1p(count) for count in features.values())
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(documents), VECTOR_DIM)
+    )
+
+
+def _weigh(term_matrix: sparse.csr_matrix, idf: np.ndarray) -> sparse.csr_matrix:
+    """Apply idf and L2-normalize rows so dot products are cosine similarities"""
+    weighted = term_matrix.multiply(idf).tocsr().astype(np.float32)
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(weighted).tocsr().astype(np.float32)
+
+
+def _top_k(similarities: np.ndarray, columns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Best TOP_K columns per row of a dense similarity block, as (ids, scores)"""
+    k = min(TOP_K, similarities.shape[1])
+    neighbours = np.full((similarities.shape[0], TOP_K), -1, dtype=np.int64)
+    scores = np.zeros((similarities.shape[0], TOP_K), dtype=np.float32)
+    if k == 0:
+        return neighbours, scores
+
+    best = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(similarities, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    best = np.take_along_axis(best, order, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+
+    found = best_scores > 0
+    neighbours[:, :k] = np.where(found, columns[best], -1)
+    scores[:, :k] = np.where(found, best_scores, 0)
+    return neighbours, scores
+
+
+def _nearest(queries: sparse.csr_matrix, vectors: sparse.csr_matrix, ids: np.ndarray, query_ids: np.ndarray):
+    """Neighbours of each query row among vectors, computed in bounded chunks"""
+    chunk = max(1, CHUNK_CELLS // max(len(ids), 1))
+    neighbour_blocks, score_blocks = [], []
+    for start in range(0, queries.shape[0], chunk):
+        block = (queries[start:start + chunk] @ vectors.T).toarray()
+        # A product is not its own neighbour
+        block[ids[None, :] == query_ids[start:start + chunk, None]] = 0
+        neighbours, scores = _top_k(block, ids)
+        neighbour_blocks.append(neighbours)
+        score_blocks.append(scores)
+    if not neighbour_blocks:
+        return np.empty((0, TOP_K), dtype=np.int64), np.empty((0, TOP_K), dtype=np.float32)
+    return np.vstack(neighbour_blocks), np.vstack(score_blocks)
+
+
+def _load_documents(db: Session, product_ids: Optional[Iterable[int]] = None) -> Tuple[np.ndarray, List[Counter]]:
+    query = select(
+        Product.id,
+        Product.name,
+        Product.category,
+        Product.description,
+        Product.location_state,
+        Product.location_city
+    ).where(Product.status == ProductStatus.ACTIVE).order_by(Product.id)
+    if product_ids is not None:
+        query = query.where(Product.id.in_(list(product_ids)))
+
+    ids, documents = [], []
+    for product_id, name, category, description, state, city in db.execute(query.execution_options(yield_per=5000)):
+        ids.append(product_id)
+        documents.append(_product_features(name, category, description, state, city))
+    return np.asarray(ids, dtype=np.int64), documents
+
+
+def _current_version(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, _CURRENT)) as current:
+            return current.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _read_through(directory: str) -> Optional[datetime]:
+    try:
+        with open(os.path.join(directory, _THROUGH)) as through:
+            return datetime.fromisoformat(through.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_through(directory: str, moment: datetime) -> None:
+    temporary = os.path.join(directory, f"{_THROUGH}.{os.getpid()}.tmp")
+    with open(temporary, "w") as through:
+        through.write(moment.isoformat())
+    os.replace(temporary, os.path.join(directory, _THROUGH))
+
+
+def _publish(directory: str, ids, neighbours, scores, vectors, idf) -> None:
+    """Write a new version and make it current; keeps the previous one for readers still mapping it"""
+    version = f"{time.time_ns()}"
+    path = os.path.join(directory, version)
+    os.makedirs(path)
+    np.save(os.path.join(path, "ids.npy"), ids)
+    np.save(os.path.join(path, "neighbours.npy"), neighbours)
+    np.save(os.path.join(path, "scores.npy"), scores)
+    np.save(os.path.join(path, "idf.npy"), idf)
+    sparse.save_npz(os.path.join(path, "vectors.npz"), vectors, compressed=False)
+
+    previous = _current_version(directory)
+    temporary = os.path.join(directory, f"{_CURRENT}.{os.getpid()}.tmp")
+    with open(temporary, "w") as current:
+        current.write(version)
+    os.replace(temporary, os.path.join(directory, _CURRENT))
+
+    for entry in os.listdir(directory):
+        if entry not in (version, previous, _CURRENT) and entry.isdigit():
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+class _DirectoryLock:
+    """Exclusive lock serializing writers of the similarity directory across processes"""
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, ".lock")
+
+    def __enter__(self):
+        self.file = open(self.path, "w")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+
+def build_index(db: Session, directory: str = settings.SIMILARITY_DIR) -> int:
+    """Recompute vectors, idf and neighbours for every active product"""
+    os.makedirs(directory, exist_ok=True)
+
+    # Holding the lock throughout makes a patch that starts meanwhile wait
+    # and apply on top of the new build
+    with _DirectoryLock(directory):
+        started = datetime.now(timezone.utc)
+        ids, documents = _load_documents(db)
+
+        term_matrix = _term_matrix(documents)
+        document_frequency = np.bincount(term_matrix.indices, minlength=VECTOR_DIM)
+        idf = (np.log((1 + len(ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        vectors = _weigh(term_matrix, idf)
+        neighbours, scores = _nearest(vectors, vectors, ids, ids)
+
+        _publish(directory, ids, neighbours, scores, vectors, idf)
+        _write_through(directory, started)
+    return len(ids)
+
+
+def patch_index(db: Session, directory: str = settings.SIMILARITY_DIR) -> int:
+    """Apply product changes made since the last build or patch; returns the products patched.
+
+    Products changed since then (by updated_at, looking back PATCH_OVERLAP
+    further for transactions that committed late) get their vectors
+    recomputed with the stored idf; those whose vector did not change (stock,
+    price or status edits) are skipped. Changed products get fresh rows,
+    rows that listed a changed or removed product as a neighbour are
+    recomputed in full, and the changed products are offered to every other
+    row. Products that left the catalog are dropped. One new version is
+    written per run, none if nothing changed. Does nothing before the first
+    full build.
+    """
+    if _current_version(directory) is None:
+        return 0
+
+    with _DirectoryLock(directory):
+        version = _current_version(directory)
+        through = _read_through(directory)
+        if version is None or through is None:
+            return 0
+        started = datetime.now(timezone.utc)
+
+        path = os.path.join(directory, version)
+        ids = np.load(os.path.join(path, "ids.npy"))
+        neighbours = np.load(os.path.join(path, "neighbours.npy"))
+        scores = np.load(os.path.join(path, "scores.npy"))
+        idf = np.load(os.path.join(path, "idf.npy"))
+        vectors = sparse.load_npz(os.path.join(path, "vectors.npz")).tocsr()
+
+        candidates = db.execute(select(Product.id).where(
+            func.coalesce(Product.updated_at, Product.created_at) > through - PATCH_OVERLAP
+        )).scalars().all()
+        active = db.execute(select(Product.id).where(Product.status == ProductStatus.ACTIVE)).scalars().all()
+        removed = ids[~np.isin(ids, np.asarray(active, dtype=np.int64))]
+
+        changed_ids, documents = _load_documents(db, candidates)
+        changed_vectors = _weigh(_term_matrix(documents), idf)
+        differs = np.ones(len(changed_ids), dtype=bool)
+        if len(ids):
+            rows = np.minimum(np.searchsorted(ids, changed_ids), len(ids) - 1)
+            for position in np.flatnonzero(ids[rows] == changed_ids):
+                differs[position] = (vectors[rows[position]] != changed_vectors[position]).nnz > 0
+        changed_ids, changed_vectors = changed_ids[differs], changed_vectors[differs]
+
+        product_ids = np.union1d(removed, changed_ids)
+        if not len(product_ids):
+            _write_through(directory, started)
+            return 0
+
+        # Drop the changed and removed products, then append fresh rows
+        keep = ~np.isin(ids, product_ids)
+        ids, neighbours, scores, vectors = ids[keep], neighbours[keep], scores[keep], vectors[keep]
+        ids = np.concatenate([ids, changed_ids])
+        vectors = sparse.vstack([vectors, changed_vectors]).tocsr()
+
+        # Rows that listed a dropped product lost a slot: recompute them in full
+        affected = np.flatnonzero(np.isin(neighbours, product_ids).any(axis=1))
+        neighbours[affected], scores[affected] = _nearest(vectors[affected], vectors, ids, ids[affected])
+
+        changed_neighbours, changed_scores = _nearest(changed_vectors, vectors, ids, changed_ids)
+        neighbours = np.vstack([neighbours, changed_neighbours])
+        scores = np.vstack([scores, changed_scores])
+
+        # Offer the changed products to every other row as candidate
+        # neighbours (rows just computed in full already considered them)
+        complete = np.zeros(len(ids), dtype=bool)
+        complete[affected] = True
+        complete[len(ids) - len(changed_ids):] = True
+        chunk = max(1, CHUNK_CELLS // len(ids))
+        for start in range(0, len(changed_ids), chunk):
+            offered = changed_ids[start:start + chunk]
+            similarities = (vectors @ changed_vectors[start:start + chunk].T).toarray()
+            similarities[complete] = 0
+            candidates = np.hstack([neighbours, np.broadcast_to(offered, (len(ids), len(offered)))])
+            candidate_scores = np.hstack([scores, similarities.astype(np.float32)])
+            neighbours, scores = _merge_top_k(candidates, candidate_scores)
+
+        order = np.argsort(ids, kind="stable")
+        _publish(directory, ids[order], neighbours[order], scores[order], vectors[order], idf)
+        _write_through(directory, started)
+    return len(product_ids)
+
+
+def _merge_top_k(candidates: np.ndarray, candidate_scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    candidate_scores = np.where(candidates >= 0, candidate_scores, 0)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")[:, :TOP_K]
+    neighbours = np.take_along_axis(candidates, order, axis=1)
+    scores = np.take_along_axis(candidate_scores, order, axis=1)
+    return np.where(scores > 0, neighbours, -1), scores
+
+
+class SimilarityIndex:
+    """Read side: memory-maps the current version and follows version switches"""
+
+    def __init__(self, directory: str, reload_interval: float = 1.0):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._last_check = 0.0
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._arrays is not None and now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+
+        version = _current_version(self.directory)
+        if version is None or version == self._version:
+            return
+        path = os.path.join(self.directory, version)
+        with self._lock:
+            self._arrays = (
+                np.load(os.path.join(path, "ids.npy"), mmap_mode="r"),
+                np.load(os.path.join(path, "neighbours.npy"), mmap_mode="r"),
+                np.load(os.path.join(path, "scores.npy"), mmap_mode="r"),
+            )
+            self._version = version
+
+    def neighbours(self, product_id: int) -> List[int]:
+        self._refresh()
+        if self._arrays is None:
+            return []
+        ids, neighbours, _ = self._arrays
+        row = int(np.searchsorted(ids, product_id))
+        if row >= len(ids) or ids[row] != product_id:
+            return []
+        return [int(neighbour) for neighbour in neighbours[row] if neighbour >= 0]
+
+
+similarity_index = SimilarityIndex(settings.SIMILARITY_DIR)
+
+
+def similar_items(db: Session, product_id: int, limit: int = 10) -> List[ProductListItem]:
+    """Listed products whose text is most similar to this one, best first"""
+    neighbour_ids = similarity_index.neighbours(product_id)
+    listed = get_list_items(db, neighbour_ids)
+    return [listed[neighbour_id] for neighbour_id in neighbour_ids if neighbour_id in listed][:limit]
@@ -0,0 +1,548 @@
+"""Typeahead suggestions: a prefix index of product names, categories and farm names.
+
+The index is built as .npy arrays that every worker memory-maps (like the
+similar-products index), so switching versions is cheap and lookups only
+ever read finished structures:
+
+    <SUGGEST_DIR>/<version>/terms.npy, terms_offsets.npy  sorted "kind\\x1fdisplay" terms (UTF-8)
+    <SUGGEST_DIR>/<version>/term_counts.npy               listings using each term
+    <SUGGEST_DIR>/<version>/keys.npy, keys_offsets.npy    sorted search keys, one per word of a term
+    <SUGGEST_DIR>/<version>/key_terms.npy                 the term of each key
+    <SUGGEST_DIR>/<version>/prefixes.npy, prefixes_offsets.npy, prefix_top.npy
+                                                          most-listed terms of every prefix
+                                                          matching more than RANGE_SCAN_LIMIT keys
+    <SUGGEST_DIR>/<version>/product_ids.npy, product_term_offsets.npy, product_terms.npy
+                                                          the terms of each listing
+    <SUGGEST_DIR>/<version>/journal                       catalog changes since the build
+    <SUGGEST_DIR>/CURRENT                                 name of the live version
+
+app.jobs.rebuild_suggest_index builds a new version from catalog_listings
+(workers build the first one themselves). Committed catalog changes are
+appended to the current version's journal; a thread in every worker tails
+it and publishes a new immutable state, so lookups never wait on a writer.
+"""
+import bisect
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config.db import SessionLocal
+from app.core.config.settings import settings
+from app.models.catalog import CatalogListing
+from app.schemas.product import Suggestion
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development servers only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# A term is (kind, display text), e.g. ("product", "Sweet Potato")
+Term = Tuple[str, str]
+
+# Prefixes matching more keys than this have their most-listed terms
+# precomputed at build time; smaller key ranges are ranked per lookup
+RANGE_SCAN_LIMIT = 2048
+
+# Terms kept per precomputed prefix: the largest lookup limit plus room for
+# terms whose counts changed since the build
+TOP_K = 64
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_SEPARATOR = "\x1f"
+_CURRENT = "CURRENT"
+_JOURNAL = "journal"
+
+_PENDING_KEY = "suggest_index_updates"
+
+
+def normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def listing_terms(name: str, category, farm_name: Optional[str]) -> Tuple[Term, ...]:
+    """Suggestion terms contributed by one catalog listing"""
+    terms = [("product", name), ("category", category.value)]
+    if farm_name:
+        terms.append(("farm", farm_name))
+    return tuple(terms)
+
+
+def _index_keys(term: Term) -> List[bytes]:
+    """Search keys for a term: one per word, so "pot" finds "Sweet Potato" """
+    words = normalize(term[1]).split()
+    return [" ".join(words[position:]).encode() for position in range(len(words))]
+
+
+def _term_bytes(term: Term) -> bytes:
+    return _SEPARATOR.join(term).encode()
+
+
+def _decode_term(value: bytes) -> Term:
+    kind, display = value.decode().split(_SEPARATOR, 1)
+    return kind, display
+
+
+class _Strings:
+    """Sorted UTF-8 strings stored as one byte array plus offsets; a sequence bisect can search"""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes()
+
+    def find(self, value: bytes) -> Optional[int]:
+        index = bisect.bisect_left(self, value)
+        if index < len(self) and self[index] == value:
+            return index
+        return None
+
+    def prefix_range(self, prefix: bytes) -> Tuple[int, int]:
+        start = bisect.bisect_left(self, prefix)
+        # No UTF-8 byte is 0xff, so every string starting with the prefix sorts below this
+        return start, bisect.bisect_left(self, prefix + b"\xff", start)
+
+
+def _save_strings(path: str, name: str, values: List[bytes]) -> None:
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.fromiter((len(value) for value in values), dtype=np.int64, count=len(values)))
+    np.save(os.path.join(path, f"{name}.npy"), np.frombuffer(b"".join(values), dtype=np.uint8))
+    np.save(os.path.join(path, f"{name}_offsets.npy"), offsets)
+
+
+def _load_strings(path: str, name: str) -> _Strings:
+    return _Strings(
+        np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"),
+        np.load(os.path.join(path, f"{name}_offsets.npy"), mmap_mode="r")
+    )
+
+
+def _top_terms(term_ids: np.ndarray, counts: np.ndarray, k: int) -> np.ndarray:
+    """The k most-listed distinct terms among term_ids, most listed first"""
+    term_ids = np.unique(term_ids)
+    term_counts = counts[term_ids]
+    if len(term_ids) > k:
+        keep = np.argpartition(-term_counts, k - 1)[:k]
+        term_ids, term_counts = term_ids[keep], term_counts[keep]
+    return term_ids[np.argsort(-term_counts, kind="stable")]
+
+
+def _prefix_table(keys: List[bytes], key_terms: np.ndarray, counts: np.ndarray) -> Tuple[List[bytes], np.ndarray]:
+    """Top TOP_K terms of every key prefix matching more than RANGE_SCAN_LIMIT keys.
+
+    Key ranges are only split one byte deeper while they stay that large, so
+    the table stays small however many keys there are.
+    """
+    table: List[Tuple[bytes, np.ndarray]] = []
+    ranges = [(0, len(keys), 0)]
+    while ranges:
+        start, end, depth = ranges.pop()
+        position = start
+        while position < end:
+            key = keys[position]
+            if len(key) <= depth:
+                # Keys equal to the range's prefix itself
+                position = bisect.bisect_right(keys, key, position, end)
+                continue
+            prefix = key[:depth + 1]
+            stop = bisect.bisect_left(keys, prefix + b"\xff", position, end)
+            if stop - position > RANGE_SCAN_LIMIT:
+                top = np.full(TOP_K, -1, dtype=np.int32)
+                terms = _top_terms(key_terms[position:stop], counts, TOP_K)
+                top[:len(terms)] = terms
+                table.append((prefix, top))
+                ranges.append((position, stop, depth + 1))
+            position = stop
+
+    table.sort(key=lambda row: row[0])
+    top_terms = np.stack([top for _, top in table]) if table else np.zeros((0, TOP_K), dtype=np.int32)
+    return [prefix for prefix, _ in table], top_terms
+
+
+def _current_version(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, _CURRENT)) as current:
+            return current.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _journal_path(directory: str, version: str) -> str:
+    return os.path.join(directory, version, _JOURNAL)
+
+
+def _read_journal(directory: str, version: str, offset: int) -> Tuple[List[Tuple[int, Optional[Tuple[Term, ...]]]], int]:
+    """Complete journal entries after offset, and the offset they end at"""
+    try:
+        with open(_journal_path(directory, version), "rb") as journal:
+            journal.seek(offset)
+            data = journal.read()
+    except FileNotFoundError:
+        return [], offset
+
+    end = data.rfind(b"\n") + 1
+    entries = []
+    for line in data[:end].splitlines():
+        product_id, terms = json.loads(line)
+        entries.append((product_id, tuple(tuple(term) for term in terms) if terms is not None else None))
+    return entries, offset + end
+
+
+class _FileLock:
+    """Exclusive lock on a file, serializing writers of the index directory across processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __enter__(self):
+        self.file = open(self.path, "w")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+
+def build_index(db: Session, directory: str = settings.SUGGEST_DIR, only_if_missing: bool = False) -> int:
+    """Build a new version from catalog_listings and make it current.
+
+    Changes journaled against the previous version while the build ran are
+    carried over into the new one; replaying one is harmless, since an entry
+    sets a listing's terms. Returns the number of listings indexed (0 when
+    only_if_missing and a version already exists).
+    """
+    os.makedirs(directory, exist_ok=True)
+    with _FileLock(os.path.join(directory, ".build.lock")):
+        if only_if_missing and _current_version(directory) is not None:
+            return 0
+
+        with _FileLock(os.path.join(directory, ".lock")):
+            previous = _current_version(directory)
+            journal_start = os.path.getsize(_journal_path(directory, previous)) if previous else 0
+
+        rows = db.execute(
+            select(
+                CatalogListing.product_id,
+                CatalogListing.name,
+                CatalogListing.category,
+                CatalogListing.farm_name
+            ).execution_options(yield_per=5000)
+        )
+
+        term_numbers: Dict[Term, int] = {}
+        counts: List[int] = []
+        listings: List[Tuple[int, List[int]]] = []
+        for product_id, name, category, farm_name in rows:
+            numbers = []
+            for term in listing_terms(name, category, farm_name):
+                number = term_numbers.setdefault(term, len(term_numbers))
+                if number == len(counts):
+                    counts.append(0)
+                counts[number] += 1
+                numbers.append(number)
+            listings.append((product_id, numbers))
+
+        # Term ids are positions in the sorted term strings
+        terms = list(term_numbers)
+        term_strings = [_term_bytes(term) for term in terms]
+        order = sorted(range(len(terms)), key=term_strings.__getitem__)
+        term_ids = np.empty(len(terms), dtype=np.int32)
+        term_ids[order] = np.arange(len(terms), dtype=np.int32)
+        term_counts = np.asarray(counts, dtype=np.int32)[order]
+
+        keys = sorted(
+            (key, term_id)
+            for term_id, number in enumerate(order)
+            for key in _index_keys(terms[number])
+        )
+        key_strings = [key for key, _ in keys]
+        key_terms = np.fromiter((term_id for _, term_id in keys), dtype=np.int32, count=len(keys))
+        prefixes, prefix_top = _prefix_table(key_strings, key_terms, term_counts)
+
+        listings.sort()
+        product_ids = np.fromiter((product_id for product_id, _ in listings), dtype=np.int64, count=len(listings))
+        product_term_offsets = np.zeros(len(listings) + 1, dtype=np.int64)
+        product_term_offsets[1:] = np.cumsum(
+            np.fromiter((len(numbers) for _, numbers in listings), dtype=np.int64, count=len(listings))
+        )
+        product_terms = term_ids[
+            np.fromiter((number for _, numbers in listings for number in numbers), dtype=np.int64, count=int(product_term_offsets[-1]))
+        ]
+
+        version = f"{time.time_ns()}"
+        path = os.path.join(directory, version)
+        os.makedirs(path)
+        _save_strings(path, "terms", [term_strings[number] for number in order])
+        np.save(os.path.join(path, "term_counts.npy"), term_counts)
+        _save_strings(path, "keys", key_strings)
+        np.save(os.path.join(path, "key_terms.npy"), key_terms)
+        _save_strings(path, "prefixes", prefixes)
+        np.save(os.path.join(path, "prefix_top.npy"), prefix_top)
+        np.save(os.path.join(path, "product_ids.npy"), product_ids)
+        np.save(os.path.join(path, "product_term_offsets.npy"), product_term_offsets)
+        np.save(os.path.join(path, "product_terms.npy"), product_terms)
+
+        with _FileLock(os.path.join(directory, ".lock")):
+            with open(_journal_path(directory, version), "wb") as journal:
+                if previous:
+                    with open(_journal_path(directory, previous), "rb") as previous_journal:
+                        previous_journal.seek(journal_start)
+                        shutil.copyfileobj(previous_journal, journal)
+
+            temporary = os.path.join(directory, f"{_CURRENT}.{os.getpid()}.tmp")
+            with open(temporary, "w") as current:
+                current.write(version)
+            os.replace(temporary, os.path.join(directory, _CURRENT))
+
+        # Keep the previous version for workers still mapping it
+        for entry in os.listdir(directory):
+            if entry not in (version, previous) and entry.isdigit():
+                shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+        return len(listings)
+
+
+class _Version:
+    """One built version of the index, memory-mapped"""
+
+    def __init__(self, path: str):
+        self.terms = _load_strings(path, "terms")
+        self.term_counts = np.load(os.path.join(path, "term_counts.npy"), mmap_mode="r")
+        self.keys = _load_strings(path, "keys")
+        self.key_terms = np.load(os.path.join(path, "key_terms.npy"), mmap_mode="r")
+        self.prefixes = _load_strings(path, "prefixes")
+        self.prefix_top = np.load(os.path.join(path, "prefix_top.npy"), mmap_mode="r")
+        self.product_ids = np.load(os.path.join(path, "product_ids.npy"), mmap_mode="r")
+        self.product_term_offsets = np.load(os.path.join(path, "product_term_offsets.npy"), mmap_mode="r")
+        self.product_terms = np.load(os.path.join(path, "product_terms.npy"), mmap_mode="r")
+
+    def count(self, term: Term) -> int:
+        term_id = self.terms.find(_term_bytes(term))
+        return 0 if term_id is None else int(self.term_counts[term_id])
+
+    def listing_terms(self, product_id: int) -> Tuple[Term, ...]:
+        row = int(np.searchsorted(self.product_ids, product_id))
+        if row >= len(self.product_ids) or self.product_ids[row] != product_id:
+            return ()
+        term_ids = self.product_terms[self.product_term_offsets[row]:self.product_term_offsets[row + 1]]
+        return tuple(_decode_term(self.terms[int(term_id)]) for term_id in term_ids)
+
+    def top_terms(self, prefix: bytes, k: int) -> List[Tuple[Term, int]]:
+        """The k most-listed terms with a key starting with prefix, most listed first"""
+        start, end = self.keys.prefix_range(prefix)
+        row = self.prefixes.find(prefix) if end - start > RANGE_SCAN_LIMIT and k <= TOP_K else None
+        if row is not None:
+            top = self.prefix_top[row]
+            term_ids = top[top >= 0][:k]
+        else:
+            term_ids = _top_terms(self.key_terms[start:end], self.term_counts, k)
+        return [
+            (_decode_term(self.terms[int(term_id)]), int(self.term_counts[term_id]))
+            for term_id in term_ids
+        ]
+
+
+class _State:
+    """What lookups read: a version plus the journaled changes applied on top.
+
+    Never modified once published; applying more changes makes a new one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        version: _Version,
+        journal_offset: int = 0,
+        listings: Optional[Dict[int, Optional[Tuple[Term, ...]]]] = None,
+        built_counts: Optional[Dict[Term, int]] = None,
+        counts: Optional[Dict[Term, int]] = None,
+        grown_keys: Optional[List[Tuple[bytes, Term]]] = None
+    ):
+        self.name = name
+        self.version = version
+        self.journal_offset = journal_offset
+        # Current terms of listings changed since the build (None = unlisted)
+        self.listings = listings or {}
+        # Built and current counts of every term those changes touched
+        self.built_counts = built_counts or {}
+        self.counts = counts or {}
+        # Search keys of the terms now used by more listings than at the build
+        self.grown_keys = grown_keys or []
+
+    def applied(self, entries: List[Tuple[int, Optional[Tuple[Term, ...]]]], journal_offset: int) -> "_State":
+        listings, built_counts, counts = dict(self.listings), dict(self.built_counts), dict(self.counts)
+        grown_keys = list(self.grown_keys)
+
+        touched = set()
+        for product_id, terms in entries:
+            if product_id in listings:
+                old_terms = listings[product_id]
+            else:
+                old_terms = self.version.listing_terms(product_id)
+            for term, change in [(term, -1) for term in old_terms or ()] + [(term, 1) for term in terms or ()]:
+                if term not in counts:
+                    built_counts[term] = counts[term] = self.version.count(term)
+                counts[term] += change
+                touched.add(term)
+            listings[product_id] = terms
+
+        for term in touched:
+            was_grown = self.counts.get(term, 0) > self.built_counts.get(term, 0)
+            grown = counts[term] > built_counts[term]
+            if grown == was_grown:
+                continue
+            for key in _index_keys(term):
+                if grown:
+                    bisect.insort(grown_keys, (key, term))
+                else:
+                    del grown_keys[bisect.bisect_left(grown_keys, (key, term))]
+
+        return _State(self.name, self.version, journal_offset, listings, built_counts, counts, grown_keys)
+
+
+class SuggestIndex:
+    """Lookups against the current version, followed by a background thread.
+
+    The thread switches to new versions and applies journal entries by
+    publishing a new _State; lookups read whichever state is published and
+    never take a lock. Until the first state is loaded, lookups return
+    nothing rather than wait.
+    """
+
+    def __init__(self, directory: str, reload_interval: float):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self._state: Optional[_State] = None
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Load the index (building it on a fresh install) in the background and keep it current"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="suggest-index", daemon=True)
+            self._thread.start()
+
+    def suggest(self, text: str, limit: int = 10) -> List[Suggestion]:
+        state = self._state
+        prefix = normalize(text).encode()
+        if state is None or not prefix:
+            return []
+
+        # Terms that gained listings since the build can rank anywhere
+        best: Dict[Term, int] = {}
+        position = bisect.bisect_left(state.grown_keys, (prefix,))
+        while position < len(state.grown_keys) and state.grown_keys[position][0].startswith(prefix):
+            term = state.grown_keys[position][1]
+            best[term] = state.counts[term]
+            position += 1
+
+        # Every other term has at most its built count, so the most-listed
+        # built terms (at their current counts) are enough once `limit` of
+        # them still reach the lowest built count fetched
+        k = limit
+        while True:
+            candidates = state.version.top_terms(prefix, k)
+            for term, count in candidates:
+                best[term] = state.counts.get(term, count)
+            if len(candidates) < k:
+                break
+            lowest = candidates[-1][1]
+            if sum(1 for count in best.values() if count >= lowest) >= limit:
+                break
+            k *= 2
+
+        best = {term: count for term, count in best.items() if count > 0}
+
+        # Most listings first, then shorter (closer) completions
+        ranked = sorted(best.items(), key=lambda item: (-item[1], len(item[0][1]), item[0][1]))
+        return [
+            Suggestion(text=display, kind=kind, count=count)
+            for (kind, display), count in ranked[:limit]
+        ]
+
+    def update(self, changes: Iterable[Tuple[int, Optional[Tuple[Term, ...]]]]) -> None:
+        """Journal (product_id, terms) changes for every worker; terms=None removes the listing"""
+        lines = "".join(
+            json.dumps([product_id, [list(term) for term in terms] if terms is not None else None]) + "\n"
+            for product_id, terms in changes
+        )
+        if not lines or _current_version(self.directory) is None:
+            # The first build reads the catalog, these changes included
+            return
+
+        with _FileLock(os.path.join(self.directory, ".lock")):
+            version = _current_version(self.directory)
+            with open(_journal_path(self.directory, version), "a") as journal:
+                journal.write(lines)
+        self._wake.set()
+
+    def refresh(self) -> None:
+        """Switch to a newer version and apply new journal entries"""
+        name = _current_version(self.directory)
+        if name is None:
+            return
+
+        state = self._state
+        if state is None or state.name != name:
+            state = _State(name, _Version(os.path.join(self.directory, name)))
+        entries, offset = _read_journal(self.directory, name, state.journal_offset)
+        if entries:
+            state = state.applied(entries, offset)
+        self._state = state
+
+    def _run(self) -> None:
+        while True:
+            try:
+                if _current_version(self.directory) is None:
+                    db = SessionLocal()
+                    try:
+                        build_index(db, self.directory, only_if_missing=True)
+                    finally:
+                        db.close()
+                self.refresh()
+            except Exception:
+                logger.exception("Refreshing the suggestion index failed")
+            self._wake.wait(self.reload_interval)
+            self._wake.clear()
+
+
+suggest_index = SuggestIndex(
+    directory=settings.SUGGEST_DIR,
+    reload_interval=settings.SUGGEST_RELOAD_INTERVAL_SECONDS
+)
+
+
+def schedule_suggest_updates(
+    db: Session,
+    changes: Iterable[Tuple[int, Optional[Tuple[Term, ...]]]]
+) -> None:
+    """Queue index changes to be journaled once the session's transaction commits"""
+    db.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_updates(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        suggest_index.update(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_updates(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
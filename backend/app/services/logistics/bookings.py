@@ -0,0 +1,79 @@
+import asyncio
+from typing import List
+from sqlalchemy.orm import Session
+from app.core.config.db import SessionLocal
+from app.models.order import Order, OrderStatus, DeliveryType
+from app.models.user import User
+from app.services.logistics.kwik import create_delivery_order
+from app.services.orders.lifecycle import transition_order
+
+# Bookings sent to the logistics partner at once by book_deliveries
+CONCURRENT_BOOKINGS = 8
+
+
+def needs_booking(order: Order) -> bool:
+    return order.delivery_type == DeliveryType.DELIVERY and not order.logistics_tracking_number
+
+
+async def book_delivery(db: Session, order: Order) -> None:
+    """Book a shipped order with the logistics partner and mark it in transit.
+
+    A failed booking is noted on the order instead of raised, and the order
+    stays SHIPPED. Runs inside the caller's transaction.
+    """
+    farmer = db.get(User, order.farmer_id)
+    buyer = db.get(User, order.buyer_id)
+    if not farmer or not buyer:
+        return
+
+    try:
+        logistics_result = await create_delivery_order(
+            pickup_address=order.pickup_address or farmer.farm_address or "",
+            delivery_address=order.delivery_address or "",
+            pickup_phone=order.pickup_phone or farmer.phone,
+            delivery_phone=order.delivery_phone or buyer.phone,
+            pickup_name=f"{farmer.first_name} {farmer.last_name}",
+            delivery_name=f"{buyer.first_name} {buyer.last_name}",
+            order_reference=order.order_number,
+            item_description="Agricultural products"
+        )
+
+        if logistics_result.get("tracking_number"):
+            order.logistics_tracking_number = logistics_result.get("tracking_number")
+            order.logistics_order_id = logistics_result.get("order_id")
+            order.logistics_partner = logistics_result.get("provider", "kwik")
+            transition_order(
+                db, order, OrderStatus.IN_TRANSIT,
+                metadata={"tracking_number": order.logistics_tracking_number}
+            )
+    except Exception as e:
+        # Log error but don't fail the order update
+        order.farmer_notes = (order.farmer_notes or "") + f"\nLogistics error: {str(e)}"
+
+
+async def book_deliveries(order_ids: List[int]) -> None:
+    """Book orders shipped in bulk, after the request has returned.
+
+    Bookings run a few at a time, each in its own session and committed
+    as soon as it is made, so a failure part way through keeps the
+    tracking numbers already issued. Each order is claimed with a row lock
+    and checked again before the partner is called; orders booked, moved
+    on or being updated elsewhere meanwhile are skipped.
+    """
+    semaphore = asyncio.Semaphore(CONCURRENT_BOOKINGS)
+
+    async def book(order_id: int) -> None:
+        async with semaphore:
+            db = SessionLocal()
+            try:
+                order = db.query(Order).filter(
+                    Order.id == order_id,
+                    Order.status == OrderStatus.SHIPPED
+                ).with_for_update(skip_locked=True).first()
+                if order and needs_booking(order):
+                    await book_delivery(db, order)
+                db.commit()
+            finally:
+                db.close()
+
+    await asyncio.gather(*(book(order_id) for order_id in order_ids))
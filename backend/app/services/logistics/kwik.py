@@ -2,12 +2,34 @@ import httpx
 from typing import Optional, Dict, Any
 from app.core.config.settings import settings
 
+# One pooled client per process, so calls reuse keep-alive connections
+# instead of paying a TCP/TLS handshake each time
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def get_delivery_quote(
     pickup_location: str,
     delivery_location: str,
     weight: Optional[float] = None,
-    distance: Optional[float] = None
+    distance: Optional[float] = None,
+    timeout: Optional[float] = None
 ) -> Dict[str, Any]:
     """Get delivery quote from Kwik Delivery"""
     url = f"{settings.KWIK_API_URL}/quotes"
@@ -28,18 +50,24 @@ async def get_delivery_quote(
         data["distance"] = distance
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(url, json=data, headers=headers)
-            response.raise_for_status()
-            result = response.json()
-            
-            # Extract price from Kwik response format
-            return {
-                "price": result.get("price", 500.0),
-                "estimated_time": result.get("estimated_time", "24-48 hours"),
-                "quote_id": result.get("quote_id"),
-                "provider": "kwik"
-            }
+        response = await get_client().post(
+            url,
+            json=data,
+            headers=headers,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+        response.raise_for_status()
+        result = response.json()
+        if result.get("price") is None:
+            raise ValueError("Quote response has no price")
+        
+        # Extract price from Kwik response format
+        return {
+            "price": result["price"],
+            "estimated_time": result.get("estimated_time", "24-48 hours"),
+            "quote_id": result.get("quote_id"),
+            "provider": "kwik"
+        }
     except Exception as e:
         # Return default quote if API fails
         return {
@@ -81,17 +109,16 @@ async def create_delivery_order(
     }
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(url, json=data, headers=headers)
-            response.raise_for_status()
-            result = response.json()
-            
-            return {
-                "tracking_number": result.get("tracking_number"),
-                "order_id": result.get("order_id"),
-                "status": result.get("status", "pending"),
-                "provider": "kwik"
-            }
+        response = await get_client().post(url, json=data, headers=headers)
+        response.raise_for_status()
+        result = response.json()
+        
+        return {
+            "tracking_number": result.get("tracking_number"),
+            "order_id": result.get("order_id"),
+            "status": result.get("status", "pending"),
+            "provider": "kwik"
+        }
     except Exception as e:
         return {
             "tracking_number": None,
@@ -112,17 +139,16 @@ async def track_delivery(tracking_number: str) -> Dict[str, Any]:
     }
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            result = response.json()
-            
-            return {
-                "status": result.get("status"),
-                "current_location": result.get("current_location"),
-                "estimated_delivery": result.get("estimated_delivery"),
-                "provider": "kwik"
-            }
+        response = await get_client().get(url, headers=headers)
+        response.raise_for_status()
+        result = response.json()
+        
+        return {
+            "status": result.get("status"),
+            "current_location": result.get("current_location"),
+            "estimated_delivery": result.get("estimated_delivery"),
+            "provider": "kwik"
+        }
     except Exception as e:
         return {
             "status": "unknown",
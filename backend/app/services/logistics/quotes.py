@@ -0,0 +1,151 @@
+import bisect
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config.settings import settings
+from app.models.logistics import DeliveryZoneRate
+from app.services.logistics.kwik import get_delivery_quote
+from app.utils.helpers.cache import TTLCache
+
+# Used when a route has no known rate and the live quote fails
+DEFAULT_DELIVERY_FEE = 500.0
+
+# Upper bounds (kg) of the weight bands; heavier parcels fall in the last band
+WEIGHT_BANDS_KG = (5.0, 20.0, 50.0, 100.0)
+
+# Kilograms per unit for products sold by mass; other units (bag, bunch,
+# crate) have no fixed weight
+UNIT_WEIGHTS_KG = {
+    "kg": 1.0,
+    "kgs": 1.0,
+    "kilogram": 1.0,
+    "kilograms": 1.0,
+    "g": 0.001,
+    "gram": 0.001,
+    "grams": 0.001,
+    "tonne": 1000.0,
+    "tonnes": 1000.0,
+    "ton": 1000.0,
+    "tons": 1000.0,
+    "lb": 0.4536,
+    "lbs": 0.4536,
+}
+
+# (pickup zone, delivery zone, weight band)
+RouteKey = Tuple[str, str, int]
+
+quote_cache = TTLCache(
+    max_size=settings.DELIVERY_QUOTE_CACHE_SIZE,
+    ttl=settings.DELIVERY_QUOTE_CACHE_TTL_SECONDS
+)
+
+
+def zone(state: Optional[str]) -> str:
+    """Delivery zone of a state name: lower-cased with whitespace collapsed"""
+    return " ".join(state.lower().split()) if state else ""
+
+
+def parcel_weight(items: Iterable[Tuple[str, float]]) -> Optional[float]:
+    """Weight (kg) of an order's (unit, quantity) items, None if none is sold by mass.
+
+    Items in units with no fixed weight are left out, so the weight is a
+    lower bound for mixed orders.
+    """
+    weight = None
+    for unit, quantity in items:
+        per_unit = UNIT_WEIGHTS_KG.get(unit.strip().lower()) if unit else None
+        if per_unit is not None:
+            weight = (weight or 0.0) + per_unit * quantity
+    return weight
+
+
+def weight_band(weight: Optional[float]) -> int:
+    """Index of the weight band a parcel falls in; unknown weight is the lightest"""
+    return bisect.bisect_left(WEIGHT_BANDS_KG, weight) if weight else 0
+
+
+def band_weight(band: int) -> Optional[float]:
+    """Weight sent to the provider when quoting a band: its upper bound"""
+    return WEIGHT_BANDS_KG[band] if band < len(WEIGHT_BANDS_KG) else None
+
+
+def route_key(pickup_state: Optional[str], delivery_state: Optional[str], weight: Optional[float] = None) -> RouteKey:
+    return (zone(pickup_state), zone(delivery_state), weight_band(weight))
+
+
+async def fetch_rate(key: RouteKey, timeout: Optional[float] = None) -> Optional[dict]:
+    """Live quote for a route as a delivery_zone_rates row, or None if it failed"""
+    pickup_zone, delivery_zone, band = key
+    quote = await get_delivery_quote(
+        pickup_location=pickup_zone.title(),
+        delivery_location=delivery_zone.title(),
+        weight=band_weight(band),
+        timeout=timeout
+    )
+    if quote.get("error") or quote.get("price") is None:
+        return None
+    return {
+        "pickup_zone": pickup_zone,
+        "delivery_zone": delivery_zone,
+        "weight_band": band,
+        "price": float(quote["price"]),
+        "estimated_time": quote.get("estimated_time"),
+        "provider": quote.get("provider", "kwik"),
+    }
+
+
+def save_rates(db: Session, rows: List[dict]) -> None:
+    """Insert or overwrite zone rates (PostgreSQL upsert)"""
+    if not rows:
+        return
+    statement = insert(DeliveryZoneRate).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[
+            DeliveryZoneRate.pickup_zone,
+            DeliveryZoneRate.delivery_zone,
+            DeliveryZoneRate.weight_band,
+        ],
+        set_={
+            "price": statement.excluded.price,
+            "estimated_time": statement.excluded.estimated_time,
+            "provider": statement.excluded.provider,
+            "refreshed_at": statement.excluded.refreshed_at,
+        }
+    ))
+
+
+async def delivery_fee(
+    db: Session,
+    pickup_state: Optional[str],
+    delivery_state: Optional[str],
+    weight: Optional[float] = None
+) -> float:
+    """Delivery price between two states, answered locally whenever possible.
+
+    Looks in the per-worker cache, then the delivery_zone_rates table. Only
+    a route never seen before goes to the provider, with a short timeout,
+    and the answer is stored as the route's rate in the caller's transaction.
+    If that fails too the default fee is used, and cached so a slow provider
+    is not retried on every checkout until the entry expires.
+    """
+    key = route_key(pickup_state, delivery_state, weight)
+    if not key[0] or not key[1]:
+        return DEFAULT_DELIVERY_FEE
+
+    fee = quote_cache.get(key)
+    if fee is not None:
+        return fee
+
+    rate = db.get(DeliveryZoneRate, key)
+    if rate:
+        fee = rate.price
+    else:
+        row = await fetch_rate(key, timeout=settings.DELIVERY_QUOTE_TIMEOUT_SECONDS)
+        if row:
+            save_rates(db, [row])
+            fee = row["price"]
+        else:
+            fee = DEFAULT_DELIVERY_FEE
+
+    quote_cache.set(key, fee)
+    return fee
@@ -0,0 +1,87 @@
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app.models.cart import CartItem, CartSummary
+from app.models.catalog import CatalogListing
+
+
+def cart_rows(db: Session, buyer_id: int) -> List[Tuple[CartItem, CatalogListing]]:
+    """A buyer's cart items with their catalog rows, in one query.
+
+    Items whose product is not listed (inactive or deleted) are left out.
+    """
+    return db.query(CartItem, CatalogListing).join(
+        CatalogListing, CatalogListing.product_id == CartItem.product_id
+    ).filter(
+        CartItem.buyer_id == buyer_id
+    ).order_by(CartItem.created_at, CartItem.id).all()
+
+
+def refresh_cart_summaries(
+    db: Session,
+    buyer_ids: Optional[Iterable[int]] = None,
+    product_ids: Optional[Iterable[int]] = None
+) -> None:
+    """Rebuild the cached cart summaries of the given buyers.
+
+    Pass buyer_ids after changing those buyers' carts, or product_ids after
+    a product's listing or price changed to rebuild every cart holding it.
+    Runs inside the caller's transaction as one INSERT ... SELECT upsert and
+    one DELETE of the summaries of emptied carts.
+    """
+    if buyer_ids is not None:
+        buyers = list(set(buyer_ids))
+        if not buyers:
+            return
+    else:
+        product_ids = list(set(product_ids or ()))
+        if not product_ids:
+            return
+        buyers = select(CartItem.buyer_id).where(
+            CartItem.product_id.in_(product_ids)
+        ).distinct().scalar_subquery()
+
+    db.flush()
+
+    # Buyers are written in id order so concurrent rebuilds lock their rows
+    # in the same order; an upsert (unlike DELETE then INSERT) cannot
+    # collide with the row a concurrent rebuild of the same buyer committed
+    source = select(
+        CartItem.buyer_id,
+        func.count(CartItem.id),
+        func.sum(CartItem.quantity * CatalogListing.price_per_unit),
+    ).join(
+        CatalogListing, CatalogListing.product_id == CartItem.product_id
+    ).where(
+        CartItem.buyer_id.in_(buyers)
+    ).group_by(CartItem.buyer_id).order_by(CartItem.buyer_id)
+
+    statement = postgresql.insert(CartSummary).from_select(
+        [CartSummary.buyer_id, CartSummary.item_count, CartSummary.subtotal],
+        source
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[CartSummary.buyer_id],
+        set_={
+            "item_count": statement.excluded.item_count,
+            "subtotal": statement.excluded.subtotal,
+        }
+    ))
+
+    # Buyers left with no listed items in their cart have no summary
+    listed = select(CartItem.buyer_id).join(
+        CatalogListing, CatalogListing.product_id == CartItem.product_id
+    ).where(CartItem.buyer_id.in_(buyers))
+    db.execute(delete(CartSummary).where(
+        CartSummary.buyer_id.in_(buyers),
+        CartSummary.buyer_id.not_in(listed)
+    ))
+
+
+def get_cart_summary(db: Session, buyer_id: int) -> Tuple[int, float]:
+    """(item count, subtotal) of a buyer's cart from the cached summary"""
+    summary = db.get(CartSummary, buyer_id)
+    if not summary:
+        return 0, 0.0
+    return summary.item_count, summary.subtotal
@@ -0,0 +1,171 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session, selectinload
+from app.core.config.settings import settings
+from app.models.cart import CartItem
+from app.models.order import Order, OrderItem, OrderStatus, DeliveryType, PaymentStatus
+from app.models.product import Product, ProductStatus
+from app.models.user import User
+from app.schemas.order import CheckoutCreate
+from app.services.logistics.quotes import delivery_fee, parcel_weight
+from app.services.orders.cart import refresh_cart_summaries
+from app.services.orders.inventory import reserve_inventory
+from app.services.orders.lifecycle import record_orders_created
+
+
+def new_order_number() -> str:
+    return f"AGD-{uuid.uuid4().hex[:8].upper()}"
+
+
+def _requested_quantities(db: Session, buyer: User, checkout_data: CheckoutCreate) -> Dict[int, float]:
+    """Quantities per product: the given items, or the buyer's whole cart"""
+    quantities = defaultdict(float)
+    if checkout_data.items is not None:
+        for item in checkout_data.items:
+            quantities[item.product_id] += item.quantity
+    else:
+        for product_id, quantity in db.query(CartItem.product_id, CartItem.quantity).filter(
+            CartItem.buyer_id == buyer.id
+        ):
+            quantities[product_id] += quantity
+    return quantities
+
+
+async def _delivery_fees(
+    db: Session,
+    farmers: List[User],
+    groups: Dict[int, List[Tuple[Product, float]]],
+    checkout_data: CheckoutCreate
+) -> List[float]:
+    """Price every farmer's delivery (by its parcel weight) concurrently, in the order given"""
+    if checkout_data.delivery_type != DeliveryType.DELIVERY:
+        return [0.0] * len(farmers)
+
+    return await asyncio.gather(*(
+        delivery_fee(
+            db,
+            farmer.farm_location_state,
+            checkout_data.delivery_state,
+            parcel_weight((product.unit, quantity) for product, quantity in groups[farmer.id])
+        )
+        for farmer in farmers
+    ))
+
+
+async def checkout(db: Session, buyer: User, checkout_data: CheckoutCreate) -> List[Order]:
+    """Split a checkout into one order per farmer and create them together.
+
+    Products are validated with one query and every farmer's delivery quote
+    is fetched concurrently. The orders and their items are then written with
+    two bulk INSERTs, share a checkout_reference so a single payment can cover
+    them, and leave the cart in the same commit. Stock is reserved in that
+    commit too, so a checkout racing another for the last units fails with 409.
+    """
+    quantities = _requested_quantities(db, buyer, checkout_data)
+    if not quantities:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nothing to check out"
+        )
+
+    products = {
+        product.id: product
+        for product in db.query(Product).filter(
+            Product.id.in_(list(quantities)),
+            Product.status == ProductStatus.ACTIVE
+        )
+    }
+
+    missing = sorted(product_id for product_id in quantities if product_id not in products)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Products not found or not available: {', '.join(map(str, missing))}"
+        )
+
+    short = [
+        products[product_id].name for product_id, quantity in quantities.items()
+        if quantity > products[product_id].available_quantity
+    ]
+    if short:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient quantity for products: {', '.join(short)}"
+        )
+
+    groups = defaultdict(list)
+    for product_id, quantity in quantities.items():
+        product = products[product_id]
+        groups[product.farmer_id].append((product, quantity))
+
+    farmers = db.query(User).filter(User.id.in_(list(groups))).all()
+    delivery_fees = await _delivery_fees(db, farmers, groups, checkout_data)
+
+    checkout_reference = f"AGD-CHK-{uuid.uuid4().hex[:10].upper()}"
+    order_fields = checkout_data.dict(include={
+        "delivery_type",
+        "delivery_address",
+        "delivery_state",
+        "delivery_city",
+        "delivery_phone",
+        "delivery_instructions",
+        "pickup_address",
+        "pickup_phone",
+        "buyer_notes",
+    })
+
+    order_rows = []
+    for farmer, delivery_fee in zip(farmers, delivery_fees):
+        subtotal = sum(quantity * product.price_per_unit for product, quantity in groups[farmer.id])
+        order_rows.append({
+            **order_fields,
+            "order_number": new_order_number(),
+            "checkout_reference": checkout_reference,
+            "buyer_id": buyer.id,
+            "farmer_id": farmer.id,
+            "status": OrderStatus.PENDING,
+            "subtotal": subtotal,
+            "delivery_fee": delivery_fee,
+            "commission": subtotal * (settings.COMMISSION_PERCENTAGE / 100),
+            "total_amount": subtotal + delivery_fee,
+            "payment_status": PaymentStatus.PENDING,
+        })
+
+    order_ids = db.execute(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        order_rows
+    ).scalars().all()
+    record_orders_created(db, order_ids, buyer)
+
+    lines = [
+        (order_id, product, quantity)
+        for order_id, farmer in zip(order_ids, farmers)
+        for product, quantity in groups[farmer.id]
+    ]
+    db.execute(insert(OrderItem), [
+        {
+            "order_id": order_id,
+            "product_id": product.id,
+            "product_name": product.name,
+            "quantity": quantity,
+            "unit_price": product.price_per_unit,
+            "subtotal": quantity * product.price_per_unit,
+        }
+        for order_id, product, quantity in lines
+    ])
+    reserve_inventory(db, [(order_id, product.id, quantity) for order_id, product, quantity in lines])
+
+    db.execute(delete(CartItem).where(
+        CartItem.buyer_id == buyer.id,
+        CartItem.product_id.in_(list(quantities))
+    ))
+    refresh_cart_summaries(db, buyer_ids=[buyer.id])
+    db.commit()
+
+    return db.query(Order).options(selectinload(Order.order_items)).filter(
+        Order.id.in_(order_ids)
+    ).order_by(Order.id).all()
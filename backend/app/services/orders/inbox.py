@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+from sqlalchemy.orm import Session
+from app.core.config.db import engine
+from app.core.config.settings import settings
+from app.models.order import Order
+from app.models.order_event import OrderEvent
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel the order_events insert trigger notifies (migration 0016)
+ORDER_EVENTS_CHANNEL = "order_events"
+
+# Most events replayed to a reconnecting stream; older gaps need a refetch
+MAX_REPLAY_EVENTS = 500
+
+RECONNECT_DELAY_SECONDS = 5.0
+
+
+def event_payload(event: OrderEvent, farmer_id: int) -> dict:
+    """An order event in the shape the notify trigger sends"""
+    return {
+        "id": event.id,
+        "order_id": event.order_id,
+        "farmer_id": farmer_id,
+        "from_status": event.from_status.value if event.from_status else None,
+        "to_status": event.to_status.value,
+        "created_at": event.created_at.isoformat() if event.created_at else None,
+    }
+
+
+def events_since(db: Session, farmer_id: int, after_id: int) -> List[dict]:
+    """A farmer's order events after the given event id, oldest first"""
+    rows = db.query(OrderEvent).join(
+        Order, Order.id == OrderEvent.order_id
+    ).filter(
+        Order.farmer_id == farmer_id,
+        OrderEvent.id > after_id
+    ).order_by(OrderEvent.id).limit(MAX_REPLAY_EVENTS).all()
+    return [event_payload(event, farmer_id) for event in rows]
+
+
+def sse_message(event: dict) -> str:
+    """Server-Sent Events frame; the event id lets clients resume with Last-Event-ID"""
+    name = "order_created" if event["from_status"] is None else "order_status"
+    return f"id: {event['id']}\nevent: {name}\ndata: {json.dumps(event)}\n\n"
+
+
+class OrderInboxBroker:
+    """Fans committed order events out to the farmers' open streams.
+
+    Each worker holds one LISTEN connection on ORDER_EVENTS_CHANNEL. The
+    trigger on order_events notifies only when the writing transaction
+    commits, so every worker sees every committed event (whichever worker
+    wrote it) and never an event that was rolled back. Notifications are
+    read from the event loop when the socket is readable; a farmer with no
+    new orders costs a dict entry and an idle queue.
+
+    A stream that falls more than ORDER_STREAM_QUEUE_SIZE events behind is
+    closed instead of buffering without bound; the client reconnects with
+    Last-Event-ID and catches up from the table.
+    """
+
+    def __init__(self, queue_size: int):
+        self._queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reconnect: Optional[asyncio.TimerHandle] = None
+
+    def subscribe(self, farmer_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers[farmer_id].add(queue)
+        return queue
+
+    def unsubscribe(self, farmer_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(farmer_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[farmer_id]
+
+    def publish(self, event: dict) -> None:
+        farmer_id = event.get("farmer_id")
+        for queue in list(self._subscribers.get(farmer_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too far behind: drop the backlog and tell the stream to close
+                self._close(farmer_id, queue)
+
+    def _close(self, farmer_id: int, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+        self.unsubscribe(farmer_id, queue)
+
+    def _close_streams(self) -> None:
+        for farmer_id, queues in list(self._subscribers.items()):
+            for queue in list(queues):
+                self._close(farmer_id, queue)
+
+    async def start(self) -> None:
+        """Start listening; a no-op on databases without LISTEN/NOTIFY"""
+        if engine.dialect.name != "postgresql":
+            return
+        self._loop = asyncio.get_running_loop()
+        self._listen()
+
+    async def stop(self) -> None:
+        if self._reconnect:
+            self._reconnect.cancel()
+            self._reconnect = None
+        self._disconnect()
+
+    def _listen(self, resync: bool = False) -> None:
+        self._reconnect = None
+        try:
+            # A dedicated connection outside the pool, in autocommit mode so
+            # notifications are delivered as soon as they arrive
+            pooled = engine.raw_connection()
+            pooled.detach()
+            connection = pooled.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {ORDER_EVENTS_CHANNEL}")
+        except Exception:
+            logger.exception("Order inbox could not listen for order events")
+            self._schedule_reconnect()
+            return
+
+        self._connection = connection
+        self._loop.add_reader(connection.fileno(), self._drain)
+        if resync:
+            # Events committed while the listener was down were never
+            # delivered; clients reconnect and replay from their Last-Event-ID
+            self._close_streams()
+
+    def _drain(self) -> None:
+        connection = self._connection
+        try:
+            connection.poll()
+        except Exception:
+            logger.exception("Order inbox lost its listen connection")
+            self._disconnect()
+            self._schedule_reconnect()
+            return
+
+        while connection.notifies:
+            notify = connection.notifies.pop(0)
+            try:
+                self.publish(json.loads(notify.payload))
+            except ValueError:
+                logger.warning("Ignoring malformed order event: %s", notify.payload)
+
+    def _disconnect(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            self._loop.remove_reader(connection.fileno())
+        except Exception:
+            pass
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _schedule_reconnect(self) -> None:
+        self._reconnect = self._loop.call_later(RECONNECT_DELAY_SECONDS, self._listen, True)
+
+
+inbox_broker = OrderInboxBroker(queue_size=settings.ORDER_STREAM_QUEUE_SIZE)
@@ -0,0 +1,235 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import case, insert, literal, update
+from sqlalchemy.orm import Query, Session
+from app.core.config.settings import settings
+from app.models.order import Order, OrderItem
+from app.models.product import Product, ProductStatus
+from app.models.reservation import InventoryReservation, ReservationStatus
+from app.services.catalog.projection import refresh_listings
+
+# (order_id, product_id, quantity)
+ReservationLine = Tuple[int, int, float]
+
+
+def _status(value: ProductStatus):
+    # Bound through the column's Enum type so CASE stores the member name
+    return literal(value, Product.status.type)
+
+
+def _take_stock(db: Session, quantities: Dict[int, float]) -> List[int]:
+    """Subtract stock with one conditional UPDATE per product.
+
+    Each UPDATE only matches while enough stock is left, so concurrent
+    checkouts can never drive available_quantity below zero. Products are
+    updated in id order so two checkouts sharing products lock them in the
+    same order. Returns the products that could not be covered; the caller
+    must roll back if there are any.
+    """
+    short = []
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        remaining = Product.available_quantity - quantity
+        result = db.execute(
+            update(Product)
+            .where(
+                Product.id == product_id,
+                Product.status == ProductStatus.ACTIVE,
+                Product.available_quantity >= quantity
+            )
+            .values(
+                available_quantity=remaining,
+                status=case((remaining <= 0, _status(ProductStatus.SOLD_OUT)), else_=Product.status)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            short.append(product_id)
+    return short
+
+
+def _return_stock(db: Session, quantities: Dict[int, float]) -> None:
+    """Add released stock back, putting sold-out products on sale again"""
+    for product_id in sorted(quantities):
+        db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(
+                available_quantity=Product.available_quantity + quantities[product_id],
+                status=case(
+                    (Product.status == ProductStatus.SOLD_OUT, _status(ProductStatus.ACTIVE)),
+                    else_=Product.status
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _totals(lines: Iterable[Tuple[int, float]]) -> Dict[int, float]:
+    totals = defaultdict(float)
+    for product_id, quantity in lines:
+        totals[product_id] += quantity
+    return totals
+
+
+def _insufficient_stock(db: Session, short: List[int]) -> HTTPException:
+    db.rollback()
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Insufficient quantity available for products: {', '.join(map(str, short))}"
+    )
+
+
+def _record_reservations(db: Session, lines: List[ReservationLine], reservation_status: ReservationStatus) -> None:
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(minutes=settings.INVENTORY_RESERVATION_TTL_MINUTES)
+    db.execute(insert(InventoryReservation), [
+        {
+            "order_id": order_id,
+            "product_id": product_id,
+            "quantity": quantity,
+            "status": reservation_status,
+            "expires_at": expires_at,
+            "resolved_at": now if reservation_status != ReservationStatus.HELD else None,
+        }
+        for order_id, product_id, quantity in lines
+    ])
+
+
+def reserve_inventory(
+    db: Session,
+    lines: List[ReservationLine],
+    reservation_status: ReservationStatus = ReservationStatus.HELD
+) -> None:
+    """Take stock for new order items and record the reservations.
+
+    All or nothing: if any product runs short the whole transaction is
+    rolled back and a 409 is raised. Runs inside the caller's transaction.
+    """
+    if not lines:
+        return
+
+    quantities = _totals((product_id, quantity) for _, product_id, quantity in lines)
+    short = _take_stock(db, quantities)
+    if short:
+        raise _insufficient_stock(db, short)
+
+    _record_reservations(db, lines, reservation_status)
+    refresh_listings(db, quantities)
+
+
+def commit_reservations(db: Session, order_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """Turn accepted orders' reservations into sales.
+
+    Held stock is simply kept: the reservations of every order are committed
+    with one UPDATE. Reservations that expired before the farmer accepted
+    are taken again, and orders placed before reservations existed take
+    their stock now, each order in its own savepoint so one whose stock is
+    gone is left out without undoing the others. Returns those orders with
+    the products they are short of; their reservations are left as they were.
+    """
+    order_ids = sorted(set(order_ids))
+    if not order_ids:
+        return {}
+
+    reservations = db.query(InventoryReservation).filter(
+        InventoryReservation.order_id.in_(order_ids)
+    ).order_by(InventoryReservation.id).with_for_update().all()
+
+    reserved = defaultdict(list)
+    for reservation in reservations:
+        reserved[reservation.order_id].append(reservation)
+
+    # Stock to take again per order: released (expired) reservations, or
+    # the order's items if it never had reservations
+    to_take = {
+        order_id: [(r.product_id, r.quantity) for r in order_reservations if r.status == ReservationStatus.RELEASED]
+        for order_id, order_reservations in reserved.items()
+    }
+    unreserved = [order_id for order_id in order_ids if order_id not in reserved]
+    if unreserved:
+        for order_id, product_id, quantity in db.query(
+            OrderItem.order_id, OrderItem.product_id, OrderItem.quantity
+        ).filter(OrderItem.order_id.in_(unreserved)).order_by(OrderItem.id):
+            to_take.setdefault(order_id, []).append((product_id, quantity))
+
+    short = {}
+    taken = set()
+    for order_id in sorted(to_take):
+        lines = to_take[order_id]
+        if not lines:
+            continue
+        savepoint = db.begin_nested()
+        missing = _take_stock(db, _totals(lines))
+        if missing:
+            savepoint.rollback()
+            short[order_id] = missing
+            continue
+        if order_id not in reserved:
+            _record_reservations(
+                db,
+                [(order_id, product_id, quantity) for product_id, quantity in lines],
+                ReservationStatus.COMMITTED
+            )
+        savepoint.commit()
+        taken.update(product_id for product_id, _ in lines)
+
+    committed = [order_id for order_id in reserved if order_id not in short]
+    if committed:
+        db.execute(
+            update(InventoryReservation)
+            .where(
+                InventoryReservation.order_id.in_(committed),
+                InventoryReservation.status != ReservationStatus.COMMITTED
+            )
+            .values(status=ReservationStatus.COMMITTED, resolved_at=datetime.now(timezone.utc))
+        )
+    if taken:
+        refresh_listings(db, taken)
+    return short
+
+
+def commit_order_reservations(db: Session, order: Order) -> None:
+    """Turn an accepted order's reservations into sales, or raise 409 if its stock is gone"""
+    short = commit_reservations(db, [order.id])
+    if short:
+        raise _insufficient_stock(db, short[order.id])
+
+
+def _release(db: Session, query: Query) -> int:
+    reservations = query.all()
+    if not reservations:
+        return 0
+
+    quantities = _totals((r.product_id, r.quantity) for r in reservations)
+    _return_stock(db, quantities)
+
+    now = datetime.now(timezone.utc)
+    for reservation in reservations:
+        reservation.status = ReservationStatus.RELEASED
+        reservation.resolved_at = now
+    refresh_listings(db, quantities)
+    return len(reservations)
+
+
+def release_order_reservations(db: Session, order_ids: Iterable[int]) -> int:
+    """Return the stock of rejected or cancelled orders, held or committed"""
+    return _release(db, db.query(InventoryReservation).filter(
+        InventoryReservation.order_id.in_(list(order_ids)),
+        InventoryReservation.status != ReservationStatus.RELEASED
+    ).with_for_update())
+
+
+def release_expired_reservations(db: Session, limit: int, now: Optional[datetime] = None) -> int:
+    """Release up to limit held reservations past their TTL.
+
+    Rows locked by another worker (or by an order being accepted) are
+    skipped, so several runs can work through the backlog side by side.
+    """
+    now = now or datetime.now(timezone.utc)
+    return _release(db, db.query(InventoryReservation).filter(
+        InventoryReservation.status == ReservationStatus.HELD,
+        InventoryReservation.expires_at <= now
+    ).order_by(InventoryReservation.expires_at).limit(limit).with_for_update(skip_locked=True))
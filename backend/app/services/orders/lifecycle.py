@@ -0,0 +1,321 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app.models.order import Order, OrderStatus, PaymentStatus
+from app.models.order_counter import OrderStatusCounter
+from app.models.order_event import OrderEvent
+from app.models.user import User, UserRole
+
+# Allowed next statuses for each status, for the farmer and for system
+# (logistics) updates.
+TRANSITIONS: Dict[OrderStatus, FrozenSet[OrderStatus]] = {
+    OrderStatus.PENDING: frozenset({OrderStatus.ACCEPTED, OrderStatus.REJECTED, OrderStatus.CANCELLED}),
+    OrderStatus.ACCEPTED: frozenset({OrderStatus.PREPARING, OrderStatus.SHIPPED, OrderStatus.CANCELLED}),
+    OrderStatus.PREPARING: frozenset({OrderStatus.SHIPPED, OrderStatus.CANCELLED}),
+    OrderStatus.SHIPPED: frozenset({OrderStatus.IN_TRANSIT, OrderStatus.DELIVERED}),
+    OrderStatus.IN_TRANSIT: frozenset({OrderStatus.DELIVERED}),
+    OrderStatus.DELIVERED: frozenset(),
+    OrderStatus.REJECTED: frozenset(),
+    OrderStatus.CANCELLED: frozenset(),
+    OrderStatus.DISPUTED: frozenset(),
+}
+
+# Any order not already disputed can be disputed, but only through the
+# disputes API (dispute_order). Only an admin resolves a dispute, moving
+# the order to one of these.
+DISPUTE_RESOLUTIONS: FrozenSet[OrderStatus] = frozenset({OrderStatus.DELIVERED, OrderStatus.CANCELLED})
+
+# Order columns stamped when a status is entered
+_TIMESTAMP_COLUMNS = {
+    OrderStatus.ACCEPTED: "accepted_at",
+    OrderStatus.SHIPPED: "shipped_at",
+    OrderStatus.DELIVERED: "delivered_at",
+}
+
+
+def _update_counters(db: Session, deltas: Counter) -> None:
+    """Apply (user_id, status) -> change to the status counters with one upsert.
+
+    Rows are written in key order so concurrent transactions touching the
+    same users lock their counters in the same order.
+    """
+    rows = [
+        {"user_id": user_id, "status": order_status, "count": change}
+        for (user_id, order_status), change in sorted(deltas.items())
+        if change
+    ]
+    if not rows:
+        return
+    statement = postgresql.insert(OrderStatusCounter).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[OrderStatusCounter.user_id, OrderStatusCounter.status],
+        set_={"count": OrderStatusCounter.count + statement.excluded.count}
+    ))
+
+
+def _status_changes(
+    parties: Iterable[Tuple[int, int]],
+    from_status: Optional[OrderStatus],
+    to_status: OrderStatus
+) -> Counter:
+    """Counter changes for orders, given as (buyer_id, farmer_id), changing status"""
+    deltas = Counter()
+    for buyer_id, farmer_id in parties:
+        for user_id in (buyer_id, farmer_id):
+            if from_status is not None:
+                deltas[(user_id, from_status)] -= 1
+            deltas[(user_id, to_status)] += 1
+    return deltas
+
+
+def actor_role(actor: Optional[User]) -> str:
+    return actor.role.value if actor else "system"
+
+
+def can_transition(from_status: OrderStatus, to_status: OrderStatus, role: str = "system") -> bool:
+    if from_status == OrderStatus.DISPUTED:
+        return role == UserRole.ADMIN.value and to_status in DISPUTE_RESOLUTIONS
+    return to_status in TRANSITIONS[from_status]
+
+
+def transition_error(order: Order, to_status: OrderStatus, actor: Optional[User] = None) -> Optional[str]:
+    """Why the actor cannot move an order to a status, or None if they can"""
+    if can_transition(order.status, to_status, actor_role(actor)):
+        return None
+    return f"Cannot move an order from {order.status.value} to {to_status.value}"
+
+
+def _apply(
+    order: Order,
+    to_status: OrderStatus,
+    actor: Optional[User],
+    metadata: Optional[dict],
+    now: datetime
+) -> dict:
+    """Set the order's new status and timestamp; returns the event row"""
+    from_status = order.status
+    order.status = to_status
+    if to_status in _TIMESTAMP_COLUMNS:
+        setattr(order, _TIMESTAMP_COLUMNS[to_status], now)
+
+    return {
+        "order_id": order.id,
+        "from_status": from_status,
+        "to_status": to_status,
+        "actor_id": actor.id if actor else None,
+        "actor_role": actor_role(actor),
+        "event_metadata": metadata or None,
+        "created_at": now,
+    }
+
+
+def _record(
+    db: Session,
+    order: Order,
+    to_status: OrderStatus,
+    actor: Optional[User],
+    metadata: Optional[dict]
+) -> OrderEvent:
+    from_status = order.status
+    event = OrderEvent(**_apply(order, to_status, actor, metadata, datetime.now(timezone.utc)))
+    db.add(event)
+    _update_counters(db, _status_changes([(order.buyer_id, order.farmer_id)], from_status, to_status))
+    return event
+
+
+def transition_order(
+    db: Session,
+    order: Order,
+    to_status: OrderStatus,
+    actor: Optional[User] = None,
+    metadata: Optional[dict] = None
+) -> OrderEvent:
+    """Move an order to a new status and append the event, or raise 400.
+
+    Runs inside the caller's transaction.
+    """
+    error = transition_error(order, to_status, actor)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    return _record(db, order, to_status, actor, metadata)
+
+
+def dispute_order(db: Session, order: Order, actor: User, metadata: Optional[dict] = None) -> OrderEvent:
+    """Move an order to DISPUTED for the disputes API, or raise 400.
+
+    Runs inside the caller's transaction.
+    """
+    if order.status == OrderStatus.DISPUTED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order is already disputed"
+        )
+    return _record(db, order, OrderStatus.DISPUTED, actor, metadata)
+
+
+def credit_delivery_earnings(db: Session, orders: Iterable[Order]) -> None:
+    """Credit farmers' wallets with the earnings (subtotal - commission) of
+    paid orders about to move to DELIVERED.
+
+    Call before the transition: an order delivered before (and since
+    disputed) has its delivered_at set and is not paid for again.
+    """
+    earnings = Counter()
+    for order in orders:
+        if order.delivered_at is None and order.payment_status == PaymentStatus.PAID:
+            earnings[order.farmer_id] += order.subtotal - order.commission
+
+    for farmer_id, amount in sorted(earnings.items()):
+        db.query(User).filter(User.id == farmer_id).update(
+            {User.wallet_balance: User.wallet_balance + amount}
+        )
+
+
+def transition_orders(
+    db: Session,
+    transitions: List[Tuple[Order, OrderStatus, Optional[dict]]],
+    actor: Optional[User] = None
+) -> None:
+    """Move many orders at once, given as (order, new status, event metadata).
+
+    The events are written with one INSERT and the counters with one
+    upsert. Every transition must be valid for the actor (see
+    transition_error). Runs
+    inside the caller's transaction.
+    """
+    if not transitions:
+        return
+
+    now = datetime.now(timezone.utc)
+    events = []
+    deltas = Counter()
+    for order, to_status, metadata in transitions:
+        from_status = order.status
+        events.append(_apply(order, to_status, actor, metadata, now))
+        deltas.update(_status_changes([(order.buyer_id, order.farmer_id)], from_status, to_status))
+
+    db.execute(insert(OrderEvent), events)
+    _update_counters(db, deltas)
+
+
+def record_orders_created(db: Session, order_ids: Iterable[int], actor: Optional[User] = None) -> None:
+    """Append the creation events of new orders and count them as pending"""
+    order_ids = list(order_ids)
+    rows = [
+        {
+            "order_id": order_id,
+            "from_status": None,
+            "to_status": OrderStatus.PENDING,
+            "actor_id": actor.id if actor else None,
+            "actor_role": actor_role(actor),
+        }
+        for order_id in order_ids
+    ]
+    if not rows:
+        return
+    db.execute(insert(OrderEvent), rows)
+
+    parties = db.query(Order.buyer_id, Order.farmer_id).filter(Order.id.in_(order_ids)).all()
+    _update_counters(db, _status_changes(parties, None, OrderStatus.PENDING))
+
+
+def order_status_counts(db: Session, user_id: int) -> Dict[str, int]:
+    """Number of the user's orders (as buyer or farmer) in every status"""
+    counts = {order_status.value: 0 for order_status in OrderStatus}
+    for order_status, count in db.query(OrderStatusCounter.status, OrderStatusCounter.count).filter(
+        OrderStatusCounter.user_id == user_id
+    ):
+        counts[order_status.value] = count
+    return counts
+
+
+def order_timeline(db: Session, order: Order) -> List[dict]:
+    """An order's transitions in order, with the time spent in each status.
+
+    No event predates the order, so bounding created_at by the order's
+    creation time limits the scan to the months since it was placed.
+    """
+    query = db.query(OrderEvent).filter(OrderEvent.order_id == order.id)
+    if order.created_at:
+        query = query.filter(OrderEvent.created_at >= order.created_at)
+    events = query.order_by(OrderEvent.created_at, OrderEvent.id).all()
+
+    timeline = []
+    for event, next_event in zip(events, events[1:] + [None]):
+        timeline.append({
+            "status": event.to_status.value,
+            "from_status": event.from_status.value if event.from_status else None,
+            "at": event.created_at,
+            "actor_id": event.actor_id,
+            "actor_role": event.actor_role,
+            "metadata": event.event_metadata,
+            "duration_seconds": (
+                (next_event.created_at - event.created_at).total_seconds() if next_event else None
+            ),
+        })
+    return timeline
+
+
+def status_durations(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    farmer_id: Optional[int] = None
+) -> List[dict]:
+    """Time spent in each status by orders created between start and end.
+
+    The orders are found through the creation events in the range, and each
+    event's duration runs until the order's next event (LEAD over the
+    (order_id, created_at) index). Statuses the order is still in are not
+    counted. PostgreSQL only (percentile_cont, epoch extraction).
+    """
+    created = select(OrderEvent.order_id).where(
+        OrderEvent.from_status.is_(None),
+        OrderEvent.created_at >= start,
+        OrderEvent.created_at < end
+    )
+    if farmer_id is not None:
+        created = created.join(Order, Order.id == OrderEvent.order_id).where(Order.farmer_id == farmer_id)
+
+    left_at = func.lead(OrderEvent.created_at).over(
+        partition_by=OrderEvent.order_id,
+        order_by=(OrderEvent.created_at, OrderEvent.id)
+    )
+    spans = select(
+        OrderEvent.to_status.label("status"),
+        func.extract("epoch", left_at - OrderEvent.created_at).label("seconds")
+    ).where(
+        OrderEvent.order_id.in_(created),
+        # Events of orders placed since start are no older than start
+        OrderEvent.created_at >= start
+    ).subquery()
+
+    rows = db.execute(
+        select(
+            spans.c.status,
+            func.count(),
+            func.avg(spans.c.seconds),
+            func.percentile_cont(0.5).within_group(spans.c.seconds),
+            func.percentile_cont(0.95).within_group(spans.c.seconds),
+            func.max(spans.c.seconds),
+        ).where(spans.c.seconds.isnot(None)).group_by(spans.c.status)
+    ).all()
+
+    return [
+        {
+            "status": row[0].value,
+            "count": row[1],
+            "avg_seconds": float(row[2]),
+            "p50_seconds": float(row[3]),
+            "p95_seconds": float(row[4]),
+            "max_seconds": float(row[5]),
+        }
+        for row in rows
+    ]
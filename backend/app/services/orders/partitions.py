@@ -0,0 +1,149 @@
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import pyarrow
+import pyarrow.parquet
+from sqlalchemy import DateTime, Float, Integer, text
+from sqlalchemy.orm import Session
+from app.core.config.db import Base
+from app.core.config.settings import settings
+
+# Tables range-partitioned by month on created_at (migration 0018)
+PARTITIONED_TABLES = ("payment_transactions", "order_events")
+
+# Rows fetched from the server and written to the archive at a time
+ARCHIVE_BATCH_SIZE = 10000
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def monthly_partitions(db: Session, table: str) -> Dict[datetime, str]:
+    """A table's attached monthly partitions by month start (not the default partition)"""
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass)"
+    ), {"table": table}).scalars()
+
+    partitions = {}
+    for name in names:
+        try:
+            month = datetime.strptime(name[len(table) + 1:], "%Y_%m").replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        partitions[month] = name
+    return partitions
+
+
+def create_partitions(db: Session, table: str, now: Optional[datetime] = None) -> List[str]:
+    """Create this month's partition and the next PARTITION_PREMADE_MONTHS.
+
+    Rows that fell into the default partition because their month was
+    missing are moved into the new partition before it is attached.
+    """
+    this_month = month_start(now or datetime.now(timezone.utc))
+    existing = monthly_partitions(db, table)
+
+    created = []
+    for offset in range(settings.PARTITION_PREMADE_MONTHS + 1):
+        month = add_months(this_month, offset)
+        if month in existing:
+            continue
+
+        name = partition_name(table, month)
+        bounds = {"start": month, "end": add_months(month, 1)}
+        db.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+        db.execute(text(
+            f'WITH moved AS ('
+            f'DELETE FROM "{table}_default" WHERE created_at >= :start AND created_at < :end RETURNING *'
+            f') INSERT INTO "{name}" SELECT * FROM moved'
+        ), bounds)
+        db.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM (:start) TO (:end)'), bounds)
+        created.append(name)
+    return created
+
+
+def expired_partitions(db: Session, table: str, now: Optional[datetime] = None) -> List[Tuple[datetime, str]]:
+    """Partitions of months older than PARTITION_RETENTION_MONTHS, oldest first"""
+    cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -settings.PARTITION_RETENTION_MONTHS)
+    return sorted(
+        (month, name) for month, name in monthly_partitions(db, table).items()
+        if month < cutoff
+    )
+
+
+def archive_path(table: str, name: str) -> Path:
+    return Path(settings.ARCHIVE_DIR) / table / f"{name}.parquet"
+
+
+def _arrow_type(column_type):
+    if isinstance(column_type, Integer):
+        return pyarrow.int64()
+    if isinstance(column_type, Float):
+        return pyarrow.float64()
+    if isinstance(column_type, DateTime):
+        return pyarrow.timestamp("us", tz="UTC")
+    # Strings, text, enums (stored by name) and JSON (serialized)
+    return pyarrow.string()
+
+
+def _arrow_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def export_partition(db: Session, table: str, name: str, path: Path) -> int:
+    """Write a partition's rows to a zstd-compressed Parquet file; returns the row count.
+
+    The file is written under a temporary name and renamed when complete,
+    so a finished archive file is never partial.
+    """
+    columns = list(Base.metadata.tables[table].columns)
+    schema = pyarrow.schema([(column.name, _arrow_type(column.type)) for column in columns])
+    names = [column.name for column in columns]
+    selected = ", ".join(f'"{column}"' for column in names)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+
+    result = db.execute(
+        text(f'SELECT {selected} FROM "{name}" ORDER BY created_at, id'),
+        execution_options={"yield_per": ARCHIVE_BATCH_SIZE}
+    )
+    rows = 0
+    with pyarrow.parquet.ParquetWriter(partial, schema, compression="zstd") as writer:
+        for batch in result.partitions():
+            writer.write_table(pyarrow.Table.from_pylist(
+                [dict(zip(names, map(_arrow_value, row))) for row in batch],
+                schema=schema
+            ))
+            rows += len(batch)
+    os.replace(partial, path)
+    return rows
+
+
+def archive_partition(db: Session, table: str, name: str) -> int:
+    """Export a partition to the archive directory, then detach and drop it.
+
+    Commits; returns the number of rows archived. Only partitions past the
+    retention period are archived, so nothing writes to them meanwhile.
+    """
+    rows = export_partition(db, table, name, archive_path(table, name))
+    db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+    db.execute(text(f'DROP TABLE "{name}"'))
+    db.commit()
+    return rows
@@ -0,0 +1,75 @@
+import math
+from typing import List, Optional, Tuple
+
+# Side of a grid cell in degrees (~28 km at the equator). Nearby searches
+# turn the search circle into the list of cells it overlaps and look those
+# cells up through the geo_cell index.
+GEO_CELL_DEGREES = 0.25
+GEO_GRID_COLUMNS = int(math.ceil(360 / GEO_CELL_DEGREES))
+
+KM_PER_DEGREE = 111.195
+
+
+def parse_coordinates(value: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Parse a "lat,lng" string; raises ValueError if it is malformed"""
+    if value is None or not value.strip():
+        return None
+
+    parts = value.split(",")
+    if len(parts) != 2:
+        raise ValueError("Coordinates must be in 'latitude,longitude' format")
+
+    latitude, longitude = float(parts[0]), float(parts[1])
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError("Coordinates are out of range")
+
+    return latitude, longitude
+
+
+def geo_cell(latitude: float, longitude: float) -> int:
+    """Grid cell id containing a point"""
+    row = min(int((latitude + 90) / GEO_CELL_DEGREES), int(180 / GEO_CELL_DEGREES) - 1)
+    column = int((longitude + 180) / GEO_CELL_DEGREES) % GEO_GRID_COLUMNS
+    return row * GEO_GRID_COLUMNS + column
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lng, max_lng) of the box around a search circle"""
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return (
+        max(latitude - lat_delta, -90.0),
+        min(latitude + lat_delta, 90.0),
+        longitude - lng_delta,
+        longitude + lng_delta,
+    )
+
+
+def cells_within(latitude: float, longitude: float, radius_km: float) -> List[int]:
+    """Ids of all grid cells overlapping the box around a search circle"""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    rows = range(
+        int((min_lat + 90) / GEO_CELL_DEGREES),
+        min(int((max_lat + 90) / GEO_CELL_DEGREES), int(180 / GEO_CELL_DEGREES) - 1) + 1
+    )
+    first_column = int(math.floor((min_lng + 180) / GEO_CELL_DEGREES))
+    last_column = int(math.floor((max_lng + 180) / GEO_CELL_DEGREES))
+    columns = {
+        column % GEO_GRID_COLUMNS
+        for column in range(first_column, min(last_column, first_column + GEO_GRID_COLUMNS - 1) + 1)
+    }
+    return [row * GEO_GRID_COLUMNS + column for row in rows for column in sorted(columns)]
+
+
+def farm_location_fields(coordinates: Optional[str]) -> dict:
+    """Numeric User columns derived from a farm_location_coordinates string"""
+    parsed = parse_coordinates(coordinates)
+    if parsed is None:
+        return {"farm_latitude": None, "farm_longitude": None, "farm_geo_cell": None}
+
+    latitude, longitude = parsed
+    return {
+        "farm_latitude": latitude,
+        "farm_longitude": longitude,
+        "farm_geo_cell": geo_cell(latitude, longitude),
+    }
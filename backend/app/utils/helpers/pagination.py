@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list):
+            raise ValueError("cursor payload must be a list")
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset_paginate(
+    query: Query,
+    sort_keys: Sequence[Any],
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> list:
+    """Fetch one page of a query ordered by sort_keys, newest/highest first.
+
+    With a cursor the page starts right after the row the cursor was taken
+    from using a row-value comparison, so every page costs one index range
+    scan no matter how deep it is. Without a cursor the old skip/limit
+    behaviour is kept. Either way the cursor for the following page is sent
+    back in the X-Next-Cursor header (absent on the last page), which leaves
+    the response body unchanged for existing clients.
+
+    sort_keys must end with a unique column (normally the primary key).
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(sort_keys):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(tuple_(*sort_keys) < tuple_(*values))
+
+    query = query.add_columns(*sort_keys).order_by(*[key.desc() for key in sort_keys])
+    if skip and not cursor:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+
+    page = rows[:limit]
+    if len(rows) > limit:
+        last_keys = tuple(page[-1])[1:]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_keys)
+
+    return [row[0] for row in page]
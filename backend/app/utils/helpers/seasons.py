@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+_MONTH_NAMES = (
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+)
+
+# One bit per month, January in bit 0. Products that are not seasonal are
+# available all year, so they get every bit and match any month.
+ALL_MONTHS_MASK = (1 << len(MONTHS)) - 1
+
+
+def _month_number(token: str) -> int:
+    token = token.strip().lower()
+    if token.isdigit() and 1 <= int(token) <= 12:
+        return int(token)
+    if len(token) >= 3:
+        for number, name in enumerate(_MONTH_NAMES, start=1):
+            if name.startswith(token):
+                return number
+    raise ValueError(f"Unknown month '{token}'")
+
+
+def month_bit(month: int) -> int:
+    return 1 << (month - 1)
+
+
+def parse_season_months(value: Optional[str]) -> int:
+    """Parse "jan,feb,mar" (also full names, numbers and wrapping ranges like "nov-feb") into a month mask.
+
+    Raises ValueError on anything that is not a month.
+    """
+    mask = 0
+    for part in (value or "").split(","):
+        if not part.strip():
+            continue
+        if "-" in part:
+            start, end = (_month_number(token) for token in part.split("-", 1))
+            month = start
+            while True:
+                mask |= month_bit(month)
+                if month == end:
+                    break
+                month = month % 12 + 1
+        else:
+            mask |= month_bit(_month_number(part))
+    return mask
+
+
+def season_mask(is_seasonal: Optional[bool], season_months: Optional[str]) -> int:
+    """Month mask stored on products; unparseable or empty seasons count as all year"""
+    if not is_seasonal:
+        return ALL_MONTHS_MASK
+    try:
+        return parse_season_months(season_months) or ALL_MONTHS_MASK
+    except ValueError:
+        return ALL_MONTHS_MASK
+
+
+def current_month() -> int:
+    return datetime.now(timezone.utc).month
+
+
+def season_filter(in_season: Optional[bool] = None, month: Optional[int] = None) -> Optional[Tuple[int, bool]]:
+    """Resolve the in_season/month query parameters to (month, in_season).
+
+    month alone means "in season that month"; in_season alone uses the
+    current month. Returns None when neither is given.
+    """
+    if in_season is None and month is None:
+        return None
+    return month or current_month(), in_season is not False